@@ -0,0 +1,31 @@
+# AZAR: flujos de números aleatorios separados por subsistema.
+#   sim: todo lo que cambia la partida (drops, críticos, disparos enemigos, IA de jefes, mejoras)
+#   fx:  solo lo visual (partículas, zigzag de rayos, brillos, temblor de pantalla, fondo, niebla)
+# Como los efectos no tocan 'sim', apagarlos (headless) deja la simulación idéntica bit a bit.
+# Cada Juego tiene sus propios Flujos y los activa junto con su reloj (Juego.activar), así
+# varias partidas en el mismo proceso no se roban números ni se resiembran entre sí.
+import random
+
+
+class Flujos:
+    """Par de flujos (sim, fx) de un Juego."""
+
+    def __init__(self):
+        self.sim = random.Random()
+        self.fx = random.Random()
+
+    def sembrar(self, semilla):
+        """Siembra ambos flujos a partir de la semilla de la partida."""
+        self.sim.seed(semilla)
+        self.fx.seed(f"fx{semilla}")
+
+
+# Flujos activos: los que usan azar.sim y azar.fx
+_activos = Flujos()
+sim, fx = _activos.sim, _activos.fx
+
+
+def activar(flujos):
+    global _activos, sim, fx
+    _activos, sim, fx = flujos, flujos.sim, flujos.fx
+
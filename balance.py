@@ -0,0 +1,91 @@
+# BARRIDO DE BALANCEO: miles de partidas headless repartidas en todos los núcleos.
+# Cubre personajes x dificultades x niveles de mejoras de tienda y resume
+# nivel alcanzado, tiempo de jefes, daño recibido y cristales ganados.
+# Uso: python balance.py --repeticiones 20 --niveles-meta 0,0.5,1
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from settings import *
+
+# Juego headless reutilizado por cada proceso del pool (crearlo cuesta más que reiniciarlo)
+_juego_worker = None
+
+
+def mejoras_para_nivel(fraccion):
+    """Niveles de tienda para una fracción 0..1 del máximo de cada mejora."""
+    return {clave: int(round(info["max"] * fraccion)) for clave, info in PRECIOS_TIENDA.items()}
+
+
+def correr_partida(tarea):
+    global _juego_worker
+    from main import GestorDatos
+    from simulacion import crear_juego_headless, ejecutar_partida
+    personaje, dificultad, nivel_meta, semilla, pasos = tarea
+    if _juego_worker is None: _juego_worker = crear_juego_headless()
+    # Cada tarea empieza como en un juego recién creado: save en memoria nuevo (jefes,
+    # cristales y desbloqueos de tareas anteriores cambiarían los drops) y reloj en 0
+    _juego_worker.gestor_datos = GestorDatos(persistir=False)
+    _juego_worker.reloj_frame.fijar(0.0)
+    r = ejecutar_partida(personaje, dificultad, pasos, juego=_juego_worker, mejoras=mejoras_para_nivel(nivel_meta), semilla=semilla)
+    r["nivel_meta"] = nivel_meta
+    return r
+
+
+def generar_tareas(personajes, dificultades, niveles_meta, repeticiones, pasos, semilla_base=0):
+    tareas = []
+    for i, (p, d, m) in enumerate(itertools.product(personajes, dificultades, niveles_meta)):
+        for rep in range(repeticiones):
+            tareas.append((p, d, m, semilla_base + i * 100003 + rep, pasos))
+    return tareas
+
+
+def resumir(resultados):
+    """Agrupa por (personaje, dificultad, nivel_meta) y calcula medias."""
+    grupos = {}
+    for r in resultados:
+        grupos.setdefault((r["personaje"], r["dificultad"], r["nivel_meta"]), []).append(r)
+    filas = []
+    for (p, d, m), rs in sorted(grupos.items()):
+        n = len(rs)
+        tiempos = [t for r in rs for _, t in r["tiempos_boss"]]
+        filas.append({
+            "personaje": p, "dificultad": d, "nivel_meta": m, "partidas": n,
+            "nivel_medio": sum(r["nivel"] for r in rs) / n,
+            "nivel_max": max(r["nivel"] for r in rs),
+            "victorias": sum(1 for r in rs if r["estado"] == ESTADO_VICTORIA_FINAL) / n,
+            "tiempo_boss": sum(tiempos) / len(tiempos) if tiempos else None,
+            "danio": sum(r["danio_recibido"] for r in rs) / n,
+            "cristales": sum(r["cristales"] for r in rs) / n,
+        })
+    return filas
+
+
+def imprimir_tabla(filas):
+    cab = f"{'PERSONAJE':<10} {'DIF':>3} {'META':>5} {'N':>4} {'NIVEL':>6} {'MAX':>4} {'VICT%':>6} {'BOSS(s)':>8} {'DAÑO':>6} {'CRIST':>7}"
+    print(cab); print("-" * len(cab))
+    for f in filas:
+        tb = f"{f['tiempo_boss']:.1f}" if f["tiempo_boss"] is not None else "-"
+        print(f"{f['personaje']:<10} {f['dificultad']:>3} {f['nivel_meta']:>5.2f} {f['partidas']:>4} {f['nivel_medio']:>6.2f} {f['nivel_max']:>4} "
+              f"{f['victorias'] * 100:>6.1f} {tb:>8} {f['danio']:>6.2f} {f['cristales']:>7.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Barrido de balanceo headless en paralelo")
+    parser.add_argument("--personajes", default=",".join(CONFIG_PERSONAJES.keys()))
+    parser.add_argument("--dificultades", default=f"{MODO_NORMAL},{MODO_DIFICIL}")
+    parser.add_argument("--niveles-meta", default="0,0.5,1", help="Fracciones 0..1 del máximo de cada mejora de tienda")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--pasos", type=int, default=FPS * 60 * 20, help="Tope de ticks por partida")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count())
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    tareas = generar_tareas(args.personajes.split(","), [int(d) for d in args.dificultades.split(",")],
+                            [float(m) for m in args.niveles_meta.split(",")], args.repeticiones, args.pasos, args.semilla)
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+        resultados = list(pool.map(correr_partida, tareas, chunksize=max(1, len(tareas) // (args.procesos * 8))))
+    print(f"{len(resultados)} partidas en {time.perf_counter() - inicio:.1f}s con {args.procesos} procesos\n")
+    imprimir_tabla(resumir(resultados))
@@ -0,0 +1,659 @@
+# COLISIONES: broadphase con rejilla uniforme (hash espacial) para no comparar cada
+# proyectil contra cada enemigo. Los resultados salen en el mismo orden que
+# pygame.sprite.groupcollide / spritecollide. Las pruebas son por barrido: lo que se
+# mueve rápido (balas, dash del Mago, embestida de SNAKE) choca con todo lo que cruzó
+# durante el tick, no solo con lo que toca al final, así no atraviesa monstruos ni barreras.
+# También el barrido y poda para bala contra bala (EL LOCO), el índice de objetivos
+# (vecino más cercano) para homing, rebotes y apuntado y las consultas de radio en
+# lote (explosiones, contagio de quemadura, escudo). Los rayos y láseres son haces:
+# segmentos con ancho, probados de forma analítica contra cajas.
+# Cada clase declara su forma una vez (atributo 'colisionador': caja, círculo, haz o
+# máscara de píxeles); el rect es solo la caja del broadphase y chocan() prueba las formas.
+import math
+import weakref
+from bisect import bisect_left
+from collections import namedtuple
+import pygame
+import tiempo
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # build web: las consultas de radio se resuelven en Python puro
+
+TAM_CELDA = 96
+# Con pocos sprites es más barato recorrer la lista plana en C (Rect.collidelistall)
+UMBRAL_REJILLA = 32
+
+
+def desplazamiento(sprite):
+    """(dx, dy) que se movió el sprite en este tick; (0, 0) si no guarda pos_previa."""
+    previa = getattr(sprite, 'pos_previa', None)
+    if previa is None: return 0, 0
+    x, y = sprite.rect.center
+    return x - previa[0], y - previa[1]
+
+
+def caja_barrido(rect, dx, dy):
+    """Caja que cubre todo el recorrido de 'rect' en el tick (llegó moviéndose (dx, dy))."""
+    if not dx and not dy: return rect
+    return rect.union(rect.move(-dx, -dy))
+
+
+def choca_barrido(rect, dx, dy, otro):
+    """True si 'rect', que llegó a su lugar moviéndose (dx, dy) en este tick, tocó 'otro' en el camino.
+
+    Ejes separados sobre el recorrido (t de 0 a 1). Incluye la posición final, así
+    nunca pierde un choque que vería la prueba discreta; lo que agrega son los
+    cruces entre dos ticks (balas rápidas contra la Barrera de 9 px, dash, embestida).
+    Si los dos se mueven, (dx, dy) es el movimiento de 'rect' relativo a 'otro'.
+    """
+    if rect.colliderect(otro): return True
+    if (not dx and not dy) or not (rect.width and rect.height and otro.width and otro.height): return False
+    t0, t1 = 0.0, 1.0
+    for a0, tam_a, d, b0, tam_b in ((rect.left - dx, rect.width, dx, otro.left, otro.width),
+                                     (rect.top - dy, rect.height, dy, otro.top, otro.height)):
+        # En este eje se solapan mientras b0 - tam_a < a0 + d*t < b0 + tam_b
+        bajo, alto = b0 - tam_a - a0, b0 + tam_b - a0
+        if not d:
+            if not bajo < 0 < alto: return False
+            continue
+        ta, tb = (bajo / d, alto / d) if d > 0 else (alto / d, bajo / d)
+        if ta > t0: t0 = ta
+        if tb < t1: t1 = tb
+        if t0 >= t1: return False
+    return True
+
+
+# Haz: rectángulo orientado (rayo del jugador, láser de SNAKE) alrededor del segmento
+# (x0, y0)-(x1, y1). (ux, uy) es la dirección; medio_largo y medio_ancho sus semiejes.
+Haz = namedtuple("Haz", "x0 y0 x1 y1 ancho cx cy ux uy medio_largo medio_ancho caja")
+
+
+def crear_haz(x0, y0, x1, y1, ancho):
+    """Haz del segmento (x0, y0)-(x1, y1) con el ancho dado (extremos planos, como draw.line)."""
+    largo = math.hypot(x1 - x0, y1 - y0)
+    ux, uy = ((x1 - x0) / largo, (y1 - y0) / largo) if largo else (1.0, 0.0)
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    l, m = largo / 2, ancho / 2
+    ex, ey = l * abs(ux) + m * abs(uy), l * abs(uy) + m * abs(ux)
+    izq, arr = math.floor(cx - ex), math.floor(cy - ey)
+    caja = pygame.Rect(izq, arr, math.ceil(cx + ex) - izq, math.ceil(cy + ey) - arr)
+    return Haz(x0, y0, x1, y1, ancho, cx, cy, ux, uy, l, m, caja)
+
+
+def haz_toca(haz, rect):
+    """True si el haz se solapa con 'rect' (ejes separados: x, y, largo y ancho del haz)."""
+    ex, ey = rect.width / 2, rect.height / 2
+    if ex <= 0 or ey <= 0 or haz.medio_largo <= 0: return False
+    dx, dy = haz.cx - (rect.left + ex), haz.cy - (rect.top + ey)
+    ux, uy = haz.ux, haz.uy
+    aux, auy = abs(ux), abs(uy)
+    l, m = haz.medio_largo, haz.medio_ancho
+    if abs(dx) >= ex + l * aux + m * auy: return False
+    if abs(dy) >= ey + l * auy + m * aux: return False
+    if abs(dx * ux + dy * uy) >= l + ex * aux + ey * auy: return False
+    if abs(dy * ux - dx * uy) >= m + ex * auy + ey * aux: return False
+    return True
+
+
+def haz_toca_circulo(haz, cx, cy, radio):
+    """True si el haz se solapa con el círculo de centro (cx, cy)."""
+    if haz.medio_largo <= 0: return False
+    dx, dy = cx - haz.cx, cy - haz.cy
+    # Coordenadas del centro a lo largo y a lo ancho del haz, fuera del rectángulo
+    s = abs(dx * haz.ux + dy * haz.uy) - haz.medio_largo
+    t = abs(dy * haz.ux - dx * haz.uy) - haz.medio_ancho
+    if s < 0: s = 0
+    if t < 0: t = 0
+    return s * s + t * t < radio * radio
+
+
+# FORMAS. CAJA: rect.inflate(dx, dy) (con 0, 0 el rect tal cual); CIRCULO: centro en
+# rect.center + (dx, dy); HAZ: la geometría está en sprite.haz, que cambia cada frame;
+# MASCARA: sprite.mascara (pygame.mask.Mask) con su esquina en rect.topleft, como se
+# dibuja la imagen. Las demás formas tienen que caber en el rect (el broadphase usa el
+# rect); la máscara trae su propia caja y solo se mira si esa caja se toca.
+CAJA, CIRCULO, HAZ, MASCARA = 0, 1, 2, 3
+Colisionador = namedtuple("Colisionador", "forma radio dx dy")
+COLISION_RECT = Colisionador(CAJA, 0, 0, 0)
+COLISION_HAZ = Colisionador(HAZ, 0, 0, 0)
+COLISION_MASCARA = Colisionador(MASCARA, 0, 0, 0)
+
+
+def colision_caja(dw=0, dh=0):
+    """Caja del rect agrandada (o achicada, con negativos) en dw x dh."""
+    return Colisionador(CAJA, 0, dw, dh) if dw or dh else COLISION_RECT
+
+
+def colision_circulo(radio, dx=0, dy=0):
+    return Colisionador(CIRCULO, radio, dx, dy)
+
+
+def caja_colision(sprite):
+    """Caja con la que choca un sprite de forma CAJA."""
+    c = sprite.colisionador
+    return sprite.rect.inflate(c.dx, c.dy) if c.dx or c.dy else sprite.rect
+
+
+def _segmento_en_caja(x0, y0, x1, y1, izq, arr, der, aba):
+    """True si el segmento (x0, y0)-(x1, y1) pasa por el interior de la caja."""
+    t0, t1 = 0.0, 1.0
+    for p, d, bajo, alto in ((x0, x1 - x0, izq, der), (y0, y1 - y0, arr, aba)):
+        if not d:
+            if not bajo < p < alto: return False
+            continue
+        ta, tb = (bajo - p) / d, (alto - p) / d
+        if ta > tb: ta, tb = tb, ta
+        if ta > t0: t0 = ta
+        if tb < t1: t1 = tb
+        if t0 >= t1: return False
+    return True
+
+
+def _dist2_segmento(px, py, x0, y0, x1, y1):
+    """Distancia al cuadrado del punto (px, py) al segmento (x0, y0)-(x1, y1)."""
+    dx, dy = x1 - x0, y1 - y0
+    l2 = dx * dx + dy * dy
+    t = ((px - x0) * dx + (py - y0) * dy) / l2 if l2 else 0.0
+    if t < 0.0: t = 0.0
+    elif t > 1.0: t = 1.0
+    ex, ey = x0 + t * dx - px, y0 + t * dy - py
+    return ex * ex + ey * ey
+
+
+def circulo_toca_caja(cx, cy, radio, dx, dy, caja):
+    """True si el círculo, que llegó a (cx, cy) moviéndose (dx, dy) en el tick, tocó 'caja'.
+
+    El centro recorre un segmento; choca si el segmento entra en la caja agrandada
+    por el radio con las esquinas redondeadas (dos cajas en cruz y cuatro círculos).
+    """
+    izq, arr, der, aba = caja.left, caja.top, caja.right, caja.bottom
+    if der <= izq or aba <= arr: return False
+    # Primero la posición final, que es donde se dan casi todos los choques
+    r2 = radio * radio
+    ex = izq - cx if cx < izq else (cx - der if cx > der else 0)
+    ey = arr - cy if cy < arr else (cy - aba if cy > aba else 0)
+    if ex * ex + ey * ey < r2: return True
+    if not dx and not dy: return False
+    x0, y0 = cx - dx, cy - dy
+    if _segmento_en_caja(x0, y0, cx, cy, izq - radio, arr, der + radio, aba): return True
+    if _segmento_en_caja(x0, y0, cx, cy, izq, arr - radio, der, aba + radio): return True
+    for px, py in ((izq, arr), (der, arr), (izq, aba), (der, aba)):
+        if _dist2_segmento(px, py, x0, y0, cx, cy) < r2: return True
+    return False
+
+
+def _haz_contra(haz, sprite, c):
+    """Haz contra un sprite de forma 'c' (en su posición final)."""
+    if c.forma == CAJA: return haz_toca(haz, sprite.rect.inflate(c.dx, c.dy) if c.dx or c.dy else sprite.rect)
+    if c.forma == CIRCULO:
+        cx, cy = sprite.rect.center
+        return haz_toca_circulo(haz, cx + c.dx, cy + c.dy, c.radio)
+    return False
+
+
+_mascaras_circulo = {}
+_mascaras_llenas = {}
+
+
+def mascara_circulo(radio):
+    """Máscara de un círculo de 'radio' dibujado en su caja de 2*radio (cacheada por radio)."""
+    m = _mascaras_circulo.get(radio)
+    if m is None:
+        lado = max(1, int(radio * 2))
+        sup = pygame.Surface((lado, lado), pygame.SRCALPHA)
+        pygame.draw.circle(sup, (255, 255, 255, 255), (lado // 2, lado // 2), radio)
+        m = _mascaras_circulo[radio] = pygame.mask.from_surface(sup)
+    return m
+
+
+def mascara_llena(tam):
+    """Máscara llena de tam = (ancho, alto) (cacheada: las cajas que chocan con jefes son pocas)."""
+    m = _mascaras_llenas.get(tam)
+    if m is None: m = _mascaras_llenas[tam] = pygame.mask.Mask(tam, fill=True)
+    return m
+
+
+def caja_mascara(sprite):
+    """Caja que ocupa la máscara de un sprite de forma MASCARA."""
+    x, y = sprite.rect.topleft
+    w, h = sprite.mascara.get_size()
+    return pygame.Rect(x, y, w, h)
+
+
+def _mascara_contra(sprite, otro, c, dx, dy):
+    """Máscara de 'sprite' contra 'otro' (forma 'c'), que se movió (dx, dy) respecto de él.
+
+    Primero cajas; los píxeles solo si se tocan. Lo que se mueve más que su propio
+    tamaño en el tick se prueba en varios puntos del recorrido para no atravesar.
+    """
+    mascara = sprite.mascara
+    ox, oy = sprite.rect.topleft
+    w, h = mascara.get_size()
+    forma = c.forma
+    # Compuerta: el rect de 'otro' con su recorrido (encierra su forma) contra la caja de la máscara
+    r = otro.haz.caja if forma == HAZ else otro.rect
+    if (r.right - (dx if dx < 0 else 0) <= ox or r.left - (dx if dx > 0 else 0) >= ox + w or
+            r.bottom - (dy if dy < 0 else 0) <= oy or r.top - (dy if dy > 0 else 0) >= oy + h): return False
+    if forma == HAZ:
+        # Haz como su caja: exacto para los rayos verticales del jugador
+        if not r.width or not r.height: return False
+        return mascara.overlap(pygame.mask.Mask(r.size, fill=True), (r.x - ox, r.y - oy)) is not None
+    if forma == CIRCULO:
+        radio = c.radio
+        otra = mascara_circulo(radio)
+        cx, cy = r.center
+        x, y = cx + c.dx - radio - ox, cy + c.dy - radio - oy
+        lado = radio * 2
+    elif forma == CAJA:
+        if c.dx or c.dy: r = r.inflate(c.dx, c.dy)
+        if not r.width or not r.height: return False
+        otra = mascara_llena(r.size)
+        x, y = r.x - ox, r.y - oy
+        lado = min(r.width, r.height)
+    else:
+        return False
+    if mascara.overlap(otra, (x, y)) is not None: return True
+    pasos = math.ceil(max(abs(dx), abs(dy)) / max(1, lado))
+    for k in range(1, pasos):
+        t = k / pasos
+        if mascara.overlap(otra, (x - round(dx * t), y - round(dy * t))) is not None: return True
+    return False
+
+
+def chocan(a, b, dx=0, dy=0):
+    """Narrowphase por forma: True si 'a', moviéndose (dx, dy) respecto de 'b' en el tick, tocó a 'b'."""
+    ca, cb = a.colisionador, b.colisionador
+    fa, fb = ca.forma, cb.forma
+    if fa == MASCARA: return _mascara_contra(a, b, cb, -dx, -dy)
+    if fb == MASCARA: return _mascara_contra(b, a, ca, dx, dy)
+    if fa == HAZ: return _haz_contra(a.haz, b, cb)
+    if fb == HAZ: return _haz_contra(b.haz, a, ca)
+    if fa == CAJA:
+        ra = a.rect.inflate(ca.dx, ca.dy) if ca.dx or ca.dy else a.rect
+        if fb == CAJA: return choca_barrido(ra, dx, dy, b.rect.inflate(cb.dx, cb.dy) if cb.dx or cb.dy else b.rect)
+        # b se movió (-dx, -dy) respecto de a
+        bx, by = b.rect.center
+        return circulo_toca_caja(bx + cb.dx, by + cb.dy, cb.radio, -dx, -dy, ra)
+    ax, ay = a.rect.center
+    ax += ca.dx; ay += ca.dy
+    if fb == CAJA: return circulo_toca_caja(ax, ay, ca.radio, dx, dy, b.rect.inflate(cb.dx, cb.dy) if cb.dx or cb.dy else b.rect)
+    bx, by = b.rect.center
+    suma = ca.radio + cb.radio
+    return _dist2_segmento(bx + cb.dx, by + cb.dy, ax - dx, ay - dy, ax, ay) < suma * suma
+
+
+def caja_broadphase(sprite, dx=0, dy=0):
+    """Caja que encierra todo lo que 'sprite' pudo tocar en el tick (su haz, o su recorrido)."""
+    forma = sprite.colisionador.forma
+    if forma == HAZ: return sprite.haz.caja
+    if forma == MASCARA: return caja_barrido(caja_mascara(sprite), dx, dy)
+    return caja_barrido(sprite.rect, dx, dy)
+
+
+def chocan_barrido(a, b):
+    """collided= para spritecollide: formas de a y b con su movimiento relativo del tick."""
+    dxa, dya = desplazamiento(a)
+    dxb, dyb = desplazamiento(b)
+    return chocan(a, b, dxa - dxb, dya - dyb)
+
+
+def colisionar_sprite(sprite, grupo, dokill=False):
+    """Equivalente a spritecollide(sprite, grupo, dokill, collided=chocan_barrido).
+
+    Preselecciona en C con la caja del recorrido de 'sprite'; solo los del grupo que
+    también se mueven (pos_previa) se prueban uno por uno.
+    """
+    dx, dy = desplazamiento(sprite)
+    miembros = grupo.sprites()
+    cerca = set(caja_broadphase(sprite, dx, dy).collidelistall([b.rect for b in miembros]))
+    res = []
+    for i, b in enumerate(miembros):
+        if (i in cerca or hasattr(b, 'pos_previa')) and chocan_barrido(sprite, b):
+            if dokill: b.kill()
+            res.append(b)
+    return res
+
+
+class RejillaEspacial:
+    """Hash espacial de celdas TAM_CELDA x TAM_CELDA sobre los rects de un grupo.
+
+    Se reconstruye una vez por frame. Los sprites que salen del grupo después se
+    descartan al consultar; los que entran no se ven hasta volver a reconstruir.
+    Con barrido=True cada sprite ocupa la caja de todo su recorrido del tick (grupos
+    de cosas rápidas, como las balas). Las consultas confirman con chocan().
+    """
+
+    def __init__(self, tam_celda=TAM_CELDA, umbral=UMBRAL_REJILLA, barrido=False):
+        self.tam = tam_celda
+        self.umbral = umbral
+        self.barrido = barrido
+        self.grupo = None
+        self.sprites = []
+        self.cajas = []   # rect de cada sprite (o la caja de su recorrido, con barrido)
+        self.movs = None  # (dx, dy) de cada sprite, solo con barrido
+        self.celdas = None
+        self.limite = None  # caja que encierra a todas: lo que cae fuera se descarta enseguida
+
+    def reconstruir(self, grupo):
+        self.grupo = grupo
+        self.sprites = sprites = grupo.sprites()
+        if self.barrido:
+            self.movs = movs = [desplazamiento(s) for s in sprites]
+            self.cajas = cajas = [caja_barrido(s.rect, dx, dy) for s, (dx, dy) in zip(sprites, movs)]
+        else:
+            self.cajas = cajas = [s.rect for s in sprites]
+        self.limite = cajas[0].unionall(cajas) if cajas else None
+        if len(sprites) < self.umbral:
+            self.celdas = None
+            return self
+        # Celda -> índices de los sprites que la ocupan (en orden del grupo)
+        self.celdas = celdas = {}
+        t = self.tam
+        for i, r in enumerate(cajas):
+            # Rects vacíos no ocupan celdas (tampoco chocan con nada)
+            for cx in range(r.left // t, (r.right - 1) // t + 1):
+                for cy in range(r.top // t, (r.bottom - 1) // t + 1):
+                    celda = celdas.get((cx, cy))
+                    if celda is None: celdas[(cx, cy)] = [i]
+                    else: celda.append(i)
+        return self
+
+    def _candidatos(self, caja):
+        """Índices, en orden del grupo, de los sprites cuya caja choca con 'caja'."""
+        cajas = self.cajas
+        if self.limite is None or not self.limite.colliderect(caja): return []
+        if self.celdas is None: return caja.collidelistall(cajas)
+        t = self.tam
+        celdas = self.celdas
+        x0, x1 = caja.left // t, (caja.right - 1) // t
+        y0, y1 = caja.top // t, (caja.bottom - 1) // t
+        choca = caja.colliderect
+        if x0 == x1 and y0 == y1:
+            # Caso común (proyectil chico): una celda, ya en orden y sin repetidos
+            return [i for i in celdas.get((x0, y0), ()) if choca(cajas[i])]
+        res = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for i in celdas.get((cx, cy), ()):
+                    if i not in res and choca(cajas[i]): res.add(i)
+        return sorted(res)
+
+    def consultar(self, sprite, dx=0, dy=0, caja=None):
+        """Sprites del grupo que chocan con 'sprite' (que llegó moviéndose (dx, dy)), en el orden del grupo.
+
+        'caja' es la de caja_broadphase(sprite, dx, dy), si ya se tiene calculada.
+        """
+        vivos = self.grupo.spritedict
+        sprites = self.sprites
+        movs = self.movs if self.barrido else None
+        if caja is None: caja = caja_broadphase(sprite, dx, dy)
+        res = []
+        for i in self._candidatos(caja):
+            s = sprites[i]
+            if s not in vivos: continue
+            if movs is None:
+                if chocan(s, sprite, -dx, -dy): res.append(s)
+            elif chocan(s, sprite, movs[i][0] - dx, movs[i][1] - dy): res.append(s)
+        return res
+
+
+def colisionar_grupos(grupo_a, rejilla_b, dokill_a=False, dokill_b=False):
+    """Equivalente a pygame.sprite.groupcollide(grupo_a, grupo_b, ...) con la rejilla de grupo_b.
+
+    Cada sprite de grupo_a consulta con su forma y su movimiento del tick.
+    """
+    choques = {}
+    consultar = rejilla_b.consultar
+    limite = rejilla_b.limite
+    if limite is None: return choques
+    for a in grupo_a.sprites():
+        r = a.rect
+        previa = getattr(a, 'pos_previa', None)
+        if a.colisionador.forma == HAZ:
+            golpeados = consultar(a)
+        elif previa is None:
+            if not limite.colliderect(r): continue
+            golpeados = consultar(a, 0, 0, r)
+        else:
+            # desplazamiento() en línea: esta es la consulta más repetida del juego
+            cx, cy = r.center
+            dx, dy = cx - previa[0], cy - previa[1]
+            caja = caja_barrido(r, dx, dy)
+            if not limite.colliderect(caja): continue
+            golpeados = consultar(a, dx, dy, caja)
+        if golpeados:
+            if dokill_b:
+                for b in golpeados: b.kill()
+            choques[a] = golpeados
+            if dokill_a: a.kill()
+    return choques
+
+
+def colisionar_barrido(grupo_a, grupo_b):
+    """Equivalente a pygame.sprite.groupcollide(grupo_a, grupo_b) por barrido y poda en x.
+
+    Para dos grupos grandes de cosas chicas (balas contra balas): grupo_b se ordena
+    por borde izquierdo y cada sprite de grupo_a solo prueba la ventana de grupo_b
+    que puede solaparse con él en x (acotada por el ancho máximo de grupo_b). Se
+    usan las cajas del recorrido del tick y se confirma con chocan().
+    """
+    sprites_b = grupo_b.sprites()
+    if not sprites_b: return {}
+    movs_b = [desplazamiento(s) for s in sprites_b]
+    cajas_b = [caja_barrido(s.rect, dx, dy) for s, (dx, dy) in zip(sprites_b, movs_b)]
+    orden = sorted(range(len(sprites_b)), key=lambda i: cajas_b[i].left)
+    cajas = [cajas_b[i] for i in orden]
+    izquierdas = [r.left for r in cajas]
+    ancho_max = max(r.width for r in cajas)
+    choques = {}
+    for a in grupo_a.sprites():
+        dx, dy = desplazamiento(a)
+        caja = caja_broadphase(a, dx, dy)
+        # Solapan en x si b.left < caja.right y b.right > caja.left (=> b.left > caja.left - ancho_max)
+        desde = bisect_left(izquierdas, caja.left - ancho_max + 1)
+        hasta = bisect_left(izquierdas, caja.right)
+        if desde >= hasta: continue
+        tocados = caja.collidelistall(cajas[desde:hasta])
+        if tocados:
+            golpeados = []
+            for i in sorted(orden[desde + k] for k in tocados):
+                b = sprites_b[i]
+                if chocan(b, a, movs_b[i][0] - dx, movs_b[i][1] - dy): golpeados.append(b)
+            if golpeados: choques[a] = golpeados
+    return choques
+
+
+TAM_CELDA_OBJETIVOS = 160
+# Por debajo de esto, recorrer la foto del grupo entera sale más barato que las cubetas
+UMBRAL_OBJETIVOS = 96
+
+
+class IndiceObjetivos:
+    """Vecino más cercano sobre los monstruos vivos, con cubetas de rejilla.
+
+    Se construye como mucho una vez por tick y guarda los rects de cada monstruo
+    (los mismos objetos, así las distancias usan la posición actual). Las cubetas
+    se arman con la posición al construir; el margen cubre lo que un monstruo
+    puede moverse en lo que queda del tick (paso lateral + bajada), así el
+    resultado es el mismo que recorrer el grupo entero.
+    """
+
+    def __init__(self, tam_celda=TAM_CELDA_OBJETIVOS, umbral=UMBRAL_OBJETIVOS):
+        self.tam = tam_celda
+        self.umbral = umbral
+        self.grupo = None
+        self.frame = None
+        self.sprites = []
+        self.rects = []
+        self.celdas = None
+
+    @property
+    def cantidad(self):
+        return len(self.sprites)
+
+    def reconstruir(self, grupo):
+        self.grupo = grupo
+        self.frame = tiempo.frame()
+        self.sprites = sprites = grupo.sprites()
+        self.rects = rects = [m.rect for m in sprites]
+        if not sprites or len(sprites) < self.umbral:
+            self.celdas = None
+            return self
+        # Cubetas: celda -> índices (en orden del grupo) de los monstruos con el centro ahí
+        cubetas = {}
+        t = self.tam
+        for i, r in enumerate(rects):
+            clave = (r.centerx // t, r.centery // t)
+            cubeta = cubetas.get(clave)
+            if cubeta is None: cubetas[clave] = [i]
+            else: cubeta.append(i)
+        # Cada celda se agranda en el margen: nada de lo que contiene puede salir de ahí este tick
+        margen = max(m.desc + abs(m.vel_x) for m in sprites) + 2  # +2: redondeo del rect
+        self.celdas = [(cx * t - margen, (cx + 1) * t + margen, cy * t - margen, (cy + 1) * t + margen, indices)
+                       for (cx, cy), indices in cubetas.items()]
+        return self
+
+    def mas_cercano(self, x, y, ignorar=None, condicion=None, jefe=None):
+        """(objetivo, distancia) más cercano a (x, y), o (None, inf).
+
+        Empates: gana el primero en el orden del grupo; 'jefe' va detrás de todos.
+        """
+        # Se comparan distancias al cuadrado (enteras): mismo orden que math.hypot
+        mejor, d2_mejor = None, math.inf
+        vivos = self.grupo.spritedict if self.grupo is not None else ()
+        sprites, rects = self.sprites, self.rects
+        if self.celdas is None:
+            for i, r in enumerate(rects):
+                dx, dy = r.centerx - x, r.centery - y
+                d2 = dx * dx + dy * dy
+                if d2 < d2_mejor:
+                    m = sprites[i]
+                    if m is ignorar or m not in vivos: continue
+                    if condicion is not None and not condicion(m): continue
+                    mejor, d2_mejor = m, d2
+        else:
+            # Cota inferior (al cuadrado) de cada celda al punto, de la más cercana a la más lejana
+            cotas = []
+            for x0, x1, y0, y1, indices in self.celdas:
+                dx = x0 - x if x < x0 else (x - x1 if x > x1 else 0)
+                dy = y0 - y if y < y0 else (y - y1 if y > y1 else 0)
+                cotas.append((dx * dx + dy * dy, indices))
+            cotas.sort(key=lambda c: c[0])
+            i_mejor = len(sprites)
+            for cota, indices in cotas:
+                if cota > d2_mejor: break
+                for i in indices:
+                    r = rects[i]
+                    dx, dy = r.centerx - x, r.centery - y
+                    d2 = dx * dx + dy * dy
+                    if d2 < d2_mejor or (d2 == d2_mejor and i < i_mejor):
+                        m = sprites[i]
+                        if m is ignorar or m not in vivos: continue
+                        if condicion is not None and not condicion(m): continue
+                        mejor, d2_mejor, i_mejor = m, d2, i
+        if jefe is not None:
+            dx, dy = jefe.rect.centerx - x, jefe.rect.centery - y
+            if dx * dx + dy * dy < d2_mejor: mejor, d2_mejor = jefe, dx * dx + dy * dy
+        return mejor, math.sqrt(d2_mejor)
+
+
+# Consultas x monstruos a partir de las cuales la matriz de NumPy compensa su costo fijo
+UMBRAL_MATRIZ_AREA = 96
+
+
+class ResolutorArea:
+    """Consultas de radio sobre los centros de los monstruos vivos, en lote.
+
+    Como IndiceObjetivos, guarda los rects de cada monstruo una vez por tick. Los
+    lotes grandes salen de una sola matriz de distancias con NumPy (los centros se
+    juntan en arreglos solo la primera vez que hace falta): la matriz preselecciona
+    con el margen de movimiento del tick y cada candidato se confirma con math.hypot
+    y su posición actual, así el resultado es el mismo que recorrer el grupo entero.
+    """
+
+    def __init__(self, umbral=UMBRAL_MATRIZ_AREA):
+        self.umbral = umbral
+        self.grupo = None
+        self.frame = None
+        self.sprites = []
+        self.rects = []
+        self.centros = None
+
+    @property
+    def cantidad(self):
+        return len(self.sprites)
+
+    def reconstruir(self, grupo):
+        self.grupo = grupo
+        self.frame = tiempo.frame()
+        self.sprites = grupo.sprites()
+        self.rects = [m.rect for m in self.sprites]
+        self.centros = None
+        return self
+
+    def _centros(self):
+        if self.centros is None:
+            c = np.array([r.center for r in self.rects], dtype=float).reshape(-1, 2)
+            margen = max(m.desc + abs(m.vel_x) for m in self.sprites) + 2  # +2: redondeo del rect
+            self.centros = (c[:, 0], c[:, 1], margen)
+        return self.centros
+
+    def en_radio_lote(self, consultas):
+        """Para cada (x, y, radio): los monstruos vivos a distancia < radio, en el orden del grupo."""
+        sprites, rects = self.sprites, self.rects
+        if not sprites: return [[] for _ in consultas]
+        vivos = self.grupo.spritedict
+        hypot = math.hypot
+        if np is None or len(consultas) * len(sprites) < self.umbral:
+            res = []
+            for x, y, radio in consultas:
+                # Descarte barato con enteros; el borde exacto lo decide hypot como siempre
+                lim = (radio + 1) ** 2
+                dentro = []
+                for s, r in zip(sprites, rects):
+                    dx, dy = r.centerx - x, r.centery - y
+                    if dx * dx + dy * dy < lim and hypot(dx, dy) < radio and s in vivos: dentro.append(s)
+                res.append(dentro)
+            return res
+        xs, ys, margen = self._centros()
+        q = np.array(consultas, dtype=float)
+        dx = xs[None, :] - q[:, 0:1]
+        dy = ys[None, :] - q[:, 1:2]
+        # nonzero recorre la matriz por filas: cada consulta sale con sus candidatos en orden del grupo
+        filas, columnas = np.nonzero(dx * dx + dy * dy < (q[:, 2:3] + margen) ** 2)
+        res = [[] for _ in consultas]
+        for k, i in zip(filas.tolist(), columnas.tolist()):
+            x, y, radio = consultas[k]
+            r = rects[i]
+            if hypot(r.centerx - x, r.centery - y) < radio and sprites[i] in vivos: res[k].append(sprites[i])
+        return res
+
+    def en_radio(self, x, y, radio):
+        return self.en_radio_lote([(x, y, radio)])[0]
+
+
+def _por_tick(cache, clase, grupo):
+    """Estructura 'clase' del grupo para el tick actual (se reconstruye al cambiar de tick o de cantidad)."""
+    estructura = cache.get(grupo)
+    if estructura is None:
+        estructura = cache[grupo] = clase()
+    frame = tiempo.frame()
+    if frame is None or estructura.frame != frame or len(grupo) != estructura.cantidad:
+        estructura.reconstruir(grupo)
+    return estructura
+
+
+_indices = weakref.WeakKeyDictionary()
+_areas = weakref.WeakKeyDictionary()
+
+
+def indice_objetivos(grupo):
+    """Índice de vecino más cercano del grupo para el tick actual."""
+    return _por_tick(_indices, IndiceObjetivos, grupo)
+
+
+def area_monstruos(grupo):
+    """Resolutor de consultas de radio del grupo para el tick actual."""
+    return _por_tick(_areas, ResolutorArea, grupo)
@@ -0,0 +1,184 @@
+# CONTROLADORES: deciden la entrada del Mago en cada tick (movimiento, disparo, dash)
+# y las elecciones de menú. Juego consulta a self.controlador en vez de leer el
+# teclado directamente, así el mismo juego lo puede manejar una persona, un bot o un replay.
+import math
+import pygame
+from settings import *
+from sprites import EntradaJugador
+
+
+class Controlador:
+    """Interfaz base: sin entrada y sin elecciones automáticas de menú."""
+
+    def procesar_evento(self, ev, juego):
+        pass
+
+    def leer(self, juego):
+        return EntradaJugador()
+
+    def elegir_mejora(self, juego):
+        """Índice 1..3 de la mejora a tomar en ESTADO_SELECCION_MEJORA, o None para esperar."""
+        return None
+
+    def elegir_recompensa_boss(self, juego):
+        """Índice 0.. de la recompensa de jefe, o None para esperar."""
+        return None
+
+    def saltar_transicion(self, juego):
+        return False
+
+
+class ControladorHumano(Controlador):
+    """Teclado (flechas, espacio, shift) más los flags táctiles que mantiene Juego."""
+
+    def __init__(self):
+        self.dash_pedido = False
+
+    def procesar_evento(self, ev, juego):
+        # Solo jugando: un shift en menús o en pausa no debe salir como dash al volver
+        if ev.type == pygame.KEYDOWN and ev.key == pygame.K_LSHIFT and juego.estado == ESTADO_JUGANDO: self.dash_pedido = True
+
+    def leer(self, juego):
+        teclas = pygame.key.get_pressed()
+        mago = juego.mago
+        mov = -1 if teclas[pygame.K_LEFT] else (1 if teclas[pygame.K_RIGHT] else 0)
+        # El táctil tiene prioridad sobre el teclado
+        if mago.mover_izquierda: mov = -1
+        elif mago.mover_derecha: mov = 1
+        dash, self.dash_pedido = self.dash_pedido, False
+        return EntradaJugador(mov, bool(teclas[pygame.K_SPACE] or mago.disparando_tactil), dash)
+
+    # Los menús se eligen con clic, toque o tecla en ejecutar(); Juego guarda la
+    # elección pendiente y se aplica en el próximo update() (así queda grabada)
+    def elegir_mejora(self, juego):
+        indice, juego.mejora_pedida = juego.mejora_pedida, None
+        return indice
+
+    def elegir_recompensa_boss(self, juego):
+        indice, juego.recompensa_pedida = juego.recompensa_pedida, None
+        return indice
+
+    def saltar_transicion(self, juego):
+        saltar, juego.salto_pedido = juego.salto_pedido, False
+        return saltar
+
+
+class ControladorExterno(Controlador):
+    """Entrada fijada desde fuera en cada paso (entornos vectorizados). Menús automáticos."""
+
+    def __init__(self):
+        self.entrada = EntradaJugador()
+
+    def fijar(self, mov=0, disparar=False, dash=False):
+        self.entrada = EntradaJugador(mov, bool(disparar), bool(dash))
+
+    def leer(self, juego):
+        entrada = self.entrada
+        if entrada.dash: self.entrada = entrada._replace(dash=False)  # el dash es un pulso
+        return entrada
+
+    def elegir_mejora(self, juego):
+        return 1
+
+    def elegir_recompensa_boss(self, juego):
+        return 0
+
+    def saltar_transicion(self, juego):
+        return True
+
+
+# Orden de preferencia del piloto automático al elegir mejoras
+PRIORIDAD_MEJORAS = ["multidisparo", "danio", "vel_atk", "perforante", "rebote", "homing_perma",
+                     "proyectil_grande", "fragmentacion_perma", "vida", "hielo_perma", "arco_perma"]
+
+
+class ControladorAutopiloto(Controlador):
+    """Bot de referencia: esquiva balas, láseres y embestidas, se coloca bajo el
+    objetivo sin tapar el tiro con las barreras y elige mejoras por prioridad."""
+
+    HORIZONTE = 45       # ticks hacia adelante que se predicen las balas
+    MARGEN = 10          # px extra alrededor de la hitbox
+    UMBRAL_DASH = 0.5    # peligro inminente a partir del cual usa el dash
+
+    def _peligro(self, juego, mov):
+        """Peligro estimado si el Mago se mueve en dirección mov durante el horizonte."""
+        mago = juego.mago
+        caja = mago.hitbox
+        vel = mago.stats["velocidad_movimiento"]
+        mx, top = caja.centerx, caja.top
+        medio = caja.width / 2 + self.MARGEN
+        peligro = 0.0
+        for p in juego.proyectiles_enemigos:
+            vy = getattr(p, 'vy', 0)
+            if p.rect.top > caja.bottom: continue  # ya pasó
+            if vy <= 0 and p.rect.bottom < top: continue  # no viene hacia nosotros
+            # Ventana de ticks en la que la bala cruza la altura de la hitbox
+            t0 = max(0.0, (top - p.rect.bottom) / vy) if vy > 0 else 0.0
+            t1 = (caja.bottom - p.rect.top) / vy if vy > 0 else 1.0
+            if t0 > self.HORIZONTE: continue
+            vx = getattr(p, 'vx', 0)
+            umbral = medio + p.rect.width / 2
+            d0 = p.rect.centerx + vx * t0 - min(max(mx + mov * vel * t0, 0), ANCHO)
+            d1 = p.rect.centerx + vx * t1 - min(max(mx + mov * vel * t1, 0), ANCHO)
+            # Choque si en algún extremo está dentro o si se cruzan durante la ventana
+            if abs(d0) < umbral or abs(d1) < umbral or (d0 > 0) != (d1 > 0):
+                peligro += 1.0 / (1.0 + t0)
+        x_fut = min(max(mx + mov * vel * 10, 0), ANCHO)
+        for grupo, peso in ((juego.lasers, 2.0), (juego.advertencias, 0.8)):
+            for s in grupo:
+                # Punto donde la línea del láser cruza la altura del Mago
+                rad = math.radians(s.angulo)
+                if math.sin(rad) < 0.05: continue
+                x_l = s.x + (caja.centery - s.y) * math.cos(rad) / math.sin(rad)
+                if abs(x_l - x_fut) < medio + 30:
+                    peligro += peso
+        boss = juego.boss_instancia
+        if boss and getattr(boss, 'embestiendo', False) and abs(boss.rect.centerx - x_fut) < boss.rect.width / 2 + medio:
+            peligro += 2.0
+        return peligro
+
+    def _objetivo_x(self, juego):
+        """X bajo el enemigo más bajo (o el jefe), desplazada fuera de las barreras."""
+        boss = juego.boss_instancia
+        mago = juego.mago
+        if boss and not boss.destruyendo:
+            x = boss.rect.centerx
+        elif juego.monstruos:
+            m = max(juego.monstruos, key=lambda m: (m.rect.bottom, -abs(m.rect.centerx - mago.rect.centerx)))
+            # Adelantar el tiro: dónde estará el monstruo cuando llegue la bala
+            vuelo = (mago.rect.top - m.rect.centery) / max(1.0, mago.stats["velocidad_proyectil"])
+            x = m.rect.centerx + (0 if m.congelado else m.vel_x * m.dir * vuelo)
+        else:
+            return mago.rect.centerx
+        for b in juego.barreras:
+            if b.rect.left - 8 <= x <= b.rect.right + 8:
+                x = b.rect.left - 10 if x - b.rect.left < b.rect.right - x else b.rect.right + 10
+        return min(max(x, 20), ANCHO - 20)
+
+    def leer(self, juego):
+        mago = juego.mago
+        objetivo = self._objetivo_x(juego)
+        dx = objetivo - mago.rect.centerx
+        preferido = 0 if abs(dx) <= mago.stats["velocidad_movimiento"] else (1 if dx > 0 else -1)
+        peligros = {mov: self._peligro(juego, mov) for mov in (preferido, 0, -1, 1)}
+        minimo = min(peligros.values())
+        # Entre las opciones casi igual de seguras se prefiere ir hacia el objetivo
+        mov = next(m for m in (preferido, 0, -1, 1) if peligros[m] <= minimo + 0.05)
+        dash = mov != 0 and peligros[0] > self.UMBRAL_DASH and minimo < peligros[0] and juego.reloj_frame.ahora > mago.dash_cd
+        disparar = True
+        # SNAKE: cargar al máximo y soltar
+        if mago.tipo == "snake" and mago.cargando and mago.carga >= mago.max_carga: disparar = False
+        return EntradaJugador(mov, disparar, dash)
+
+    def elegir_mejora(self, juego):
+        opciones = [o["id"] for o in juego.opciones_mejora_actuales]
+        if not opciones: return None
+        prioridad = PRIORIDAD_MEJORAS
+        if juego.mago.vidas <= 1 and "vida" in opciones: return opciones.index("vida") + 1
+        return min(range(len(opciones)), key=lambda i: prioridad.index(opciones[i]) if opciones[i] in prioridad else len(prioridad)) + 1
+
+    def elegir_recompensa_boss(self, juego):
+        return 0
+
+    def saltar_transicion(self, juego):
+        return True
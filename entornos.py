@@ -0,0 +1,136 @@
+# ENTORNOS VECTORIZADOS: N partidas headless en un solo proceso, avanzadas en paralelo
+# (lockstep) con acciones en lote y observaciones/recompensas en lote.
+# Pensado para entrenar y evaluar pilotos automáticos sin ventana.
+import random
+from settings import *
+from simulacion import crear_juego_headless
+from controladores import ControladorExterno
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Acciones discretas: (movimiento, disparar, dash)
+ACCIONES = [(mov, disp, dash) for dash in (0, 1) for disp in (0, 1) for mov in (-1, 0, 1)]
+
+MAX_BALAS_OBS = 8
+MAX_MONSTRUOS_OBS = 8
+TAMANO_OBS = 9 + MAX_BALAS_OBS * 4 + MAX_MONSTRUOS_OBS * 2 + 2
+
+
+def observar(juego):
+    """Vector de observación de tamaño fijo (TAMANO_OBS) con coordenadas normalizadas."""
+    mago = juego.mago
+    mx, my = mago.rect.centerx, mago.rect.centery
+    ahora = juego.reloj_frame.ahora
+    obs = [
+        mx / ANCHO,
+        mago.vidas / max(1, mago.max_vidas),
+        1.0 if mago.invulnerable or mago.dashing else 0.0,
+        1.0 if ahora > mago.dash_cd else 0.0,
+        mago.carga / mago.max_carga if mago.tipo == "snake" else 0.0,
+    ]
+    boss = juego.boss_instancia
+    if boss and not boss.destruyendo:
+        obs += [1.0, (boss.rect.centerx - mx) / ANCHO, (boss.rect.centery - my) / ALTO, boss.hp / boss.hp_max]
+    else:
+        obs += [0.0, 0.0, 0.0, 0.0]
+
+    # Balas enemigas más cercanas: posición relativa y velocidad
+    balas = sorted(juego.proyectiles_enemigos, key=lambda p: abs(p.rect.centerx - mx) + abs(p.rect.centery - my))
+    for p in balas[:MAX_BALAS_OBS]:
+        obs += [(p.rect.centerx - mx) / ANCHO, (p.rect.centery - my) / ALTO, getattr(p, 'vx', 0) / 10.0, getattr(p, 'vy', 0) / 10.0]
+    obs += [0.0] * (4 * (MAX_BALAS_OBS - min(len(balas), MAX_BALAS_OBS)))
+
+    monstruos = sorted(juego.monstruos, key=lambda m: abs(m.rect.centerx - mx) + abs(m.rect.centery - my))
+    for m in monstruos[:MAX_MONSTRUOS_OBS]:
+        obs += [(m.rect.centerx - mx) / ANCHO, (m.rect.centery - my) / ALTO]
+    obs += [0.0] * (2 * (MAX_MONSTRUOS_OBS - min(len(monstruos), MAX_MONSTRUOS_OBS)))
+
+    obs += [juego.nivel / 10.0, len(juego.monstruos) / float(FILAS_MONSTRUOS * COLUMNAS_MONSTRUOS)]
+    return obs
+
+
+def aplicar_accion(juego, accion):
+    """Traduce una acción (índice de ACCIONES o tupla) a la entrada del controlador externo."""
+    mov, disparar, dash = ACCIONES[accion] if isinstance(accion, int) else accion
+    juego.controlador.fijar(mov, disparar, dash)
+
+
+class EntornoVectorizado:
+    """N juegos headless independientes avanzados en lockstep.
+
+    paso(acciones) devuelve (observaciones, recompensas, terminados, infos); los
+    entornos terminados se reinician solos y la observación final queda en infos.
+    """
+
+    def __init__(self, num_entornos, personajes="MAGO", dificultad=MODO_NORMAL, max_pasos=FPS * 60 * 15, repetir_accion=1, semilla=None):
+        if isinstance(personajes, str): personajes = [personajes] * num_entornos
+        self.personajes = list(personajes)
+        self.dificultad = dificultad
+        self.max_pasos = max_pasos
+        self.repetir_accion = max(1, repetir_accion)
+        if semilla is not None: random.seed(semilla)
+        self.juegos = [crear_juego_headless(ControladorExterno()) for _ in range(num_entornos)]
+        self.pasos = [0] * num_entornos
+        self.retorno = [0.0] * num_entornos
+
+    @property
+    def num_entornos(self):
+        return len(self.juegos)
+
+    def _a_lote(self, filas, tipo=float):
+        if np is not None: return np.asarray(filas, dtype=np.float32 if tipo is float else tipo)
+        return filas
+
+    def _reiniciar_entorno(self, i):
+        j = self.juegos[i]
+        j.activar()
+        j.dificultad = self.dificultad
+        j.iniciar_partida(self.personajes[i])
+        self.pasos[i] = 0
+        self.retorno[i] = 0.0
+        return observar(j)
+
+    def reiniciar(self):
+        return self._a_lote([self._reiniciar_entorno(i) for i in range(self.num_entornos)])
+
+    def paso(self, acciones):
+        observaciones, recompensas, terminados, infos = [], [], [], []
+        for i, j in enumerate(self.juegos):
+            j.activar()
+            puntos, vidas = j.puntuacion, j.mago.vidas
+            aplicar_accion(j, acciones[i])
+            for _ in range(self.repetir_accion):
+                j.update()
+                self.pasos[i] += 1
+                if j.estado in (ESTADO_GAMEOVER, ESTADO_VICTORIA_FINAL): break
+            # Recompensa: puntos ganados, penalización por vida perdida
+            r = (j.puntuacion - puntos) / 100.0 - 5.0 * max(0, vidas - j.mago.vidas)
+            if j.estado == ESTADO_VICTORIA_FINAL: r += 100.0
+            self.retorno[i] += r
+            fin = j.estado in (ESTADO_GAMEOVER, ESTADO_VICTORIA_FINAL) or self.pasos[i] >= self.max_pasos
+            info = {"nivel": j.nivel, "puntuacion": j.puntuacion, "estado": j.estado, "pasos": self.pasos[i]}
+            obs = observar(j)
+            if fin:
+                info["obs_final"] = obs
+                info["retorno"] = self.retorno[i]
+                info["truncado"] = j.estado not in (ESTADO_GAMEOVER, ESTADO_VICTORIA_FINAL)
+                obs = self._reiniciar_entorno(i)
+            observaciones.append(obs); recompensas.append(r); terminados.append(fin); infos.append(info)
+        return self._a_lote(observaciones), self._a_lote(recompensas), self._a_lote(terminados, bool), infos
+
+    def cerrar(self):
+        self.juegos = []
+
+
+if __name__ == "__main__":
+    import time
+    env = EntornoVectorizado(8, personajes=list(CONFIG_PERSONAJES.keys())[:4] * 2, semilla=1)
+    env.reiniciar()
+    inicio, pasos = time.perf_counter(), 2000
+    for _ in range(pasos):
+        env.paso([random.randrange(len(ACCIONES)) for _ in range(env.num_entornos)])
+    seg = time.perf_counter() - inicio
+    print(f"{env.num_entornos} entornos x {pasos} pasos en {seg:.2f}s -> {env.num_entornos * pasos / seg:.0f} pasos/s")
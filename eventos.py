@@ -0,0 +1,86 @@
+# EVENTOS: manejar_colisiones resuelve en el momento lo que cambia la partida (vida,
+# muertes, drops, estados) y deja anotado el resto en Juego.eventos. Al final del tick
+# procesar() reparte el lote entre consumidores separados (puntuación, guardado, sonido,
+# efectos), que pueden agrupar: un solo sonido de cada tipo por frame, un solo guardado.
+from collections import namedtuple
+from settings import *
+from sprites import TextoFlotante, CriticoHit, RayoImpacto
+
+# Golpe: impacto en (x, y). danio es el número a mostrar en (x, y_texto) (None: sin
+# número) y explosion el color de las partículas (None: sin partículas)
+Golpe = namedtuple("Golpe", "x y y_texto danio color tamano critico rayo explosion",
+                   defaults=(None, None, BLANCO, 16, False, False, None))
+# Muerte: enemigo eliminado; puntos y cristales se suman al procesar el lote. color es el
+# de la explosión (None: fuera del presupuesto de efectos del tick)
+Muerte = namedtuple("Muerte", "x y color puntos cristales sonido", defaults=(0, 0, True))
+# Recogida: tipo "xp", "powerup" o "corazon"; sube_nivel si la XP completó un nivel
+Recogida = namedtuple("Recogida", "tipo sube_nivel", defaults=(False,))
+# DanioJugador: el Mago perdió vida; explosion es el color sobre el Mago (None: sin partículas)
+DanioJugador = namedtuple("DanioJugador", "sacudida flash explosion", defaults=(None,))
+JefeDerrotado = namedtuple("JefeDerrotado", "puntos cristales sube_nivel", defaults=(False,))
+
+
+def puntuacion(juego, lote):
+    puntos = sum(ev.puntos for ev in lote if type(ev) in (Muerte, JefeDerrotado))
+    if puntos: juego.puntuacion += puntos
+
+
+def guardado(juego, lote):
+    """Suma cristales y jefes del lote y escribe el archivo de datos una sola vez."""
+    cristales, jefes = 0, 0
+    for ev in lote:
+        if type(ev) is Muerte: cristales += ev.cristales
+        elif type(ev) is JefeDerrotado: cristales += ev.cristales; jefes += 1
+    if not (cristales or jefes): return
+    gestor = juego.gestor_datos
+    if cristales: gestor.agregar_cristales(cristales, guardar=False)
+    for _ in range(jefes): gestor.registrar_boss_kill(guardar=False)
+    gestor.guardar()
+
+
+def audio(juego, lote):
+    """Cada sonido suena como mucho una vez por frame aunque haya varios eventos."""
+    if juego.juego_silenciado: return
+    muerte = nivel = powerup = False
+    for ev in lote:
+        t = type(ev)
+        if t is Muerte: muerte = muerte or ev.sonido
+        elif t is Recogida:
+            nivel = nivel or ev.sube_nivel
+            powerup = powerup or ev.tipo != "xp"
+        elif t is JefeDerrotado: nivel = nivel or ev.sube_nivel
+    if muerte and juego.snd_muerte: juego.snd_muerte.play()
+    if nivel and juego.snd_nivel: juego.snd_nivel.play()
+    if powerup and juego.snd_powerup: juego.snd_powerup.play()
+
+
+def efectos(juego, lote):
+    """Sacudida y destello de pantalla, partículas y textos flotantes."""
+    visuales = juego.efectos_visuales
+    sprites = juego.todos_sprites
+    for ev in lote:
+        t = type(ev)
+        if t is DanioJugador:
+            juego.screen_shake, juego.flash_alpha = ev.sacudida, ev.flash
+            if ev.explosion: juego.explosion_efecto(juego.mago.rect.centerx, juego.mago.rect.top, ev.explosion)
+        elif not visuales: continue
+        elif t is Golpe:
+            if ev.rayo: sprites.add(RayoImpacto(ev.x, ev.y))
+            if ev.critico: sprites.add(CriticoHit(ev.x, ev.y))
+            elif ev.danio is not None:
+                sprites.add(TextoFlotante.nuevo(ev.x, ev.y if ev.y_texto is None else ev.y_texto, str(int(ev.danio)), ev.color, ev.tamano))
+            if ev.explosion: juego.explosion_efecto(ev.x, ev.y, ev.explosion)
+        elif t is Muerte:
+            if ev.color: juego.explosion_efecto(ev.x, ev.y, ev.color)
+            if ev.cristales:
+                sprites.add(TextoFlotante.nuevo(ev.x, ev.y - 20, f"+{ev.cristales}", ORO_PODER if ev.cristales > 1 else CIAN_MAGIA, 18))
+
+
+def procesar(juego):
+    """Vacía juego.eventos pasándolo por todos los consumidores."""
+    if not juego.eventos: return
+    lote, juego.eventos = juego.eventos, []
+    puntuacion(juego, lote)
+    guardado(juego, lote)
+    audio(juego, lote)
+    efectos(juego, lote)
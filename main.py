@@ -7,23 +7,28 @@ import os
 import json
 import webbrowser
 import settings
+import tiempo
+import azar
+from colisiones import RejillaEspacial, colisionar_grupos, colisionar_barrido, colisionar_sprite, area_monstruos, chocan, chocan_barrido, desplazamiento
+import repeticion
+import eventos
+from proyectiles import GrupoProyectiles, nuevo_almacen
+from eventos import Golpe, Muerte, Recogida, DanioJugador, JefeDerrotado
 from settings import *
-from sprites import Mago, Monstruo, PowerUp, Barrera, Particula, Boss, Corazon, ParticulaAmbiental, Proyectil, OrbeXP, Rayo, Orbital, Charco, BossSNAKE, LaserSNAKE, EscudoEspecial, CriticoHit, RayoImpacto, TextoFlotante
+from controladores import ControladorHumano
+from sprites import Mago, Monstruo, PowerUp, Barrera, Particula, Boss, Corazon, ParticulaAmbiental, Proyectil, OrbeXP, Rayo, Orbital, Charco, BossSNAKE, EscudoEspecial, ContextoFrame, Grupo, liberar_reciclados
 
 # Mixer pre-init ajustado para máxima compatibilidad web (22050Hz es más estable para SFX en Emscripten)
 pygame.mixer.pre_init(22050, -16, 2, 1024)
 
 
 # --- HELPER DE COLISION ---
-def collided_hitbox(left, right):
-    rect_left = getattr(left, 'hitbox', left.rect)
-    rect_right = getattr(right, 'hitbox', right.rect)
-    return rect_left.colliderect(rect_right)
-
 class GestorDatos:
-    def __init__(self):
+    def __init__(self, persistir=True):
         self.archivo = resolver_ruta("save_data_rogue.json")
         self.es_web = sys.platform == 'emscripten'
+        # persistir=False: datos solo en memoria (simulaciones, no toca el save real)
+        self.persistir = persistir
         self.datos = {
             "cristales": 0,
             "high_score": 0,
@@ -46,6 +51,7 @@ class GestorDatos:
         self.cargar()
 
     def cargar(self):
+        if not self.persistir: return
         if self.es_web:
             try:
                 import js
@@ -86,6 +92,7 @@ class GestorDatos:
             self.datos["vol_sfx"] = VOLUMEN_SFX_DEFAULT
 
     def guardar(self):
+        if not self.persistir: return
         if self.es_web:
             try:
                 import js
@@ -117,13 +124,13 @@ class GestorDatos:
         }
         self.guardar()
 
-    def agregar_cristales(self, cantidad):
+    def agregar_cristales(self, cantidad, guardar=True):
         self.datos["cristales"] += cantidad
-        self.guardar()
+        if guardar: self.guardar()
 
-    def registrar_boss_kill(self):
+    def registrar_boss_kill(self, guardar=True):
         self.datos["boss_kills"] += 1
-        self.guardar()
+        if guardar: self.guardar()
     
     def comprar_mejora(self, clave):
         if clave not in self.datos["mejoras"]: return False
@@ -275,26 +282,51 @@ class GestorDatos:
                 traceback.print_exc()
 
 class Juego:
-    def __init__(self):
+    def __init__(self, headless=False):
+        # HEADLESS: sin ventana ni audio (drivers dummy de SDL), para simulaciones rapidas
+        self.headless = headless
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
         pygame.init()
-        try: 
-            pygame.mixer.init(22050, -16, 2, 1024)
-            pygame.mixer.set_num_channels(32)
-        except: pass
+        if not headless:
+            try: 
+                pygame.mixer.init(22050, -16, 2, 1024)
+                pygame.mixer.set_num_channels(32)
+            except: pass
 
-        self.pantalla = pygame.display.set_mode((ANCHO, ALTO))
+        # convert()/convert_alpha() necesitan un modo de video, tambien en headless (display dummy)
+        self.pantalla = pygame.display.get_surface() if headless and pygame.display.get_surface() else pygame.display.set_mode((ANCHO, ALTO))
         pygame.display.set_caption("Mago Defence Roguelite")
         self.reloj = pygame.time.Clock()
+        # Efectos puramente visuales (partículas, textos de daño, ambiente); usan azar.fx,
+        # así que apagarlos no cambia la simulación
+        self.efectos_visuales = not headless
+        # Reloj de frame: cada update() es un tick fijo de PASO_SIMULACION_MS
+        self.reloj_frame = tiempo.RelojFrame(paso_ms=PASO_SIMULACION_MS)
+        self.flujos_azar = azar.Flujos()  # azar.sim / azar.fx propios de este juego
+        self.activar()
+        self.ticks_simulacion = 0
+        # Telemetría de frame-skip
+        self.frames_saltados_ultimo = 0   # dibujados omitidos en el último frame
+        self.frames_saltados_total = 0
+        self.ticks_descartados_total = 0  # ticks perdidos (MAX_FRAMES_SALTADOS o tope del acumulador)
+        self.posiciones_previas = {}  # sprite -> topleft del tick anterior (interpolación)
+        # Broadphase de colisiones: una rejilla por grupo objetivo, reconstruida cada frame
+        self.rejilla_monstruos = RejillaEspacial()
+        self.rejilla_barreras = RejillaEspacial()
+        self.rejilla_balas_enemigas = RejillaEspacial(barrido=True)
         self.fuente_lg = pygame.font.SysFont("Arial", 48, True)
         self.fuente_md = pygame.font.SysFont("Arial", 26, True)
         self.fuente_sm = pygame.font.SysFont("Arial", 18, True)
         self.fuente_xs = pygame.font.SysFont("Arial", 16, True) 
         
-        self.gestor_datos = GestorDatos()
+        self.gestor_datos = GestorDatos(persistir=not headless)
         self.estado = ESTADO_MENU
         self.tiempo_estado_inicio = 0
         self.screen_shake = 0
         self.flash_alpha = 0
+        self.eventos = []  # búfer del tick (ver eventos.py)
         self.notificacion_powerup = None
         self.tiempo_notificacion_powerup = 0
 
@@ -304,8 +336,16 @@ class Juego:
         self.dificultad = MODO_NORMAL
 
         self.tipo_personaje_seleccionado = "MAGO"
+        # Quién decide la entrada del Mago y los menús (persona, bot o replay)
+        self.controlador = ControladorHumano()
+        # Elecciones de menú pendientes (clic/toque/tecla); ControladorHumano las entrega en update()
+        self.mejora_pedida = None
+        self.recompensa_pedida = None
+        self.salto_pedido = False
+        self.semilla_partida = None
+        self.grabacion = None  # repeticion.Grabacion de la partida en curso
         self.toques_activos = {}
-        self.controles_tactiles_activados = self.detectar_dispositivo_tactil()
+        self.controles_tactiles_activados = False if headless else self.detectar_dispositivo_tactil()
 
         self.es_dispositivo_tactil = self.controles_tactiles_activados
         self.ha_intentado_spawn_tesoro = False
@@ -388,7 +428,7 @@ class Juego:
         self.rect_debug_boss10 = pygame.Rect(ANCHO//2 + 70, start_y + gap*8.8, btn_w_small, 35)
 
         self.snd_disparo, self.snd_muerte, self.snd_powerup, self.snd_nivel = None, None, None, None
-        self.cargar_recursos()
+        if not headless: self.cargar_recursos()
         self.fondo_img = None
         self.cargar_fondo()
         self.boss_instancia = None
@@ -398,8 +438,8 @@ class Juego:
         self.niebla_capas = []
         for i in range(3):
             self.niebla_capas.append({
-                'x': random.randint(0, ANCHO), 'y': random.randint(50, ALTO-100), 
-                'vel': random.uniform(0.1, 0.4), 'ancho': random.randint(300, 600)
+                'x': azar.fx.randint(0, ANCHO), 'y': azar.fx.randint(50, ALTO-100), 
+                'vel': azar.fx.uniform(0.1, 0.4), 'ancho': azar.fx.randint(300, 600)
             })
         self.particulas_ambiente = pygame.sprite.Group()
         self.opciones_mejora_actuales = [] 
@@ -634,9 +674,6 @@ class Juego:
             self.mago.mover_derecha = False
         if not hay_toque_disparo:
             self.mago.disparando_tactil = False
-            # Para Snake: liberar carga cuando se suelta el dedo del disparo
-            if self.mago.tipo == "snake" and self.mago.cargando:
-                self.mago.liberar_carga(self.proyectiles_mago)
 
     def cargar_fondo(self):
         try:
@@ -646,16 +683,22 @@ class Juego:
         except: pass
 
     def inicializar_grupos(self):
-        self.todos_sprites = pygame.sprite.Group()
-        self.monstruos = pygame.sprite.Group()
-        self.proyectiles_mago = pygame.sprite.Group()
-        self.proyectiles_enemigos = pygame.sprite.Group()
+        self.todos_sprites = Grupo()
+        self.monstruos = Grupo()
+        # Las balas de ambos bandos se mueven juntas en un solo almacén (proyectiles.py)
+        self.almacen_proyectiles = nuevo_almacen()
+        self.proyectiles_mago = GrupoProyectiles(self.almacen_proyectiles)
+        self.proyectiles_enemigos = GrupoProyectiles(self.almacen_proyectiles)
         self.powerups = pygame.sprite.Group()
         self.corazones = pygame.sprite.Group()
         self.barreras = pygame.sprite.Group()
-        self.particulas = pygame.sprite.Group()
-        self.orbes_xp = pygame.sprite.Group()
+        self.particulas = Grupo()
+        self.orbes_xp = Grupo()
         self.charcos = pygame.sprite.Group()
+        # Registros por tipo, al día al crear y con kill(): cada pasada recorre solo lo suyo
+        self.jefes = pygame.sprite.Group()
+        self.lasers = pygame.sprite.Group()
+        self.advertencias = pygame.sprite.Group()
         self.mago = Mago(self.todos_sprites, self.proyectiles_mago, self.snd_disparo, "MAGO")
         self.todos_sprites.add(self.mago)
 
@@ -663,12 +706,21 @@ class Juego:
         self.dificultad = diff
         self.estado = ESTADO_SELECCION_PERSONAJE
 
-    def iniciar_partida(self, tipo_personaje):
+    def iniciar_partida(self, tipo_personaje, semilla=None):
         self.tipo_personaje_seleccionado = tipo_personaje
-        self.puntuacion = 0
+        # Semilla propia de la partida: con ella y la entrada grabada la partida se repite exacta
+        self.semilla_partida = random.randrange(2 ** 31) if semilla is None else semilla
+        self.activar()
+        self.flujos_azar.sembrar(self.semilla_partida)
+        self.mejora_pedida, self.recompensa_pedida, self.salto_pedido = None, None, False
+        self.puntuacion, self.eventos = 0, []
         self.nivel = settings.DEBUG_NIVEL_INICIO if settings.DEBUG_MODE else 1
         self.tiempo_sin_powerup = 0
         self.ultimo_spawn_powerup_cielo = 0
+        # Estadísticas de la partida (balanceo): cristales ganados y segundos por jefe
+        self.cristales_inicio_partida = self.gestor_datos.datos["cristales"]
+        self.tiempos_boss = []
+        self.tick_inicio_boss = 0
         self.inicializar_grupos()
         self.mago.kill() 
         mejoras = self.gestor_datos.datos["mejoras"]
@@ -678,8 +730,10 @@ class Juego:
         self.crear_barreras(); self.crear_horda()
         self.estado = ESTADO_JUGANDO
         self.fondo_cache = None 
+        if GRABAR_PARTIDAS and not self.headless and not self.gestor_datos.es_web:
+            self.empezar_grabacion(tipo_personaje)
         try:
-            if not self.juego_silenciado: pygame.mixer.music.play(-1)
+            if not self.juego_silenciado and not self.headless: pygame.mixer.music.play(-1)
         except: pass
 
     def crear_barreras(self):
@@ -720,21 +774,22 @@ class Juego:
             if self.nivel == 10:
                 # BOSS FINAL: SNAKE ASTRAL (Sustituye al boss normal en nivel 10)
                 # Asegurar que no quede ningún boss anterior
-                for sprite in self.todos_sprites:
-                    if isinstance(sprite, (Boss, BossSNAKE)):
-                        sprite.kill()
-                self.boss_instancia = BossSNAKE(self.dificultad, self.nivel)
-                self.todos_sprites.add(self.boss_instancia)
+                for sprite in self.jefes:
+                    sprite.kill()
+                self.boss_instancia = BossSNAKE(self.dificultad, self.nivel, self.lasers, self.advertencias)
+                self.tick_inicio_boss = self.ticks_simulacion
+                self.todos_sprites.add(self.boss_instancia); self.jefes.add(self.boss_instancia)
             else:
                 # Lógica de variantes: Solo en Difícil
                 if self.dificultad == MODO_NORMAL:
                     variante = BOSS_TIPO_NORMAL
                 else:
                     # En difícil, cualquier boss (incluso el primero) puede ser variante
-                    variante = random.choice([BOSS_TIPO_HIELO, BOSS_TIPO_TOXICO, BOSS_TIPO_FUEGO, BOSS_TIPO_NORMAL])
+                    variante = azar.sim.choice([BOSS_TIPO_HIELO, BOSS_TIPO_TOXICO, BOSS_TIPO_FUEGO, BOSS_TIPO_NORMAL])
                 
                 self.boss_instancia = Boss(self.nivel, self.dificultad, variante)
-                self.todos_sprites.add(self.boss_instancia)
+                self.tick_inicio_boss = self.ticks_simulacion
+                self.todos_sprites.add(self.boss_instancia); self.jefes.add(self.boss_instancia)
         else:
             self.boss_instancia = None
             vx = (VEL_MONSTRUO_BASE_X + (self.nivel * INCREMENTO_VEL_X_POR_NIVEL)) * (MULT_VEL_DIFICIL if self.dificultad == MODO_DIFICIL else 1)
@@ -749,7 +804,7 @@ class Juego:
             for f in range(FILAS_MONSTRUOS):
                 for c in range(COLUMNAS_MONSTRUOS):
                     tipo = TIPO_ENEMIGO_NORMAL
-                    roll = random.random()
+                    roll = azar.sim.random()
                     if self.nivel >= 3 and roll < 0.2: tipo = TIPO_ENEMIGO_RAPIDO
                     elif self.nivel >= 5 and roll < 0.05: tipo = TIPO_ENEMIGO_ELITE
                     elif self.nivel >= 6 and roll < 0.1: tipo = TIPO_ENEMIGO_TANQUE
@@ -757,8 +812,12 @@ class Juego:
                     self.todos_sprites.add(m); self.monstruos.add(m)
 
     def cambiar_estado(self, nuevo_estado):
+        # Los puntos y cristales pendientes del tick cuentan para el récord y la grabación
+        eventos.procesar(self)
         self.estado = nuevo_estado
-        self.tiempo_estado_inicio = pygame.time.get_ticks()
+        self.tiempo_estado_inicio = tiempo.ahora()
+        if self.grabacion and nuevo_estado in (ESTADO_GAMEOVER, ESTADO_VICTORIA_FINAL, ESTADO_MENU):
+            self.terminar_grabacion()
         # Resetear efectos visuales al volver al menú
         if nuevo_estado == ESTADO_MENU:
             self.flash_alpha = 0
@@ -775,6 +834,24 @@ class Juego:
         elif nuevo_estado == ESTADO_MENU:
             self.verificar_desbloqueos()
 
+    def empezar_grabacion(self, tipo_personaje):
+        """Empieza a grabar la partida recién iniciada envolviendo al controlador actual."""
+        base = self.controlador.base if self.grabacion else self.controlador
+        self.grabacion = repeticion.Grabacion.desde_juego(self, tipo_personaje, self.semilla_partida)
+        self.controlador = repeticion.ControladorGrabador(base, self.grabacion, self.ticks_simulacion)
+        return self.grabacion
+
+    def terminar_grabacion(self):
+        """Cierra la grabación en curso; fuera de headless la guarda en CARPETA_REPETICIONES."""
+        if not self.grabacion: return None
+        grabacion, self.grabacion = self.grabacion, None
+        grabacion.cerrar(self, self.ticks_simulacion - self.controlador.tick_inicio)
+        self.controlador = self.controlador.base
+        if not self.headless:
+            try: grabacion.guardar(repeticion.ruta_nueva(grabacion.personaje, grabacion.semilla))
+            except Exception as e: print(f"Error guardando repetición: {e}")
+        return grabacion
+
     def verificar_desbloqueos(self):
         """Verifica y activa el desbloqueo de personajes según las condiciones."""
         hubo_cambio = False
@@ -784,7 +861,7 @@ class Juego:
         if (self.nivel >= 10 or self.mago.nivel_run >= 10) and not self.gestor_datos.datos.get("unlocked_loco", False):
             self.gestor_datos.datos["unlocked_loco"] = True
             self.notificacion_powerup = "¡EL LOCO DESBLOQUEADO!"
-            self.tiempo_notificacion_powerup = pygame.time.get_ticks()
+            self.tiempo_notificacion_powerup = tiempo.ahora()
             hubo_cambio = True
 
         # SNAKE: Se desbloquea al vencer al boss final en difícil
@@ -843,7 +920,7 @@ class Juego:
             self.mago.shield_regen_cd = 16000  # 16 segundos de cooldown
             self.todos_sprites.add(self.mago.escudo_especial)
             self.notificacion_powerup = "ESPEJO ARCANO DESBLOQUEADO!"
-            self.tiempo_notificacion_powerup = pygame.time.get_ticks()
+            self.tiempo_notificacion_powerup = tiempo.ahora()
         elif tid == "unlock_furia_ignea":
             self.mago.furia_ignea = True
             self.mago.skill_burn = True
@@ -851,7 +928,7 @@ class Juego:
             self.mago.burn_exp_radius = 100
             self.mago.burn_duration = 5000  # 5 segundos
             self.notificacion_powerup = "FURIA IGNEA DESBLOQUEADA!"
-            self.tiempo_notificacion_powerup = pygame.time.get_ticks()
+            self.tiempo_notificacion_powerup = tiempo.ahora()
         elif tid == "unlock_tirador_sombra":
             self.mago.tirador_sombra = True
             self.mago.skill_pierce = True
@@ -859,17 +936,17 @@ class Juego:
             self.mago.pierce_count = 999  # Atraviesa todos
             self.mago.stats["chance_critico"] += 0.15  # +15% crit
             self.notificacion_powerup = "TIRADOR DE SOMBRA DESBLOQUEADO!"
-            self.tiempo_notificacion_powerup = pygame.time.get_ticks()
+            self.tiempo_notificacion_powerup = tiempo.ahora()
         elif tid == "unlock_tormenta_caos":
             self.mago.stats["danio_multi"] += 1.0  # +1 punto de dano
             self.notificacion_powerup = "FUERZA BRUTA DESBLOQUEADA!"
-            self.tiempo_notificacion_powerup = pygame.time.get_ticks()
+            self.tiempo_notificacion_powerup = tiempo.ahora()
         elif tid == "unlock_serpentina":
             self.mago.max_vidas += 1
             self.mago.vidas = self.mago.max_vidas  # Cura completa
             self.mago.stats["velocidad_ataque_multi"] *= 0.5  # Duplicar velocidad de disparo (reducir intervalo)
             self.notificacion_powerup = "SANGRE DE SERPIENTE DESBLOQUEADA!"
-            self.tiempo_notificacion_powerup = pygame.time.get_ticks()
+            self.tiempo_notificacion_powerup = tiempo.ahora()
         
         if hasattr(self, 'xp_pendiente_boss') and self.xp_pendiente_boss > 0:
             if self.mago.ganar_xp(self.xp_pendiente_boss):
@@ -884,7 +961,7 @@ class Juego:
 
     def manejar_colisiones(self):
         if self.estado != ESTADO_JUGANDO: return
-        ahora, md = pygame.time.get_ticks(), 2 if self.mago.doble_danio_activo else 1
+        ahora, md = tiempo.ahora(), 2 if self.mago.doble_danio_activo else 1
         
         # OPTIMIZACIÓN: Contador de frames para limitar efectos visuales pesados
         if not hasattr(self, '_colision_frame_counter'):
@@ -892,20 +969,35 @@ class Juego:
         self._colision_frame_counter += 1
         # Solo mostrar textos flotantes cada 3 frames para reducir carga
         mostrar_texto_danio = (self._colision_frame_counter % 3 == 0)
+
+        # BROADPHASE: todas las pasadas consultan estas rejillas en vez de comparar grupo x grupo
+        rej_monstruos = self.rejilla_monstruos.reconstruir(self.monstruos)
+        rej_barreras = self.rejilla_barreras.reconstruir(self.barreras)
+        rej_balas_e = self.rejilla_balas_enemigas.reconstruir(self.proyectiles_enemigos)
         
         # Mago recoge XP
         # Mago recoge XP
-        for orbe in pygame.sprite.spritecollide(self.mago, self.orbes_xp, True, collided=collided_hitbox):
-            if self.mago.ganar_xp(orbe.valor):
-                 self.cambiar_estado(ESTADO_SELECCION_MEJORA)
-                 if self.snd_nivel and not self.juego_silenciado: self.snd_nivel.play()
-
-        impactos = pygame.sprite.groupcollide(self.proyectiles_mago, self.monstruos, False, False)
+        for orbe in colisionar_sprite(self.mago, self.orbes_xp, True):
+            sube = self.mago.ganar_xp(orbe.valor)
+            self.eventos.append(Recogida("xp", sube))
+            if sube: self.cambiar_estado(ESTADO_SELECCION_MEJORA)
+
+        # DAÑO ACUMULADO: los golpes del tick se suman por enemigo (daño, última fuente) y
+        # resolver_muertes() aplica el total y resuelve cada muerte una sola vez
+        danio_frame = {}
+        impactos = colisionar_grupos(self.proyectiles_mago, rej_monstruos)
         for bala, enemigos in impactos.items():
             es_rayo = getattr(bala, 'es_rayo', False)
             es_hielo = getattr(bala, 'es_hielo', False)
             es_frag = getattr(bala, 'es_fragmentacion', False)
             penetracion = getattr(bala, 'penetracion', 0)
+            # REGISTRO DE GOLPES: una bala perforante que sigue encima del mismo enemigo no
+            # vuelve a pegarle ni gasta penetración; el haz de SNAKE sí daña en cada frame
+            atacados = bala.enemigos_atacados
+            continuo = getattr(bala, 'es_rayo_player', False)
+            if not continuo:
+                enemigos = [e for e in enemigos if e not in atacados]
+                if not enemigos: continue
             
             if not es_rayo:
                 if penetracion <= 0:
@@ -923,111 +1015,55 @@ class Juego:
                 else: bala.penetracion -= 1
             
             for e in enemigos:
+                primera = e not in atacados
+                if primera: atacados.add(e)
                 # Burn Logic
                 if getattr(bala, 'es_quemadura', False):
                      e.quemado = True
-                     e.quemado_timer = pygame.time.get_ticks()
-                     e.ultimo_dano_quemadura = pygame.time.get_ticks()
+                     e.quemado_timer = ahora
+                     e.ultimo_dano_quemadura = ahora
                      # FURIA ÍGNEA: Marcar el enemigo para propagar quemadura si muere
                      if getattr(bala, 'furia_ignea', False):
                          e.furia_ignea_activa = True
 
-                e.hp -= bala.danio
+                acumulado = danio_frame.get(e)
+                if acumulado is None: danio_frame[e] = [bala.danio, bala]
+                else: acumulado[0] += bala.danio; acumulado[1] = bala
                 if es_hielo: e.congelar()
                 
-                # Feedback visual para daño de rayo
-                if es_rayo:
-                    impacto = RayoImpacto(e.rect.centerx, e.rect.centery)
-                    self.todos_sprites.add(impacto)
-                
-                if getattr(bala, 'es_critico', False):
-                    critico = CriticoHit(e.rect.centerx, e.rect.centery)
-                    self.todos_sprites.add(critico)
-                elif mostrar_texto_danio:
-                    # OPTIMIZACIÓN: Solo mostrar texto de daño cada 3 frames
-                    tf = TextoFlotante(e.rect.centerx, e.rect.top, str(int(bala.danio)), BLANCO, 16)
-                    self.todos_sprites.add(tf)
-                
-                if e.hp <= 0:
-                    # FURIA ÍGNEA: Si el enemigo murió por quemadura, propaga a cercanos
-                    if getattr(e, 'murio_por_quemadura', False):
-                        e.propagar_quemadura(self.monstruos)
-                        self.explosion_efecto(e.rect.centerx, e.rect.centery, NARANJA_FUEGO)
-                    
-                    # Pyromancer Check (daño de explosión por quemadura)
-                    if getattr(e, 'quemado', False) and not e.murio_por_quemadura:
-                        for m2 in self.monstruos:
-                             if m2 != e and math.hypot(m2.rect.centerx - e.rect.centerx, m2.rect.centery - e.rect.centery) < self.mago.burn_exp_radius:
-                                 m2.hp -= bala.danio * self.mago.burn_exp_damage
-                                 self.explosion_efecto(m2.rect.centerx, m2.rect.centery, NARANJA_FUEGO)
-
-                    if e.congelado:
-                        for i in range(8):
-                            rad = math.radians(i * 45); vx_f, vy_f = math.cos(rad) * 7.5, math.sin(rad) * 7.5
-                            frag = Proyectil(e.rect.centerx, e.rect.centery, vx_f, vy_f, 5, color=BLANCO_HIELO, es_hielo=False) 
-                            self.todos_sprites.add(frag); self.proyectiles_mago.add(frag)
-                        self.explosion_efecto(e.rect.centerx, e.rect.centery, BLANCO_HIELO)
-                    pts = PUNTOS_POR_FILA.get(e.fila_original, 100)
-                    if e.tipo == TIPO_ENEMIGO_ELITE: pts *= 3
-                    self.puntuacion += pts
-                    self.explosion_efecto(e.rect.centerx, e.rect.centery, e.color)
-                    
-                    # Soltar XP (con límite máximo para evitar acumulación)
-                    max_orbes = 30
-                    if len(self.orbes_xp) >= max_orbes:
-                        # Auto-recoger orbes más antiguos cuando hay demasiados
-                        orbes_list = list(self.orbes_xp)
-                        for viejo_orbe in orbes_list[:5]:
-                            if self.mago.ganar_xp(viejo_orbe.valor):
-                                self.cambiar_estado(ESTADO_SELECCION_MEJORA)
-                                if self.snd_nivel and not self.juego_silenciado: 
-                                    self.snd_nivel.play()
-                            viejo_orbe.kill()
-                    
-                    xp = OrbeXP(e.rect.centerx, e.rect.centery)
-                    self.todos_sprites.add(xp)
-                    self.orbes_xp.add(xp)
-                    
-                    drop_cristal = False; cant_cristal = 0
-                    if e.tipo == TIPO_ENEMIGO_TESORO: drop_cristal = True; cant_cristal = 5
-                    elif e.tipo == TIPO_ENEMIGO_ELITE: drop_cristal = True; cant_cristal = 2
-                    elif random.random() < 0.02: drop_cristal = True; cant_cristal = 1
-                    if drop_cristal:
-                        self.gestor_datos.agregar_cristales(cant_cristal)
-                        color_txt = ORO_PODER if cant_cristal > 1 else CIAN_MAGIA
-                        self.dibujar_texto(f"+{cant_cristal}", self.fuente_sm, color_txt, e.rect.centerx, e.rect.centery - 20)
-                    if self.snd_muerte and not self.juego_silenciado: self.snd_muerte.play()
-                    self.drop_powerup_enemigo(e.rect.centerx, e.rect.centery, ahora); e.kill()
+                # OPTIMIZACIÓN: Solo mostrar texto de daño cada 3 frames
+                critico = getattr(bala, 'es_critico', False)
+                if primera and (es_rayo or critico or mostrar_texto_danio):
+                    self.eventos.append(Golpe(e.rect.centerx, e.rect.centery, e.rect.top, bala.danio if mostrar_texto_danio else None, critico=critico, rayo=es_rayo))
         
         if self.mago.orbital_activo:
-            impactos_orb = pygame.sprite.groupcollide(self.mago.orbitales_grupo, self.monstruos, False, False)
+            impactos_orb = colisionar_grupos(self.mago.orbitales_grupo, rej_monstruos)
             for orb, enemigos in impactos_orb.items():
                 for e in enemigos:
-                     if random.random() < 0.1: self.explosion_efecto(e.rect.centerx, e.rect.centery, ROJO_ORBITAL)
-                     e.hp -= orb.danio * 0.2 
-                     # Floating Text for orbital
-                     if random.random() < 0.3: # Reduce spam
-                        tf = TextoFlotante(e.rect.centerx, e.rect.top, str(int(orb.danio * 0.2)), ROJO_ORBITAL, 12)
-                        self.todos_sprites.add(tf)
-
-                     if e.hp <= 0:
-                         self.puntuacion += 10
-                         self.explosion_efecto(e.rect.centerx, e.rect.centery, e.color)
-                         e.kill()
-            
+                     # Si también le dio una bala, la muerte cuenta como de bala
+                     danio_frame.setdefault(e, [0, orb])[0] += orb.danio * 0.2
+                     if self.efectos_visuales:
+                         explota = azar.fx.random() < 0.1
+                         texto = azar.fx.random() < 0.3  # Reduce spam
+                         if explota or texto:
+                             self.eventos.append(Golpe(e.rect.centerx, e.rect.centery, e.rect.top, orb.danio * 0.2 if texto else None, ROJO_ORBITAL, 12, explosion=ROJO_ORBITAL if explota else None))
+
+        if danio_frame: self.resolver_muertes(danio_frame, ahora)
+
+        if self.mago.orbital_activo:
             # Colisión de orbitales con proyectiles enemigos (ESCUDO)
-            impactos_orb_proyectiles = pygame.sprite.groupcollide(self.mago.orbitales_grupo, self.proyectiles_enemigos, False, True)
+            impactos_orb_proyectiles = colisionar_grupos(self.mago.orbitales_grupo, rej_balas_e, dokill_b=True)
             for orb, proyectiles in impactos_orb_proyectiles.items():
                 for p in proyectiles:
-                    self.explosion_efecto(p.rect.centerx, p.rect.centery, ROJO_ORBITAL)
+                    self.eventos.append(Golpe(p.rect.centerx, p.rect.centery, explosion=ROJO_ORBITAL))
 
-        impactos_bar_mago = pygame.sprite.groupcollide(self.proyectiles_mago, self.barreras, False, False)
+        impactos_bar_mago = colisionar_grupos(self.proyectiles_mago, rej_barreras)
         for bala, barreras_golpeadas in impactos_bar_mago.items():
             es_rayo = getattr(bala, 'es_rayo', False)
             if not es_rayo: bala.kill(); [b.recibir_danio() for b in barreras_golpeadas]
 
         if self.boss_instancia and not self.boss_instancia.destruyendo: 
-            h = pygame.sprite.spritecollide(self.boss_instancia, self.proyectiles_mago, False) 
+            h = pygame.sprite.spritecollide(self.boss_instancia, self.proyectiles_mago, False, collided=chocan_barrido)
             for b in h:
                 if not self.boss_instancia: break  # Verificar que el boss siga existiendo
                 es_rayo = getattr(b, 'es_rayo', False)
@@ -1039,20 +1075,22 @@ class Juego:
                     danio = 15 if es_rayo else b.danio
                 self.boss_instancia.hp -= danio
                 
-                # Floating Text Boss
-                tf = TextoFlotante(self.boss_instancia.rect.centerx + random.randint(-40, 40), self.boss_instancia.rect.centery + random.randint(-20, 20), str(int(danio)), ORO_PODER if es_rayo else BLANCO, 24 if es_rayo else 18)
-                self.todos_sprites.add(tf)
+                # Rayos y haces siguen dañando mientras lo tocan; el impacto se muestra solo al entrar
+                if self.boss_instancia not in b.enemigos_atacados:
+                    b.enemigos_atacados.add(self.boss_instancia)
+                    # Floating Text Boss
+                    if self.efectos_visuales:
+                        self.eventos.append(Golpe(self.boss_instancia.rect.centerx + azar.fx.randint(-40, 40), self.boss_instancia.rect.centery + azar.fx.randint(-20, 20), danio=danio, color=ORO_PODER if es_rayo else BLANCO, tamano=24 if es_rayo else 18))
+                    self.eventos.append(Golpe(b.rect.centerx, b.rect.centery, explosion=MORADO_OSCURO))
 
                 if es_hielo: self.boss_instancia.congelar()
-                self.explosion_efecto(b.rect.centerx, b.rect.centery, MORADO_OSCURO)
                 if self.boss_instancia.hp <= 0:
                     # FIX: Guardar referencia local y limpiar inmediatamente para evitar condiciones de carrera
                     boss_local = self.boss_instancia
                     self.boss_instancia = None  # Limpiar referencia inmediatamente
+                    self.tiempos_boss.append((self.nivel, (self.ticks_simulacion - self.tick_inicio_boss) * PASO_SIMULACION_MS / 1000.0))
                     
-                    self.puntuacion += 2000 * (self.nivel // FRECUENCIA_BOSS)
-                    self.gestor_datos.agregar_cristales(10) 
-                    self.gestor_datos.registrar_boss_kill() 
+                    puntos_boss = 2000 * (self.nivel // FRECUENCIA_BOSS)
                     
                     # Limpiar charcos del boss
                     [c.kill() for c in self.charcos]
@@ -1060,12 +1098,11 @@ class Juego:
                     # Victoria final - Boss SNAKE nivel 10
                     if self.nivel == 10 and isinstance(boss_local, BossSNAKE):
                         boss_local.kill()
-                        self.gestor_datos.agregar_cristales(100)
-                        # DESBLOQUEO DE PERSONAJES
+                        self.eventos.append(JefeDerrotado(puntos_boss, 10 + 100))
+                        # DESBLOQUEO DE PERSONAJES (se guardan con el lote de eventos al cambiar de estado)
                         self.gestor_datos.datos["unlocked_loco"] = True
                         if self.dificultad == MODO_DIFICIL:
                             self.gestor_datos.datos["unlocked_snake"] = True
-                        self.gestor_datos.guardar()
                         self.verificar_desbloqueos() # Notificaciones
                         self.clicks_victoria = 0
                         self.cambiar_estado(ESTADO_VICTORIA_FINAL)
@@ -1073,6 +1110,7 @@ class Juego:
                     elif self.nivel == 5:
                         # BOSS NIVEL 5: Recompensa especial
                         boss_local.kill()
+                        self.eventos.append(JefeDerrotado(puntos_boss, 10))
                         # CAMBIO: Llamar a recompensar ANTES de subir el nivel para que detecte nivel 5
                         self.recompensar_boss()
                         self.nivel += 1
@@ -1081,9 +1119,10 @@ class Juego:
                         # BOSS periodico normal: dar XP directo y avanzar
                         boss_local.kill()
                         xp_boss = (FILAS_MONSTRUOS * COLUMNAS_MONSTRUOS * XP_POR_ENEMIGO) // 2
-                        if self.mago.ganar_xp(xp_boss):
+                        sube = self.mago.ganar_xp(xp_boss)
+                        self.eventos.append(JefeDerrotado(puntos_boss, 10, sube))
+                        if sube:
                             self.cambiar_estado(ESTADO_SELECCION_MEJORA)
-                            if self.snd_nivel and not self.juego_silenciado: self.snd_nivel.play()
                         else:
                             self.nivel += 1; self.cambiar_estado(ESTADO_TRANSICION)
                         if self.mago.vidas < self.mago.max_vidas: self.mago.vidas += 1
@@ -1091,7 +1130,7 @@ class Juego:
         # NOTA: La muerte del boss ahora se maneja inmediatamente arriba con return
         # Este código ya no es necesario y podría causar condiciones de carrera
 
-        impactos_bar_enemigo = pygame.sprite.groupcollide(self.proyectiles_enemigos, self.barreras, False, False)
+        impactos_bar_enemigo = colisionar_grupos(self.proyectiles_enemigos, rej_barreras)
         for p, barreras_golpeadas in impactos_bar_enemigo.items():
             # Bombas de Boss atraviesan o simplemente dejan charco en el suelo de las barreras
             if getattr(p, 'es_bomba', False) and self.boss_instancia:
@@ -1104,21 +1143,10 @@ class Juego:
             for b in barreras_golpeadas: b.recibir_danio()
 
         if self.mago.escudo_especial and self.mago.escudo_especial.activo:
-            impactos_escudo = pygame.sprite.spritecollide(self.mago.escudo_especial, self.proyectiles_enemigos, False)
+            impactos_escudo = rej_balas_e.consultar(self.mago.escudo_especial)
             for p in impactos_escudo:
                 # Rebotar proyectil con doble de daño del mago
-                danio_rebotado = DANIO_BASE_MAGO * self.mago.stats["danio_multi"] * 2
-                p.es_enemigo = False
-                p.danio = danio_rebotado
-                p.vy = -abs(p.vy) # Asegurar que vaya hacia arriba
-                p.color = CIAN_MAGIA
-                p.es_explosivo = True
-                
-                # Actualizar imagen del proyectil
-                p.image = pygame.Surface((10*2+6, 10*2+6), pygame.SRCALPHA)
-                pygame.draw.circle(p.image, CIAN_MAGIA, (10+3, 10+3), 10)
-                pygame.draw.circle(p.image, BLANCO, (10+3, 10+3), 10//3)
-                p.rect = p.image.get_rect(center=p.rect.center)
+                p.reflejar(DANIO_BASE_MAGO * self.mago.stats["danio_multi"] * 2)
 
                 # SINERGIA: Añadir al grupo de proyectiles del mago para dañar enemigos
                 self.proyectiles_mago.add(p)
@@ -1128,7 +1156,8 @@ class Juego:
                 self.mago.escudo_especial.desactivar()
         
         # IMPACTO PROYECTIL ENEMIGO -> JUGADOR
-        col_list = pygame.sprite.spritecollide(self.mago, self.proyectiles_enemigos, True, collided=collided_hitbox)
+        col_list = rej_balas_e.consultar(self.mago, *desplazamiento(self.mago))
+        for p in col_list: p.kill()
         for p in col_list:
              # Spawnear charco si impacta al jugador 
              if getattr(p, 'es_bomba', False) and self.boss_instancia: 
@@ -1137,49 +1166,32 @@ class Juego:
                  self.charcos.add(charco); self.todos_sprites.add(charco)
              
              if self.mago.recibir_danio():
-                self.screen_shake = 10; self.flash_alpha = 150 
-                self.explosion_efecto(self.mago.rect.centerx, self.mago.rect.top, AZUL_MAGO)
+                self.eventos.append(DanioJugador(10, 150, AZUL_MAGO))
                 if self.boss_instancia and self.boss_instancia.variante == BOSS_TIPO_HIELO:
                     self.mago.aplicar_ralentizacion() 
                 if self.mago.vidas <= 0: self.cambiar_estado(ESTADO_GAMEOVER)
 
         # CHOQUE DE PROYECTILES (Habilidad de EL LOCO)
         if self.mago.skill_cancel_prob > 0:
-            choques = pygame.sprite.groupcollide(self.proyectiles_mago, self.proyectiles_enemigos, False, False)
+            choques = colisionar_barrido(self.proyectiles_mago, self.proyectiles_enemigos)
             for b_m, balas_e in choques.items():
                 for b_e in balas_e:
-                    if random.random() < self.mago.skill_cancel_prob:
-                        self.explosion_efecto(b_e.rect.centerx, b_e.rect.centery, BLANCO)
+                    if azar.sim.random() < self.mago.skill_cancel_prob:
+                        self.eventos.append(Golpe(b_e.rect.centerx, b_e.rect.centery, explosion=BLANCO))
                         b_m.kill(); b_e.kill()
                         break 
 
-        # OPTIMIZACION: COLISIONES LASER SNAKE
-        for s in self.todos_sprites:
-            if isinstance(s, LaserSNAKE):
-                # Usar clipline para deteccion precisa y rapida
-                rad = math.radians(s.angulo)
-                fin_x = s.x + math.cos(rad) * 1000
-                fin_y = s.y + math.sin(rad) * 1000
-                
-                # Chequear si la linea del laser cruza el rectangulo del mago (usando hitbox si existe)
-                mago_rect = getattr(self.mago, 'hitbox', self.mago.rect)
-                clip = mago_rect.clipline(s.x, s.y, fin_x, fin_y)
-                if clip:
-                    if self.mago.recibir_danio():
-                        self.screen_shake = 10; self.flash_alpha = 150
-                
-                # Chequear barreras
-                for b in self.barreras:
-                    if b.rect.clipline(s.x, s.y, fin_x, fin_y):
-                        # El laser atraviesa barreras? Si, es un laser gigante.
-                        pass
+        # LÁSERES DE SNAKE: haz con ancho contra la hitbox del Mago (atraviesan barreras)
+        for l in self.lasers:
+            if chocan(l, self.mago):
+                if self.mago.recibir_danio():
+                    self.eventos.append(DanioJugador(10, 150))
         
         # COLISIÓN BOSS SNAKE EMBISTIENDO
         if self.boss_instancia and hasattr(self.boss_instancia, 'embestiendo') and self.boss_instancia.embestiendo:
-            if collided_hitbox(self.mago, self.boss_instancia):
+            if chocan_barrido(self.mago, self.boss_instancia):
                 if self.mago.recibir_danio():
-                    self.screen_shake = 15; self.flash_alpha = 200
-                    self.explosion_efecto(self.mago.rect.centerx, self.mago.rect.top, ROJO_VIDA)
+                    self.eventos.append(DanioJugador(15, 200, ROJO_VIDA))
 
         # CHARCOS EN EL SUELO (Si fallan al jugador/barreras)
         for p in self.proyectiles_enemigos:
@@ -1188,51 +1200,52 @@ class Juego:
                     tipo = "fuego" if self.boss_instancia.variante == BOSS_TIPO_FUEGO else ("veneno" if self.boss_instancia.variante == BOSS_TIPO_TOXICO else "hielo")
                     c = Charco(p.rect.centerx, ALTO - 50, tipo); self.charcos.add(c); self.todos_sprites.add(c)
                 p.kill() # Destruir proyectil al impactar suelo
-                self.explosion_efecto(p.rect.centerx, p.rect.bottom, MORADO_CARGADO)
+                self.eventos.append(Golpe(p.rect.centerx, p.rect.bottom, explosion=MORADO_CARGADO))
 
         # INTERACCION CON CHARCOS
-        charcos_pisados = pygame.sprite.spritecollide(self.mago, self.charcos, False, collided=collided_hitbox)
+        charcos_pisados = colisionar_sprite(self.mago, self.charcos, False)
         for c in charcos_pisados:
             if c.tipo == "hielo":
                 self.mago.resbalando = True # Activa fisica de hielo
                 # Efecto resbalar adicional (un pequeño empuje random)
-                if random.random() < 0.1: self.mago.momentum_x += random.choice([-2, 2])
+                if azar.sim.random() < 0.1: self.mago.momentum_x += azar.sim.choice([-2, 2])
             elif c.tipo == "veneno":
-                now = pygame.time.get_ticks()
+                now = ahora
                 if not hasattr(self.mago, "ultimo_veneno"): self.mago.ultimo_veneno = 0
                 if now - self.mago.ultimo_veneno > TICK_CHARCO_VENENO:
                     if self.mago.recibir_danio():
-                        self.screen_shake = 10; self.flash_alpha = 150
+                        self.eventos.append(DanioJugador(10, 150))
                         self.mago.ultimo_veneno = now
             elif c.tipo == "fuego":
-                 now = pygame.time.get_ticks()
+                 now = ahora
                  if not hasattr(self.mago, "ultimo_fuego"): self.mago.ultimo_fuego = 0
                  if now - self.mago.ultimo_fuego > 1000: # Tick cada segundo
                      if self.mago.recibir_danio():
-                         self.screen_shake = 10; self.flash_alpha = 150
+                         self.eventos.append(DanioJugador(10, 150))
                          self.mago.ultimo_fuego = now
 
-        for p in pygame.sprite.spritecollide(self.mago, self.powerups, True, collided=collided_hitbox): 
+        for p in colisionar_sprite(self.mago, self.powerups, True): 
             self.tiempo_sin_powerup = 0
-            if p.tipo == "reparar_barreras":
-                self.crear_barreras()
-                if self.snd_powerup and not self.juego_silenciado: self.snd_powerup.play()
-            else:
-                self.mago.aplicar_powerup(p.tipo)
-                if self.snd_powerup and not self.juego_silenciado: self.snd_powerup.play()
-        for c in pygame.sprite.spritecollide(self.mago, self.corazones, True, collided=collided_hitbox):
+            if p.tipo == "reparar_barreras": self.crear_barreras()
+            else: self.mago.aplicar_powerup(p.tipo)
+            self.eventos.append(Recogida("powerup"))
+        for c in colisionar_sprite(self.mago, self.corazones, True):
             if self.mago.vidas < self.mago.max_vidas: self.mago.vidas += 1
-            if self.snd_powerup and not self.juego_silenciado: self.snd_powerup.play()
+            self.eventos.append(Recogida("corazon"))
 
-        if self.mago.escudo_pendiente:
-            targets = list(self.monstruos) + ([self.boss_instancia] if self.boss_instancia and not self.boss_instancia.destruyendo else [])
-            for m in targets:
-                if m and math.hypot(self.mago.rect.centerx - m.rect.centerx, self.mago.rect.centery - m.rect.centery) < self.mago.radio_escudo: self.mago.activar_escudo(); break
-        if self.mago.escudo_activo:
-            for m in list(self.monstruos):
-                if math.hypot(self.mago.rect.centerx - m.rect.centerx, self.mago.rect.centery - m.rect.centery) < self.mago.radio_escudo: self.explosion_efecto(m.rect.centerx, m.rect.centery, NARANJA_FUEGO); m.kill()
+        if self.mago.escudo_pendiente or self.mago.escudo_activo:
+            # Una sola consulta de radio sirve para activar el escudo y para lo que quema
+            mx, my = self.mago.rect.center
+            cerca = area_monstruos(self.monstruos).en_radio(mx, my, self.mago.radio_escudo)
+            if self.mago.escudo_pendiente:
+                boss = self.boss_instancia
+                if cerca or (boss and not boss.destruyendo and math.hypot(mx - boss.rect.centerx, my - boss.rect.centery) < self.mago.radio_escudo):
+                    self.mago.activar_escudo()
+            if self.mago.escudo_activo:
+                for m in cerca: self.eventos.append(Muerte(m.rect.centerx, m.rect.centery, NARANJA_FUEGO, sonido=False)); m.kill()
 
     def explosion_efecto(self, x, y, color):
+        if not self.efectos_visuales: return
         # OPTIMIZACIÓN: Limitar número máximo de partículas
         max_particulas = 50
         if len(self.particulas) >= max_particulas:
@@ -1244,10 +1257,77 @@ class Juego:
         # Reducir cantidad de partículas nuevas según carga actual
         cantidad = 8 if len(self.particulas) > 30 else 16
         for _ in range(cantidad): 
-            p = Particula(x, y, color)
+            p = Particula.nuevo(x, y, color)
             self.particulas.add(p)
             self.todos_sprites.add(p)
 
+    def resolver_muertes(self, danio_frame, ahora):
+        """Aplica el daño acumulado del tick y resuelve cada muerte una sola vez, en el orden
+        del primer golpe. Solo las primeras MAX_EFECTOS_MUERTE_FRAME sueltan partículas."""
+        muertos = []
+        for e, (danio, fuente) in danio_frame.items():
+            e.hp -= danio
+            if e.hp <= 0: muertos.append((e, fuente))
+        if not muertos: return
+
+        # Pyromancer Check (daño de explosión por quemadura): una consulta de radio para todo el lote
+        quemados = [(e, f) for e, f in muertos if getattr(e, 'quemado', False) and not e.murio_por_quemadura and not isinstance(f, Orbital)]
+        if quemados:
+            radio = self.mago.burn_exp_radius
+            vecinos = area_monstruos(self.monstruos).en_radio_lote([(e.rect.centerx, e.rect.centery, radio) for e, _ in quemados])
+            mueren = {e for e, _ in muertos}
+            for (e, bala), cerca in zip(quemados, vecinos):
+                for m2 in cerca:
+                    if m2 in mueren: continue
+                    m2.hp -= bala.danio * self.mago.burn_exp_damage
+                    self.eventos.append(Golpe(m2.rect.centerx, m2.rect.centery, explosion=NARANJA_FUEGO))
+
+        presupuesto = MAX_EFECTOS_MUERTE_FRAME
+        for e, fuente in muertos:
+            x, y = e.rect.center
+            efectos = presupuesto > 0
+            presupuesto -= 1
+            if isinstance(fuente, Orbital):
+                self.eventos.append(Muerte(x, y, e.color if efectos else None, 10, sonido=False))
+                e.kill()
+                continue
+
+            # FURIA ÍGNEA: Si el enemigo murió por quemadura, propaga a cercanos
+            if getattr(e, 'murio_por_quemadura', False):
+                e.propagar_quemadura(self.monstruos)
+                if efectos: self.eventos.append(Golpe(x, y, explosion=NARANJA_FUEGO))
+
+            if e.congelado:
+                for i in range(8):
+                    rad = math.radians(i * 45); vx_f, vy_f = math.cos(rad) * 7.5, math.sin(rad) * 7.5
+                    frag = Proyectil.nuevo(x, y, vx_f, vy_f, 5, color=BLANCO_HIELO, es_hielo=False) 
+                    self.todos_sprites.add(frag); self.proyectiles_mago.add(frag)
+                if efectos: self.eventos.append(Golpe(x, y, explosion=BLANCO_HIELO))
+            pts = PUNTOS_POR_FILA.get(e.fila_original, 100)
+            if e.tipo == TIPO_ENEMIGO_ELITE: pts *= 3
+            
+            # Soltar XP (con límite máximo para evitar acumulación)
+            max_orbes = 30
+            if len(self.orbes_xp) >= max_orbes:
+                # Auto-recoger orbes más antiguos cuando hay demasiados
+                orbes_list = list(self.orbes_xp)
+                for viejo_orbe in orbes_list[:5]:
+                    if self.mago.ganar_xp(viejo_orbe.valor):
+                        self.eventos.append(Recogida("xp", True))
+                        self.cambiar_estado(ESTADO_SELECCION_MEJORA)
+                    viejo_orbe.kill()
+            
+            xp = OrbeXP(x, y)
+            self.todos_sprites.add(xp)
+            self.orbes_xp.add(xp)
+            
+            cant_cristal = 0
+            if e.tipo == TIPO_ENEMIGO_TESORO: cant_cristal = 5
+            elif e.tipo == TIPO_ENEMIGO_ELITE: cant_cristal = 2
+            elif azar.sim.random() < 0.02: cant_cristal = 1
+            self.eventos.append(Muerte(x, y, e.color if efectos else None, pts, cant_cristal))
+            self.drop_powerup_enemigo(x, y, ahora); e.kill()
+
     def drop_powerup_enemigo(self, x, y, ahora):
         bonus_prob = 0.0
         if self.tiempo_sin_powerup > TIEMPO_SIN_POWERUP_MS_BONUS:
@@ -1258,11 +1338,11 @@ class Juego:
         
         total_hp_barreras = sum(b.hp for b in self.barreras)
         
-        if total_hp_barreras == 0 and random.random() < 0.15:
+        if total_hp_barreras == 0 and azar.sim.random() < 0.15:
              p = PowerUp(x, y, "reparar_barreras")
              self.powerups.add(p); self.todos_sprites.add(p); return
 
-        roll = random.random()
+        roll = azar.sim.random()
         prob_base = PROB_POWERUP_BASE + bonus_prob
         if self.nivel >= 10: prob_base = PROB_POWERUP_ENDGAME + bonus_prob
         
@@ -1275,11 +1355,11 @@ class Juego:
              if self.mago.nivel_run >= UNLOCK_REQ_ORBITAL: tipos.append("orbital")
              if self.mago.nivel_run >= UNLOCK_REQ_HOMING: tipos.append("homing")
              
-             t = random.choice(tipos)
+             t = azar.sim.choice(tipos)
              p = PowerUp(x, y, t); self.powerups.add(p); self.todos_sprites.add(p)
 
     def generar_powerup(self, x, y):
-        if random.random() < PROB_POWERUP_RAYO:
+        if azar.sim.random() < PROB_POWERUP_RAYO:
             pu = PowerUp(x, y, "rayo"); self.todos_sprites.add(pu); self.powerups.add(pu); return
         opts = list(COLORES_PU.keys())
         if "rayo" in opts: opts.remove("rayo") 
@@ -1289,7 +1369,7 @@ class Juego:
         kills = self.gestor_datos.datos.get("boss_kills", 0)
         if kills < UNLOCK_REQ_ORBITAL and "orbital" in opts: opts.remove("orbital")
         if kills < UNLOCK_REQ_HOMING and "homing" in opts: opts.remove("homing")
-        if opts: pu = PowerUp(x, y, random.choice(opts)); self.todos_sprites.add(pu); self.powerups.add(pu)
+        if opts: pu = PowerUp(x, y, azar.sim.choice(opts)); self.todos_sprites.add(pu); self.powerups.add(pu)
     
     def generar_opciones_mejora(self):
         posibles = [
@@ -1337,7 +1417,7 @@ class Juego:
         pool_temporal = list(potenciados)
         while len(self.opciones_mejora_actuales) < min(3, len(posibles)):
             if not pool_temporal: break
-            nueva = random.choice(pool_temporal)
+            nueva = azar.sim.choice(pool_temporal)
             # Agregar si no está ya seleccionada
             if not any(o["id"] == nueva["id"] for o in self.opciones_mejora_actuales):
                 self.opciones_mejora_actuales.append(nueva)
@@ -1399,9 +1479,9 @@ class Juego:
                 capa['x'] = -capa['ancho']
         
         # Generar partículas
-        if random.random() < 0.05:
-            tipo = "luciernaga" if random.random() < 0.7 else "mota"
-            p = ParticulaAmbiental(random.randint(0, ANCHO), random.randint(0, ALTO), tipo)
+        if self.efectos_visuales and azar.fx.random() < 0.05:
+            tipo = "luciernaga" if azar.fx.random() < 0.7 else "mota"
+            p = ParticulaAmbiental(azar.fx.randint(0, ANCHO), azar.fx.randint(0, ALTO), tipo)
             self.particulas_ambiente.add(p)
         
         self.particulas_ambiente.update()
@@ -1423,14 +1503,14 @@ class Juego:
             
             # Dibujar patrones (hierba/piedras)
             for _ in range(200):
-                x, y = random.randint(0, ANCHO), random.randint(0, ALTO)
-                color = paleta["var1"] if random.random() < 0.5 else paleta["var2"]
+                x, y = azar.fx.randint(0, ANCHO), azar.fx.randint(0, ALTO)
+                color = paleta["var1"] if azar.fx.random() < 0.5 else paleta["var2"]
                 pygame.draw.rect(self.fondo_cache, color, (x, y, 4, 4))
                 
             # Árboles fondo
             for _ in range(15):
-                x, y = random.randint(0, ANCHO), random.randint(0, 100)
-                pygame.draw.circle(self.fondo_cache, paleta["arbol_fondo"], (x, y), random.randint(20, 40))
+                x, y = azar.fx.randint(0, ANCHO), azar.fx.randint(0, 100)
+                pygame.draw.circle(self.fondo_cache, paleta["arbol_fondo"], (x, y), azar.fx.randint(20, 40))
 
         self.pantalla.blit(self.fondo_cache, (0, 0))
         
@@ -1671,8 +1751,9 @@ class Juego:
         # Descripción con párrafo real (no manual)
         self.dibujar_texto_parrafo(desc, self.fuente_sm, BLANCO, pygame.Rect(rect.x + 15, rect.top + 60, rect.width - 30, rect.height - 70))
 
-    def dibujar(self):
-        off_x, off_y = (random.randint(-4,4), random.randint(-4,4)) if self.screen_shake > 0 else (0,0)
+    def dibujar(self, alpha=1.0):
+        # alpha: fracción del próximo tick ya transcurrida (0..1) para interpolar posiciones
+        off_x, off_y = (azar.fx.randint(-4,4), azar.fx.randint(-4,4)) if self.screen_shake > 0 else (0,0)
         if self.fondo_img: self.pantalla.blit(self.fondo_img, (0, 0))
         else: self.dibujar_fondo_procedural()
         for p in self.particulas_ambiente: self.pantalla.blit(p.image, p.rect)
@@ -1830,13 +1911,23 @@ class Juego:
             # Sombra/Profundidad
             pygame.draw.rect(self.pantalla, (20, 20, 30), [0, y_balcon+5, ANCHO, 10])
 
-            for s in self.todos_sprites: self.pantalla.blit(s.image, (s.rect.x + off_x, s.rect.y + off_y))
+            if INTERPOLAR_RENDER and alpha < 1.0 and self.estado == ESTADO_JUGANDO:
+                previas = self.posiciones_previas
+                for s in self.todos_sprites:
+                    x, y = s.rect.x, s.rect.y
+                    prev = previas.get(s)
+                    # Sprites nuevos o teletransportados se dibujan en su posición actual
+                    if prev and abs(x - prev[0]) < DISTANCIA_MAX_INTERPOLACION and abs(y - prev[1]) < DISTANCIA_MAX_INTERPOLACION:
+                        x = prev[0] + (x - prev[0]) * alpha; y = prev[1] + (y - prev[1]) * alpha
+                    self.pantalla.blit(s.image, (x + off_x, y + off_y))
+            else:
+                for s in self.todos_sprites: self.pantalla.blit(s.image, (s.rect.x + off_x, s.rect.y + off_y))
             if self.mago.orbital_activo:
                 for o in self.mago.orbitales_grupo: self.pantalla.blit(o.image, (o.rect.x + off_x, o.rect.y + off_y))
             
             if self.mago.escudo_pendiente:
                  r = self.mago.radio_escudo
-                 pulse = (math.sin(pygame.time.get_ticks() * 0.005) + 1) * 0.5 # 0 to 1
+                 pulse = (math.sin(tiempo.ahora() * 0.005) + 1) * 0.5 # 0 to 1
                  alpha = int(30 + (pulse * 40))
                  s = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
                  pygame.draw.circle(s, (*COLOR_ESCUDO_PENDIENTE, alpha), (r, r), r, width=2)
@@ -1909,7 +2000,7 @@ class Juego:
                 overlay = pygame.Surface((ANCHO, ALTO), pygame.SRCALPHA); overlay.fill((60, 0, 0, 210)); self.pantalla.blit(overlay, (0,0))
                 self.dibujar_texto("GAME OVER", self.fuente_lg, ROJO_VIDA, ANCHO//2, ALTO//2 - 40)
                 self.dibujar_texto(f"PUNTOS: {self.puntuacion}", self.fuente_md, BLANCO, ANCHO//2, ALTO//2 + 10)
-                rem = max(0, 2000 - (pygame.time.get_ticks() - self.tiempo_estado_inicio))
+                rem = max(0, 2000 - (tiempo.ahora() - self.tiempo_estado_inicio))
                 if rem > 0: self.dibujar_texto(f"Espere {int(rem/100)+1}...", self.fuente_sm, BLANCO, ANCHO//2, ALTO//2 + 60)
                 else: self.dibujar_texto("Toca para volver al Menú", self.fuente_sm, BLANCO, ANCHO//2, ALTO//2 + 60)
 
@@ -1939,6 +2030,7 @@ class Juego:
             debug_text = "DEBUG MODE"
             if settings.DEBUG_GOD_MODE: debug_text += " [GOD]"
             if settings.DEBUG_INFINITE_CHARGES: debug_text += " [INF]"
+            debug_text += f" [SKIP {self.frames_saltados_ultimo} | {self.frames_saltados_total}]"
             self.dibujar_texto(debug_text, self.fuente_sm, (255, 0, 255), ANCHO//2, 5)
 
         # --- SECCION IZQUIERDA: NIVEL y GEMAS ---
@@ -1962,7 +2054,7 @@ class Juego:
              self.dibujar_texto(f"+{self.mago.vidas-10}", self.fuente_sm, ROJO_VIDA, start_x_hearts - 260, 25)
 
         # --- INFO ESTADO / POWERUPS ---
-        ahora = pygame.time.get_ticks()
+        ahora = tiempo.ahora()
         info_parts = []
         
         if self.mago.escudo_especial and self.mago.escudo_especial_desbloqueado:
@@ -2013,7 +2105,7 @@ class Juego:
         
         if self.notificacion_powerup:
             alpha = 255
-            tiempo_pasado = pygame.time.get_ticks() - self.tiempo_notificacion_powerup
+            tiempo_pasado = tiempo.ahora() - self.tiempo_notificacion_powerup
             if tiempo_pasado > 2500:
                 alpha = max(0, 255 - (tiempo_pasado - 2500) * 5)
             s = pygame.Surface((ANCHO, 50), pygame.SRCALPHA)
@@ -2113,28 +2205,56 @@ class Juego:
             self.pantalla.blit(surf, (rect.centerx - surf.get_width()//2, y_dibujo))
             y_dibujo += interlineado
 
+    def activar(self):
+        """Hace de este juego el contexto activo (reloj de frame y azar) antes de avanzarlo."""
+        tiempo.activar(self.reloj_frame)
+        azar.activar(self.flujos_azar)
+
+    def guardar_posiciones_previas(self):
+        self.posiciones_previas = {s: s.rect.topleft for s in self.todos_sprites}
+
+    def marcar_inicio_tick(self):
+        """Centro de todo lo que se mueve rápido al empezar el tick (colisiones por barrido)."""
+        for grupo in (self.proyectiles_mago, self.proyectiles_enemigos):
+            for s in grupo: s.pos_previa = s.rect.center
+        self.mago.pos_previa = self.mago.rect.center
+        if self.boss_instancia: self.boss_instancia.pos_previa = self.boss_instancia.rect.center
+
     def update(self):
+        # En pausa la simulación queda congelada (ni reloj ni azar): así la duración
+        # de una pausa no cambia la partida y las repeticiones no necesitan grabarla
+        if self.estado in (ESTADO_PAUSA, ESTADO_DEBUG_MENU): return
+        liberar_reciclados()
+        ahora = self.reloj_frame.tick()
+        self.ticks_simulacion += 1
+        if self.estado == ESTADO_JUGANDO:
+            self.tiempo_sin_powerup += self.reloj_frame.dt
         self.manejar_ambiente()
         if self.screen_shake > 0: self.screen_shake -= 1
         if self.flash_alpha > 0: self.flash_alpha = max(0, self.flash_alpha - 5)
-        if self.notificacion_powerup and pygame.time.get_ticks() - self.tiempo_notificacion_powerup > 3000:
+        if self.notificacion_powerup and ahora - self.tiempo_notificacion_powerup > 3000:
             self.notificacion_powerup = None
 
         # Procesar controles táctiles continuamente
         self.procesar_botones_tactiles_continuos()
 
         if self.estado == ESTADO_JUGANDO:
-            ahora = pygame.time.get_ticks()
-            teclas = pygame.key.get_pressed()
-            # Combinar disparo de teclado y táctil
-            if teclas[pygame.K_SPACE] or self.mago.disparando_tactil:
+            self.marcar_inicio_tick()
+            entrada = self.controlador.leer(self)
+            self.mago.entrada = entrada
+            if entrada.disparar:
                 self.mago.disparar(self.monstruos)
+            elif self.mago.tipo == "snake" and self.mago.cargando:
+                # Para Snake: soltar el disparo (tecla, dedo o mouse) libera la carga
+                self.mago.liberar_carga(self.proyectiles_mago)
+            if entrada.dash:
+                self.mago.dash_dir = entrada.mov; self.mago.dash()
 
             # Resetear estado táctil al final del frame (se volverá a activar si sigue el toque)
             self.resetear_movimiento_tactil()
             
-            if self.mago.vidas < self.mago.max_vidas and random.random() < PROB_CORAZON:
-                c = Corazon(random.randint(40, ANCHO-40), -30); self.todos_sprites.add(c); self.corazones.add(c)
+            if self.mago.vidas < self.mago.max_vidas and azar.sim.random() < PROB_CORAZON:
+                c = Corazon(azar.sim.randint(40, ANCHO-40), -30); self.todos_sprites.add(c); self.corazones.add(c)
             
             bonus_prob_cielo = 0.0
             if self.tiempo_sin_powerup > TIEMPO_SIN_POWERUP_MS_BONUS:
@@ -2146,22 +2266,23 @@ class Juego:
             tiempo_desde_ultimo = ahora - self.ultimo_spawn_powerup_cielo
             if tiempo_desde_ultimo > INTERVALO_MINIMO_POWERUPS:
                 prob_cielo = PROB_POWERUP_CIELO + bonus_prob_cielo
-                if random.random() < prob_cielo:
-                    self.generar_powerup(random.randint(60, ANCHO - 60), -40)
+                if azar.sim.random() < prob_cielo:
+                    self.generar_powerup(azar.sim.randint(60, ANCHO - 60), -40)
                     self.ultimo_spawn_powerup_cielo = ahora
             
             if not self.boss_instancia:
                 if len(self.monstruos) < 4 and not self.ha_intentado_spawn_tesoro and self.nivel % FRECUENCIA_BOSS != 0:
                     self.ha_intentado_spawn_tesoro = True
-                    if random.random() < 0.5:
-                        lado = random.choice([0, ANCHO - 30]) 
+                    if azar.sim.random() < 0.5:
+                        lado = azar.sim.choice([0, ANCHO - 30]) 
                         vel = VEL_MONSTRUO_BASE_X * 2.5
                         if lado > ANCHO // 2: vel *= -1 
                         m = Monstruo(lado, 130, 0, abs(vel), 0, 1.0, self.nivel, TIPO_ENEMIGO_TESORO)
                         m.vel_x = vel; m.dir = 1 
                         self.todos_sprites.add(m); self.monstruos.add(m)
             
-            if self.boss_instancia: self.boss_instancia.update(ahora=ahora, grupo_s=self.todos_sprites, grupo_b=self.proyectiles_enemigos, mago=self.mago)
+            ctx = ContextoFrame(ahora, self.mago, self.monstruos, self.todos_sprites, self.proyectiles_enemigos, self.boss_instancia)
+            if self.boss_instancia: self.boss_instancia.update(ctx)
             else:
                 borde = False
                 for m in self.monstruos:
@@ -2170,7 +2291,11 @@ class Juego:
                         if (m.rect.right >= ANCHO and m.dir == 1) or (m.rect.left <= 0 and m.dir == -1): borde = True
                 if borde: [m.bajar() for m in self.monstruos]
             
-            self.todos_sprites.update(mago=self.mago, monstruos=self.monstruos, grupo_s=self.todos_sprites, grupo_b=self.proyectiles_enemigos, boss=self.boss_instancia); self.manejar_colisiones()
+            almacen = self.almacen_proyectiles
+            if almacen is not None: almacen.cortar()
+            self.todos_sprites.update(ctx)
+            if almacen is not None: almacen.mover(self.monstruos, self.boss_instancia)
+            self.manejar_colisiones(); eventos.procesar(self)
             
             if not self.monstruos and not self.boss_instancia and self.estado == ESTADO_JUGANDO:
                 # Auto-recoger XP no recolectado antes de pasar de nivel
@@ -2191,22 +2316,42 @@ class Juego:
             if self.mago.nivel_run >= 10 or self.nivel >= 10:
                 self.verificar_desbloqueos()
         
+        elif self.estado == ESTADO_SELECCION_MEJORA:
+            indice = self.controlador.elegir_mejora(self)
+            if indice: self.aplicar_mejora_permanente(indice)
+
+        elif self.estado == ESTADO_SELECCION_RECOMPENSA_BOSS:
+            indice = self.controlador.elegir_recompensa_boss(self)
+            if indice is not None:
+                self.aplicar_recompensa_boss(indice)
+                self.gestor_datos.guardar()
+                self.cambiar_estado(ESTADO_TRANSICION)
+
         elif self.estado == ESTADO_TRANSICION:
-            if pygame.time.get_ticks() - self.tiempo_estado_inicio > 2000:
+            if ahora - self.tiempo_estado_inicio > 2000 or self.controlador.saltar_transicion(self):
                  self.crear_horda(); self.cambiar_estado(ESTADO_JUGANDO)
         
-        if self.confirmando_borrado and pygame.time.get_ticks() - self.timer_confirmacion_borrado > 3000:
+        if self.confirmando_borrado and ahora - self.timer_confirmacion_borrado > 3000:
             self.confirmando_borrado = False
 
     async def ejecutar(self):
+        acumulador = 0.0
         while self.corriendo:
-            self.reloj.tick(FPS); self.mago.direccion_touch = 0
+            self.reloj.tick(FPS_RENDER)
             await asyncio.sleep(0)
-            ahora = pygame.time.get_ticks()
-            if self.estado == ESTADO_JUGANDO:
-                self.tiempo_sin_powerup += self.reloj.get_time()
+            if self.grabacion and self.reloj.get_time() > UMBRAL_TIRON_MS:
+                self.grabacion.marcar_tiron(self.ticks_simulacion - self.controlador.tick_inicio, self.reloj.get_time())
+            # PASO FIJO: se acumula el tiempo real y la simulación avanza en ticks de PASO_SIMULACION_MS,
+            # así un frame perdido no ralentiza el juego (los movimientos son en px por tick)
+            acumulador += self.reloj.get_time()
+            if acumulador > MAX_ACUMULADOR_MS:
+                # El tope también pierde ticks: se cuentan igual que los de MAX_FRAMES_SALTADOS
+                self.ticks_descartados_total += int((acumulador - MAX_ACUMULADOR_MS) // PASO_SIMULACION_MS)
+                acumulador = MAX_ACUMULADOR_MS
+            ahora = tiempo.ahora()
             for ev in pygame.event.get():
                 if ev.type == pygame.QUIT: self.corriendo = False
+                self.controlador.procesar_evento(ev, self)
                 
                 # USER INTERACTION TRIGGER FOR WEB AUDIO
                 if ev.type in [pygame.FINGERDOWN, pygame.MOUSEBUTTONDOWN]:
@@ -2224,7 +2369,7 @@ class Juego:
                         if self.rect_btn_diff_dificil.collidepoint(tx, ty): self.dificultad = MODO_DIFICIL
                         if self.rect_btn_borrar.collidepoint(tx, ty):
                              if self.confirmando_borrado: self.gestor_datos.reiniciar_datos(); self.confirmando_borrado = False
-                             else: self.confirmando_borrado, self.timer_confirmacion_borrado = True, pygame.time.get_ticks()
+                             else: self.confirmando_borrado, self.timer_confirmacion_borrado = True, tiempo.ahora()
                         if self.rect_btn_exportar.collidepoint(tx, ty): self.gestor_datos.exportar_save_json()
                         if self.rect_btn_importar.collidepoint(tx, ty): self.gestor_datos.importar_save_json(lambda: setattr(self, 'text_cache', {}))
                         if self.rect_btn_config_audio.collidepoint(tx, ty): self.cambiar_estado(ESTADO_CONFIG_AUDIO)
@@ -2244,19 +2389,14 @@ class Juego:
                         for i in range(len(self.opciones_mejora_actuales)):
                             rect = pygame.Rect(ANCHO//2 - 150, 150 + i * 130, 300, 110)
                             if rect.collidepoint(tx, ty):
-                                self.aplicar_mejora_permanente(i + 1)
+                                self.mejora_pedida = i + 1
                                 break
                     elif self.estado == ESTADO_SELECCION_RECOMPENSA_BOSS:
-                        opcion_seleccionada = False
                         for i in range(len(self.opciones_boss)):
                             rect = pygame.Rect(ANCHO//2 - 150, 150 + i * 130, 300, 110)
                             if rect.collidepoint(tx, ty):
-                                self.aplicar_recompensa_boss(i)
-                                self.gestor_datos.guardar()
-                                opcion_seleccionada = True
+                                self.recompensa_pedida = i
                                 break
-                        if opcion_seleccionada:
-                            self.cambiar_estado(ESTADO_TRANSICION)
                     elif self.estado == ESTADO_TIENDA:
                         if self.rect_btn_volver_tienda.collidepoint(tx, ty): self.cambiar_estado(ESTADO_MENU)
                         elif self.rect_tienda_item_1.collidepoint(tx, ty): self.gestor_datos.comprar_mejora("vida_base")
@@ -2271,11 +2411,8 @@ class Juego:
                         if self.clicks_victoria >= 3:
                             self.clicks_victoria = 0
                             self.cambiar_estado(ESTADO_MENU)
-                    elif self.estado == ESTADO_TRANSICION: self.crear_horda(); self.cambiar_estado(ESTADO_JUGANDO)
+                    elif self.estado == ESTADO_TRANSICION: self.salto_pedido = True
                 if ev.type == pygame.FINGERUP and ev.finger_id in self.toques_activos: 
-                    # Para Snake: Liberar carga cuando se suelta el dedo del botón de disparo
-                    if self.estado == ESTADO_JUGANDO and self.mago.tipo == "snake" and self.mago.cargando:
-                        self.mago.liberar_carga(self.proyectiles_mago)
                     del self.toques_activos[ev.finger_id]
                 if ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
                     m_pos = ev.pos # Use m_pos for mouse position
@@ -2289,7 +2426,7 @@ class Juego:
                         elif self.rect_btn_diff_dificil.collidepoint(m_pos): self.dificultad = MODO_DIFICIL
                         elif self.rect_btn_borrar.collidepoint(m_pos):
                             if self.confirmando_borrado: self.gestor_datos.reiniciar_datos(); self.confirmando_borrado = False
-                            else: self.confirmando_borrado, self.timer_confirmacion_borrado = True, pygame.time.get_ticks()
+                            else: self.confirmando_borrado, self.timer_confirmacion_borrado = True, tiempo.ahora()
                         elif self.rect_btn_exportar.collidepoint(m_pos): self.gestor_datos.exportar_save_json()
                         elif self.rect_btn_importar.collidepoint(m_pos): self.gestor_datos.importar_save_json(lambda: setattr(self, 'text_cache', {}))
                         elif self.rect_btn_config_audio.collidepoint(m_pos): self.cambiar_estado(ESTADO_CONFIG_AUDIO)
@@ -2312,24 +2449,18 @@ class Juego:
                         if self.clicks_victoria >= 3:
                             self.clicks_victoria = 0
                             self.cambiar_estado(ESTADO_MENU)
-                    elif self.estado == ESTADO_TRANSICION: self.crear_horda(); self.cambiar_estado(ESTADO_JUGANDO)
+                    elif self.estado == ESTADO_TRANSICION: self.salto_pedido = True
                     elif self.estado == ESTADO_SELECCION_RECOMPENSA_BOSS:
-                        opcion_seleccionada = False
                         for i in range(len(self.opciones_boss)):
                             rect = pygame.Rect(ANCHO//2 - 150, 150 + i * 130, 300, 110)
                             if rect.collidepoint(m_pos):
-                                self.aplicar_recompensa_boss(i)
-                                self.gestor_datos.guardar()
-                                opcion_seleccionada = True
+                                self.recompensa_pedida = i
                                 break
-                        # Solo transicionar si se seleccionó una opción
-                        if opcion_seleccionada:
-                            self.cambiar_estado(ESTADO_TRANSICION)
                     elif self.estado == ESTADO_SELECCION_MEJORA:
                          for i in range(len(self.opciones_mejora_actuales)):
                              rect = pygame.Rect(ANCHO//2 - 150, 150 + i * 130, 300, 110)
                              if rect.collidepoint(m_pos):
-                                 self.aplicar_mejora_permanente(i + 1)
+                                 self.mejora_pedida = i + 1
                                  break
                     elif self.estado == ESTADO_TIENDA:
                         if self.rect_btn_volver_tienda.collidepoint(m_pos): self.cambiar_estado(ESTADO_MENU)
@@ -2343,19 +2474,11 @@ class Juego:
                     elif self.estado == ESTADO_DEBUG_MENU:
                         self._manejar_click_menu_debug(m_pos[0], m_pos[1])
                 if ev.type == pygame.MOUSEBUTTONUP and ev.button == 1:
-                    # Para Snake: Liberar carga cuando se suelta el botón del mouse
-                    if self.estado == ESTADO_JUGANDO and self.mago.tipo == "snake" and self.mago.cargando:
-                        self.mago.liberar_carga(self.proyectiles_mago)
                     if 'mouse' in self.toques_activos: del self.toques_activos['mouse']
-                if ev.type == pygame.KEYUP:
-                    # Para Snake: Liberar carga cuando se suelta el espacio
-                    if self.estado == ESTADO_JUGANDO and self.mago.tipo == "snake" and ev.key == pygame.K_SPACE:
-                        self.mago.liberar_carga(self.proyectiles_mago)
                 if ev.type == pygame.KEYDOWN:
                     if ev.key == pygame.K_m: 
                         if self.estado in [ESTADO_PAUSA, ESTADO_GAMEOVER]: self.cambiar_estado(ESTADO_MENU)
                         else: self.alternar_mute()
-                    if ev.key == pygame.K_LSHIFT: self.mago.dash() # DASH CON SHIFT
                     if self.estado == ESTADO_MENU:
                         if ev.key == pygame.K_1: self.dificultad = MODO_NORMAL; self.ir_a_seleccion_personaje(MODO_NORMAL)
                         if ev.key == pygame.K_2: self.dificultad = MODO_DIFICIL; self.ir_a_seleccion_personaje(MODO_DIFICIL)
@@ -2384,7 +2507,7 @@ class Juego:
                                 if self.boss_instancia: self.boss_instancia.hp = 0
                             if ev.key == pygame.K_F5:  # Spawn powerup
                                 tipos_pu = ["cadencia", "arco", "disparo_doble", "disparo_triple", "explosivo", "homing", "rayo"]
-                                pu = PowerUp(self.mago.rect.centerx, self.mago.rect.top - 50, random.choice(tipos_pu))
+                                pu = PowerUp(self.mago.rect.centerx, self.mago.rect.top - 50, azar.sim.choice(tipos_pu))
                                 self.powerups.add(pu); self.todos_sprites.add(pu)
                     elif self.estado == ESTADO_PAUSA:
                         if ev.key in [pygame.K_ESCAPE, pygame.K_p]: self.cambiar_estado(ESTADO_JUGANDO)
@@ -2397,41 +2520,32 @@ class Juego:
                         if self.clicks_victoria >= 3:
                             self.clicks_victoria = 0
                             self.cambiar_estado(ESTADO_MENU)
-                    elif self.estado == ESTADO_TRANSICION: self.crear_horda(); self.cambiar_estado(ESTADO_JUGANDO)
+                    elif self.estado == ESTADO_TRANSICION: self.salto_pedido = True
                     elif self.estado == ESTADO_SELECCION_RECOMPENSA_BOSS:
                         if ev.key in [pygame.K_1, pygame.K_2, pygame.K_3]:
-                            if ev.key == pygame.K_1: self.aplicar_recompensa_boss(0)
-                            elif ev.key == pygame.K_2: self.aplicar_recompensa_boss(1)
-                            elif ev.key == pygame.K_3: self.aplicar_recompensa_boss(2)
-                            self.cambiar_estado(ESTADO_TRANSICION)
+                            self.recompensa_pedida = [pygame.K_1, pygame.K_2, pygame.K_3].index(ev.key)
                     elif self.estado == ESTADO_SELECCION_MEJORA:
-                        if ev.key == pygame.K_1: self.aplicar_mejora_permanente(1)
-                        elif ev.key == pygame.K_2: self.aplicar_mejora_permanente(2)
-                        elif ev.key == pygame.K_3: self.aplicar_mejora_permanente(3)
+                        if ev.key == pygame.K_1: self.mejora_pedida = 1
+                        elif ev.key == pygame.K_2: self.mejora_pedida = 2
+                        elif ev.key == pygame.K_3: self.mejora_pedida = 3
                     elif self.estado == ESTADO_DEBUG_MENU:
                         if ev.key == pygame.K_F12: self.cambiar_estado(ESTADO_JUGANDO)
-            if self.estado == ESTADO_JUGANDO and self.controles_tactiles_activados:
-                m_izq = False
-                m_der = False
-                disparando = False
-
-                for tid in list(self.toques_activos.keys()):
-                    if tid in self.toques_activos:
-                        tx, ty = self.toques_activos[tid]
-                        if tx is None or ty is None:
-                            continue
-                        if self.zona_toque_izq.collidepoint(tx, ty):
-                            m_izq = True
-                        if self.zona_toque_der.collidepoint(tx, ty):
-                            m_der = True
-                        if self.zona_toque_disparo.collidepoint(tx, ty):
-                            disparando = True
-
-                self.mago.direccion_touch = -1 if m_izq and not m_der else (1 if m_der and not m_izq else 0)
-
-                if disparando and self.mago.puede_disparar():
-                    self.mago.disparar(self.monstruos)
-            self.update(); self.dibujar()
+            # FRAME-SKIP: hasta 1 + MAX_FRAMES_SALTADOS ticks por dibujado; sin frame-skip, 1:1
+            max_pasos = 1 + MAX_FRAMES_SALTADOS if FRAMESKIP_ACTIVO else 1
+            pasos = 0
+            while acumulador >= PASO_SIMULACION_MS and pasos < max_pasos:
+                acumulador -= PASO_SIMULACION_MS; pasos += 1
+                if acumulador < PASO_SIMULACION_MS or pasos == max_pasos: self.guardar_posiciones_previas()  # último tick antes de dibujar
+                self.update()
+            if acumulador >= PASO_SIMULACION_MS:
+                # Atraso mayor al tope: se descarta (ralentización visible en vez de espiral)
+                self.ticks_descartados_total += int(acumulador // PASO_SIMULACION_MS)
+                acumulador %= PASO_SIMULACION_MS
+            self.frames_saltados_ultimo = max(0, pasos - 1)
+            self.frames_saltados_total += self.frames_saltados_ultimo
+            self.dibujar(acumulador / PASO_SIMULACION_MS)
+        # Cerrar la ventana a mitad de partida no debe perder la repetición en curso
+        self.terminar_grabacion()
         pygame.quit(); sys.exit()
 
 if __name__ == "__main__":
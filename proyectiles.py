@@ -0,0 +1,160 @@
+# PROYECTILES: el movimiento de todas las balas (del Mago y enemigas) en arreglos de
+# NumPy, una fila por Proyectil. GrupoProyectiles da de alta a sus miembros en el
+# almacén compartido del juego y Juego.update llama a mover() una vez por tick en vez
+# de un Proyectil.update() por bala. La posición sigue siendo el rect (lo usan las
+# colisiones y el dibujado): se lee al empezar el paso y se escribe al terminar.
+# Sin NumPy no hay almacén y cada Proyectil se mueve solo, como siempre.
+from settings import *
+from sprites import Grupo
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _redondear(v):
+    """Como pygame al asignar un float a un rect: al entero más cercano, .5 lejos del cero."""
+    t = np.trunc(v)
+    f = v - t
+    return t + (f >= 0.5) - (f <= -0.5)
+
+
+# Balas a partir de las cuales el paso con arreglos compensa el costo fijo de NumPy
+UMBRAL_ALMACEN = 64
+
+
+class AlmacenProyectiles:
+    """Velocidad, rebotes, tamaño y homing de cada bala en arreglos paralelos.
+
+    Las filas están compactas: al dar de baja una bala la última ocupa su lugar. Daño,
+    penetración y demás flags se quedan en el sprite porque solo los lee el código de
+    cada impacto, no el paso de movimiento. Con pocas balas mover() usa Proyectil.paso().
+    """
+
+    def __init__(self, capacidad=256, umbral=UMBRAL_ALMACEN):
+        self.umbral = umbral
+        self.n = 0
+        self.sprites = []
+        self.vel = np.zeros((2, capacidad))   # filas vx, vy
+        self.tam = np.zeros((2, capacidad))   # filas ancho, alto del rect
+        self.rebotes = np.zeros(capacidad, dtype=np.int64)
+        self.homing = np.zeros(capacidad, dtype=bool)
+        self.orden = np.zeros(capacidad, dtype=np.int64)  # número de alta, para cortar()
+        self.con_homing = 0
+        self.altas = 0
+        self.corte = 0
+
+    def _crecer(self):
+        for nombre in ("vel", "tam", "rebotes", "homing", "orden"):
+            viejo = getattr(self, nombre)
+            nuevo = np.zeros(viejo.shape[:-1] + (viejo.shape[-1] * 2,), dtype=viejo.dtype)
+            nuevo[..., :self.n] = viejo[..., :self.n]
+            setattr(self, nombre, nuevo)
+
+    def alta(self, sprite):
+        if sprite.almacen is self:
+            sprite.grupos_almacen += 1  # también está en otro grupo del mismo almacén
+            return
+        i = self.n
+        if i == self.orden.shape[0]: self._crecer()
+        self.sprites.append(sprite)
+        self.vel[0, i], self.vel[1, i] = sprite._vx, sprite._vy
+        self.tam[0, i], self.tam[1, i] = sprite.rect.size
+        self.rebotes[i] = sprite._rebotes
+        self.homing[i] = sprite.es_homing
+        self.con_homing += bool(sprite.es_homing)
+        self.orden[i] = self.altas
+        self.altas += 1
+        self.n += 1
+        sprite.almacen, sprite.indice, sprite.grupos_almacen = self, i, 1
+
+    def baja(self, sprite):
+        if sprite.almacen is not self: return
+        sprite.grupos_almacen -= 1
+        if sprite.grupos_almacen: return
+        i, ultimo = sprite.indice, self.n - 1
+        self.con_homing -= bool(self.homing[i])
+        if i != ultimo:
+            otro = self.sprites[ultimo]
+            self.sprites[i], otro.indice = otro, i
+            for a in (self.vel, self.tam, self.rebotes, self.homing, self.orden): a[..., i] = a[..., ultimo]
+        self.sprites.pop()
+        self.n = ultimo
+        sprite.almacen = None
+
+    def refrescar(self, sprite):
+        """Vuelve a leer el tamaño del rect (cuando el sprite cambió de imagen)."""
+        self.tam[0, sprite.indice], self.tam[1, sprite.indice] = sprite.rect.size
+
+    def cortar(self):
+        """Las balas que nazcan desde ahora no se mueven en el próximo mover(), como
+        cuando nacían durante todos_sprites.update()."""
+        self.corte = self.altas
+
+    def mover(self, monstruos=None, boss=None):
+        """Un tick de Proyectil.update() para todas las balas dadas de alta antes del corte."""
+        n = self.n
+        if not n: return
+        sprites = self.sprites
+        if n < self.umbral:
+            corte = self.corte
+            for s, orden in zip(sprites[:], self.orden[:n].tolist()):
+                if orden < corte: s.paso(monstruos, boss)
+            return
+        # Balas nacidas después de cortar(): este tick se quedan donde están
+        quietas = self.orden[:n] >= self.corte if self.altas > self.corte else None
+        if self.con_homing:
+            # Homing: son pocas y usan trigonometría; se quedan en Python con math para que
+            # las repeticiones den exacto en cualquier máquina
+            guiadas = self.homing[:n] if quietas is None else self.homing[:n] & ~quietas
+            for i in np.flatnonzero(guiadas).tolist(): sprites[i].guiar(monstruos, boss)
+
+        rects = [s.rect for s in sprites]
+        pos = np.empty((2, n))
+        pos[0] = [r.x for r in rects]
+        pos[1] = [r.y for r in rects]
+        vel, rebotes = self.vel[:, :n], self.rebotes[:n]
+        nueva = _redondear(pos + vel)
+        if quietas is not None: nueva[:, quietas] = pos[:, quietas]
+        x, y = nueva
+        derecha = x + self.tam[0, :n]
+
+        rebota = (rebotes > 0) & ((x <= 0) | (derecha >= ANCHO))
+        if quietas is not None: rebota &= ~quietas
+        if rebota.any():
+            vel[0, rebota] *= -1
+            rebotes[rebota] -= 1
+            for i in np.flatnonzero(rebota).tolist():
+                s = sprites[i]
+                s._vx, s._rebotes = float(vel[0, i]), int(rebotes[i])
+
+        xs, ys = nueva.astype(np.int64).tolist()
+        for r, xi, yi in zip(rects, xs, ys):
+            r.x = xi; r.y = yi
+
+        fuera = (y + self.tam[1, :n] < 0) | (y > ALTO) | ((rebotes <= 0) & ((x > ANCHO) | (derecha < 0)))
+        if quietas is not None: fuera &= ~quietas
+        if fuera.any():
+            for s in [sprites[i] for i in np.flatnonzero(fuera).tolist()]: s.kill()
+
+
+class GrupoProyectiles(Grupo):
+    """Grupo que mantiene a sus Proyectil dados de alta en un AlmacenProyectiles."""
+
+    def __init__(self, almacen, *sprites):
+        self.almacen = almacen
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if self.almacen is not None and hasattr(sprite, 'almacen'): self.almacen.alta(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if self.almacen is not None and hasattr(sprite, 'almacen'): self.almacen.baja(sprite)
+
+
+def nuevo_almacen():
+    """Almacén para los grupos de balas de un juego (None si no hay NumPy)."""
+    return AlmacenProyectiles() if np is not None else None
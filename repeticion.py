@@ -0,0 +1,223 @@
+# REPETICIONES: graba la semilla de la partida y la entrada de cada tick (movimiento,
+# disparo, dash y elecciones de menú) para reproducirla exacta después, sin ventana y
+# sin límite de FPS, con perfilado opcional. Sirve para cazar tirones reportados.
+# Uso: python repeticion.py repeticiones/partida_xxx.json --perfil
+import argparse
+import json
+import os
+import time
+from settings import *
+from controladores import Controlador
+from sprites import EntradaJugador
+
+VERSION_GRABACION = 1
+
+
+class Grabacion:
+    """Todo lo necesario para repetir una partida: estado inicial + entrada por tick."""
+
+    def __init__(self, personaje="MAGO", dificultad=MODO_NORMAL, semilla=0, reloj_ms=0.0, mejoras=None, boss_kills=0):
+        self.personaje = personaje
+        self.dificultad = dificultad
+        self.semilla = semilla
+        self.reloj_ms = reloj_ms          # instante del reloj de frame al iniciar la partida
+        self.mejoras = dict(mejoras or {})
+        self.boss_kills = boss_kills      # del save: decide qué power-ups pueden caer
+        self.entradas = []                # tramos [repeticiones, mov, disparar, dash]
+        self.elecciones = []              # [tick, tipo, valor] de menús
+        self.tirones = []                 # [tick, ms] frames reales lentos durante la grabación
+        self.final = None                 # resumen al terminar, para verificar la repetición
+
+    @classmethod
+    def desde_juego(cls, juego, personaje, semilla):
+        datos = juego.gestor_datos.datos
+        return cls(personaje, juego.dificultad, semilla, juego.reloj_frame.instante(), datos["mejoras"], datos.get("boss_kills", 0))
+
+    def agregar_entrada(self, entrada):
+        fila = [int(entrada.mov), int(entrada.disparar), int(entrada.dash)]
+        if self.entradas and self.entradas[-1][1:] == fila: self.entradas[-1][0] += 1
+        else: self.entradas.append([1] + fila)
+
+    def marcar_tiron(self, tick, ms):
+        self.tirones.append([tick, ms])
+
+    def cerrar(self, juego, ticks):
+        self.final = {"ticks": ticks, "estado": juego.estado, "nivel": juego.nivel,
+                      "puntuacion": juego.puntuacion, "vidas": juego.mago.vidas}
+
+    def a_dict(self):
+        return {"version": VERSION_GRABACION, "juego": VERSION, "personaje": self.personaje,
+                "dificultad": self.dificultad, "semilla": self.semilla, "reloj_ms": self.reloj_ms,
+                "mejoras": self.mejoras, "boss_kills": self.boss_kills, "entradas": self.entradas, "elecciones": self.elecciones,
+                "tirones": self.tirones, "final": self.final}
+
+    @classmethod
+    def desde_dict(cls, d):
+        g = cls(d["personaje"], d["dificultad"], d["semilla"], d["reloj_ms"], d["mejoras"], d.get("boss_kills", 0))
+        g.entradas, g.elecciones, g.tirones, g.final = d["entradas"], d["elecciones"], d.get("tirones", []), d.get("final")
+        return g
+
+    def guardar(self, ruta):
+        carpeta = os.path.dirname(ruta)
+        if carpeta: os.makedirs(carpeta, exist_ok=True)
+        with open(ruta, 'w') as f:
+            json.dump(self.a_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, 'r') as f:
+            return cls.desde_dict(json.load(f))
+
+
+class ControladorGrabador(Controlador):
+    """Envuelve a otro controlador y anota todo lo que decide, tick a tick."""
+
+    def __init__(self, base, grabacion, tick_inicio):
+        self.base = base
+        self.grabacion = grabacion
+        self.tick_inicio = tick_inicio
+
+    def _tick(self, juego):
+        return juego.ticks_simulacion - self.tick_inicio
+
+    def procesar_evento(self, ev, juego):
+        self.base.procesar_evento(ev, juego)
+
+    def leer(self, juego):
+        entrada = self.base.leer(juego)
+        self.grabacion.agregar_entrada(entrada)
+        return entrada
+
+    def elegir_mejora(self, juego):
+        indice = self.base.elegir_mejora(juego)
+        if indice: self.grabacion.elecciones.append([self._tick(juego), "mejora", indice])
+        return indice
+
+    def elegir_recompensa_boss(self, juego):
+        indice = self.base.elegir_recompensa_boss(juego)
+        if indice is not None: self.grabacion.elecciones.append([self._tick(juego), "recompensa", indice])
+        return indice
+
+    def saltar_transicion(self, juego):
+        saltar = self.base.saltar_transicion(juego)
+        if saltar: self.grabacion.elecciones.append([self._tick(juego), "saltar", 1])
+        return saltar
+
+
+class ControladorRepeticion(Controlador):
+    """Devuelve exactamente la entrada grabada; se queda quieto al acabarse."""
+
+    def __init__(self, grabacion, tick_inicio):
+        self.tick_inicio = tick_inicio
+        self.elecciones = {(t, tipo): valor for t, tipo, valor in grabacion.elecciones}
+        self._tramos = iter(grabacion.entradas)
+        self._actual, self._restantes = EntradaJugador(), 0
+
+    def leer(self, juego):
+        if self._restantes == 0:
+            tramo = next(self._tramos, None)
+            if tramo is None: return EntradaJugador()
+            self._restantes, mov, disparar, dash = tramo
+            self._actual = EntradaJugador(mov, bool(disparar), bool(dash))
+        self._restantes -= 1
+        return self._actual
+
+    def _eleccion(self, juego, tipo):
+        return self.elecciones.get((juego.ticks_simulacion - self.tick_inicio, tipo))
+
+    def elegir_mejora(self, juego):
+        return self._eleccion(juego, "mejora")
+
+    def elegir_recompensa_boss(self, juego):
+        return self._eleccion(juego, "recompensa")
+
+    def saltar_transicion(self, juego):
+        return bool(self._eleccion(juego, "saltar"))
+
+
+def preparar(juego, grabacion):
+    """Deja el juego en el estado inicial grabado y con el controlador de repetición puesto."""
+    juego.activar()
+    juego.gestor_datos.datos["mejoras"].update(grabacion.mejoras)
+    juego.gestor_datos.datos["boss_kills"] = grabacion.boss_kills
+    juego.dificultad = grabacion.dificultad
+    juego.reloj_frame.fijar(grabacion.reloj_ms)
+    juego.controlador = ControladorRepeticion(grabacion, juego.ticks_simulacion)
+    juego.iniciar_partida(grabacion.personaje, semilla=grabacion.semilla)
+
+
+def reproducir(grabacion, juego=None, dibujar=False, efectos=True):
+    """Repite la partida a máxima velocidad. Devuelve (juego, ms de update() por tick).
+
+    Por defecto crea también los efectos visuales, para medir la misma carga que al jugar.
+    """
+    if juego is None:
+        from simulacion import crear_juego_headless
+        juego = crear_juego_headless()
+    juego.efectos_visuales = efectos
+    preparar(juego, grabacion)
+    total = grabacion.final["ticks"] if grabacion.final else sum(t[0] for t in grabacion.entradas)
+    tiempos = []
+    reloj = time.perf_counter
+    for _ in range(total):
+        if juego.estado in (ESTADO_GAMEOVER, ESTADO_VICTORIA_FINAL, ESTADO_MENU): break
+        t0 = reloj()
+        juego.update()
+        if dibujar: juego.dibujar()
+        tiempos.append((reloj() - t0) * 1000.0)
+    return juego, tiempos
+
+
+def coincide(grabacion, juego, ticks):
+    """True si la repetición terminó igual que la partida grabada (None si no hay resumen)."""
+    if not grabacion.final: return None
+    # El estado no se compara: salir desde la pausa no pasa por update() y no se repite
+    f = grabacion.final
+    return (f["ticks"], f["nivel"], f["puntuacion"], f["vidas"]) == (ticks, juego.nivel, juego.puntuacion, juego.mago.vidas)
+
+
+def ruta_nueva(personaje, semilla):
+    """Ruta para una grabación nueva; borra las más viejas por encima de MAX_REPETICIONES_GUARDADAS."""
+    carpeta = resolver_ruta(CARPETA_REPETICIONES)
+    if os.path.isdir(carpeta):
+        viejas = sorted(os.path.join(carpeta, f) for f in os.listdir(carpeta) if f.endswith(".json"))
+        for f in viejas[:max(0, len(viejas) - MAX_REPETICIONES_GUARDADAS + 1)]:
+            try: os.remove(f)
+            except OSError: pass
+    return os.path.join(carpeta, f"partida_{time.strftime('%Y%m%d_%H%M%S')}_{personaje}_{semilla}.json")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reproduce una partida grabada sin límite de FPS")
+    parser.add_argument("archivo")
+    parser.add_argument("--dibujar", action="store_true", help="Llamar también a dibujar() en cada tick")
+    parser.add_argument("--perfil", action="store_true", help="Perfilar la repetición con cProfile")
+    parser.add_argument("--sin-efectos", action="store_true", help="No crear partículas ni textos (solo simulación)")
+    parser.add_argument("--top", type=int, default=10, help="Ticks más lentos a listar")
+    args = parser.parse_args()
+
+    grabacion = Grabacion.cargar(args.archivo)
+    inicio = time.perf_counter()
+    if args.perfil:
+        import cProfile
+        import pstats
+        perfil = cProfile.Profile()
+        juego, tiempos = perfil.runcall(reproducir, grabacion, dibujar=args.dibujar, efectos=not args.sin_efectos)
+    else:
+        juego, tiempos = reproducir(grabacion, dibujar=args.dibujar, efectos=not args.sin_efectos)
+    segundos = time.perf_counter() - inicio
+
+    ok = coincide(grabacion, juego, len(tiempos))
+    print(f"{grabacion.personaje} (dif {grabacion.dificultad}, semilla {grabacion.semilla}): {len(tiempos)} ticks en {segundos:.2f}s "
+          f"-> {'EXACTA' if ok else ('DIVERGE' if ok is False else 'sin resumen')}")
+    if ok is False: print(f"  grabada: {grabacion.final}")
+    print(f"Estado final {juego.estado} | Nivel {juego.nivel} | Puntos {juego.puntuacion} | Vidas {juego.mago.vidas}")
+
+    tirones = {t for t, _ in grabacion.tirones}
+    print("\nTicks más lentos (* = hubo tirón al jugar):")
+    for tick, ms in sorted(enumerate(tiempos, 1), key=lambda x: -x[1])[:args.top]:
+        marca = "*" if any(abs(tick - t) <= MAX_FRAMES_SALTADOS + 1 for t in tirones) else " "
+        print(f" {marca} tick {tick:>7}  {ms:7.2f} ms")
+    if args.perfil:
+        print()
+        pstats.Stats(perfil).sort_stats("cumulative").print_stats(30)
@@ -16,6 +16,23 @@ def resolver_ruta(ruta_relativa):
 ANCHO = 800
 ALTO = 600
 FPS = 60
+# Paso fijo de simulación (ms): la lógica siempre corre a FPS ticks por segundo
+PASO_SIMULACION_MS = 1000.0 / FPS
+# Tope de FPS de dibujado (puede ser mayor que FPS gracias a la interpolación)
+FPS_RENDER = 144
+INTERPOLAR_RENDER = True
+# Saltos mayores a esto (px) entre ticks no se interpolan (teletransportes, spawns)
+DISTANCIA_MAX_INTERPOLACION = 64
+# Tope del acumulador para no entrar en espiral si el dispositivo se congela
+MAX_ACUMULADOR_MS = 250
+# FRAME-SKIP: si vamos atrasados se corren varios update() antes de un dibujar()
+FRAMESKIP_ACTIVO = True
+MAX_FRAMES_SALTADOS = 4  # dibujados omitidos como máximo por frame; el resto del atraso se descarta
+# REPETICIONES: semilla + entrada por tick de cada partida (solo escritorio)
+GRABAR_PARTIDAS = True
+CARPETA_REPETICIONES = "repeticiones"
+MAX_REPETICIONES_GUARDADAS = 5
+UMBRAL_TIRON_MS = 50  # frames reales más lentos que esto se marcan en la grabación
 VERSION = "1.0.3"
 VOLUMEN_MUSICA_DEFAULT = 0.15
 VOLUMEN_SFX_DEFAULT = 0.20
@@ -379,6 +396,8 @@ TICK_CHARCO_VENENO = 1000
 # Escalado de vida 
 PUNTOS_POR_FILA = {0: 10, 1: 30, 2: 60, 3: 150}
 HP_POR_FILA = {0: 15, 1: 30, 2: 45, 3: 55} 
+# Muertes por tick que sueltan partículas; las demás solo suman puntos y drops
+MAX_EFECTOS_MUERTE_FRAME = 6
 MULT_VIDA_POR_NIVEL = 0.15 # 10% de vida extra por nivel 
 
 COLORES_POR_FILA = {0: (50, 200, 50), 1: (200, 200, 50), 2: (200, 100, 50), 3: (200, 50, 50)}
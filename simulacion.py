@@ -0,0 +1,83 @@
+# SIMULACION HEADLESS: corre partidas sin ventana, sin audio y sin limite de FPS.
+# Uso: python simulacion.py --personaje piromante --dificultad 1 --pasos 20000
+import argparse
+import time
+from settings import *
+
+
+def crear_juego_headless(controlador=None):
+    """Crea un Juego sin ventana ni mixer (drivers dummy de SDL).
+
+    Por defecto lo maneja el piloto automático, que también resuelve los menús.
+    """
+    from main import Juego
+    from controladores import ControladorAutopiloto
+    juego = Juego(headless=True)
+    juego.controlador = controlador or ControladorAutopiloto()
+    return juego
+
+
+def simular(juego, pasos, dibujar=False):
+    """Avanza update() hasta 'pasos' veces sin esperar al reloj. Devuelve los pasos ejecutados."""
+    hechos = 0
+    while hechos < pasos:
+        if juego.estado in (ESTADO_GAMEOVER, ESTADO_VICTORIA_FINAL, ESTADO_MENU): break
+        juego.update()
+        if dibujar: juego.dibujar()
+        hechos += 1
+    return hechos
+
+
+def ejecutar_partida(tipo_personaje="MAGO", dificultad=MODO_NORMAL, pasos=FPS * 60 * 10, dibujar=False, juego=None, mejoras=None, grabar=None, semilla=None, efectos=None):
+    """Juega una partida completa en headless y devuelve un resumen.
+
+    mejoras: niveles de la tienda a usar (por defecto los del save en memoria).
+    grabar: ruta donde guardar la repetición de la partida (ver repeticion.py).
+    efectos: crear partículas y textos (por defecto solo si se dibuja); no cambia el resultado.
+    """
+    if juego is None: juego = crear_juego_headless()
+    juego.activar()
+    if mejoras is not None: juego.gestor_datos.datos["mejoras"].update(mejoras)
+    juego.dificultad = dificultad
+    juego.efectos_visuales = dibujar if efectos is None else efectos
+    juego.iniciar_partida(tipo_personaje, semilla=semilla)
+    grabacion = juego.empezar_grabacion(tipo_personaje) if grabar else None
+    inicio = time.perf_counter()
+    hechos = simular(juego, pasos, dibujar=dibujar)
+    segundos = time.perf_counter() - inicio
+    if grabacion:
+        juego.terminar_grabacion()
+        grabacion.guardar(grabar)
+    return {
+        "personaje": tipo_personaje,
+        "dificultad": dificultad,
+        "semilla": juego.semilla_partida,
+        "pasos": hechos,
+        "estado": juego.estado,
+        "nivel": juego.nivel,
+        "puntuacion": juego.puntuacion,
+        "vidas": juego.mago.vidas,
+        "danio_recibido": juego.mago.danio_recibido,
+        "cristales": juego.gestor_datos.datos["cristales"] - juego.cristales_inicio_partida,
+        "tiempos_boss": list(juego.tiempos_boss),
+        "segundos": segundos,
+        "pasos_por_segundo": hechos / segundos if segundos > 0 else 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulación headless de Mago Defence")
+    parser.add_argument("--personaje", default="MAGO", choices=list(CONFIG_PERSONAJES.keys()))
+    parser.add_argument("--dificultad", type=int, default=MODO_NORMAL, choices=[MODO_NORMAL, MODO_DIFICIL])
+    parser.add_argument("--pasos", type=int, default=FPS * 60 * 10)
+    parser.add_argument("--dibujar", action="store_true", help="Llamar también a dibujar() en cada paso")
+    parser.add_argument("--grabar", metavar="ARCHIVO", help="Guardar la repetición de la partida")
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--efectos", action="store_true", help="Crear partículas y textos aunque no se dibuje")
+    args = parser.parse_args()
+
+    r = ejecutar_partida(args.personaje, args.dificultad, args.pasos, args.dibujar, grabar=args.grabar,
+                         semilla=args.semilla, efectos=args.efectos or args.dibujar)
+    print(f"{r['personaje']} (dif {r['dificultad']}, semilla {r['semilla']}): {r['pasos']} pasos en {r['segundos']:.2f}s "
+          f"({r['pasos_por_segundo']:.0f} pasos/s, x{r['pasos_por_segundo'] / FPS:.1f} tiempo real)")
+    print(f"Estado final {r['estado']} | Nivel {r['nivel']} | Puntos {r['puntuacion']} | Vidas {r['vidas']}")
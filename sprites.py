@@ -1,27 +1,209 @@
 import pygame
 import math
-import random
+import azar
 import os
 import settings
+import tiempo
+from colisiones import indice_objetivos, area_monstruos, crear_haz, caja_colision, colision_caja, colision_circulo, COLISION_RECT, COLISION_HAZ, COLISION_MASCARA
+from collections import namedtuple
 from settings import *
 
-class Particula(pygame.sprite.Sprite):
+# Entrada de un tick para el Mago (la produce un controlador: teclado/táctil, bot o replay)
+# mov: -1 izquierda, 0 quieto, 1 derecha
+EntradaJugador = namedtuple("EntradaJugador", "mov disparar dash", defaults=(0, False, False))
+ENTRADA_VACIA = EntradaJugador()
+
+# Contexto de un tick para los update() de los sprites: Juego.update lo arma una vez y se
+# pasa posicional (grupo.update(ctx)); cada tipo lee solo los campos que usa
+ContextoFrame = namedtuple("ContextoFrame", "ahora mago monstruos grupo_s grupo_b boss", defaults=(None,) * 6)
+
+# Fuentes ya abiertas por (tamaño, negrita): SysFont busca y lee el archivo en cada llamada
+_FUENTES = {}
+
+def fuente(size, negrita=True):
+    f = _FUENTES.get((size, negrita))
+    if f is None: f = _FUENTES[(size, negrita)] = pygame.font.SysFont("Arial", size, negrita)
+    return f
+
+
+class Reciclador:
+    """Guarda las instancias muertas de una clase para reutilizarlas en vez de crear otras.
+
+    Lo que muere durante un tick se puede reutilizar recién después de liberar() (al
+    empezar el siguiente): quien todavía tenga la referencia en ese tick no la ve cambiar.
+    """
+
+    def __init__(self, clase, maximo=512):
+        self.clase, self.maximo = clase, maximo
+        self.libres, self.pendientes = [], []
+        RECICLADORES.append(self)
+
+    def obtener(self, *args, **kwargs):
+        if not self.libres: return self.clase(*args, **kwargs)
+        obj = self.libres.pop()
+        obj.reciclar(*args, **kwargs)
+        return obj
+
+    def devolver(self, obj):
+        if type(obj) is self.clase and len(self.libres) + len(self.pendientes) < self.maximo:
+            self.pendientes.append(obj)
+
+    def liberar(self):
+        if self.pendientes:
+            self.libres.extend(self.pendientes)
+            self.pendientes.clear()
+
+RECICLADORES = []
+
+def liberar_reciclados():
+    """Pasa a disponibles las instancias muertas en el tick anterior (Juego.update)."""
+    for r in RECICLADORES: r.liberar()
+
+
+class Entidad:
+    """Sprite liviano con __slots__ para los tipos que hay por cientos en pantalla.
+
+    pygame.sprite.Sprite no declara __slots__, así que todo lo que hereda de él lleva un
+    __dict__. Entidad no hereda de Sprite pero cumple el mismo protocolo con los grupos
+    (add, remove, kill, alive, groups y los add_internal/remove_internal que llaman los
+    Group), así que se agrega a cualquier grupo y se dibuja igual. Cada subclase declara
+    en __slots__ todos los atributos que se le asignan, también desde fuera de la clase.
+    """
+    __slots__ = ("image", "rect", "_grupos")
+
+    def __init__(self, *grupos):
+        self._grupos = set()
+        if grupos: self.add(*grupos)
+
+    def add(self, *grupos):
+        for g in grupos:
+            if not hasattr(g, "_spritegroup"): self.add(*g)
+            elif g not in self._grupos:
+                g.add_internal(self)
+                self._grupos.add(g)
+
+    def remove(self, *grupos):
+        for g in grupos:
+            if not hasattr(g, "_spritegroup"): self.remove(*g)
+            elif g in self._grupos:
+                g.remove_internal(self)
+                self._grupos.remove(g)
+
+    def add_internal(self, grupo):
+        self._grupos.add(grupo)
+
+    def remove_internal(self, grupo):
+        self._grupos.remove(grupo)
+
+    def update(self, ctx=None):
+        pass
+
+    def kill(self):
+        for g in self._grupos: g.remove_internal(self)
+        self._grupos.clear()
+
+    def groups(self):
+        return list(self._grupos)
+
+    def alive(self):
+        return bool(self._grupos)
+
+
+class Grupo(pygame.sprite.Group):
+    """Group con camino directo para Entidad.
+
+    Group.add/remove/has solo reconocen a Sprite; cualquier otra cosa la prueban primero
+    como iterable y recién con la excepción la tratan como sprite. Acá una Entidad va
+    directo a add_internal/remove_internal, igual que un Sprite.
+    """
+
+    def add(self, *sprites):
+        for s in sprites:
+            if isinstance(s, _UNITARIOS):
+                if s not in self.spritedict:
+                    self.add_internal(s)
+                    s.add_internal(self)
+            else: super().add(s)
+
+    def remove(self, *sprites):
+        for s in sprites:
+            if isinstance(s, _UNITARIOS):
+                if s in self.spritedict:
+                    self.remove_internal(s)
+                    s.remove_internal(self)
+            else: super().remove(s)
+
+    def has(self, *sprites):
+        if not sprites: return False
+        for s in sprites:
+            if not (s in self.spritedict if isinstance(s, _UNITARIOS) else super().has(s)): return False
+        return True
+
+_UNITARIOS = (Entidad, pygame.sprite.Sprite)
+
+
+_RANURAS = {}
+
+def ranuras(clase):
+    """Todos los __slots__ de la clase y de sus bases."""
+    r = _RANURAS.get(clase)
+    if r is None:
+        r = _RANURAS[clase] = tuple(n for c in clase.__mro__ for n in c.__dict__.get("__slots__", ()))
+    return r
+
+
+class Reciclable:
+    """Entidades con Reciclador: se crean con Clase.nuevo(...) y kill() las devuelve."""
+    __slots__ = ()
+    reciclador = None
+
+    @classmethod
+    def nuevo(cls, *args, **kwargs):
+        r = cls.reciclador
+        if r is None or r.clase is not cls: return cls(*args, **kwargs)
+        return r.obtener(*args, **kwargs)
+
+    def reciclar(self, *args, **kwargs):
+        """Deja la instancia como recién creada (por defecto, borrando todo y repitiendo __init__)."""
+        for nombre in ranuras(type(self)):
+            if hasattr(self, nombre): delattr(self, nombre)
+        self.__init__(*args, **kwargs)
+
+    def kill(self):
+        if not self.alive(): return
+        super().kill()
+        if self.reciclador is not None: self.reciclador.devolver(self)
+
+
+class Particula(Reciclable, Entidad):
+    __slots__ = ("vx", "vy", "alpha", "decay")
+
     def __init__(self, x, y, color):
         super().__init__()
-        size = random.randint(2, 6)
-        self.image = pygame.Surface((size, size))
+        self.image = None
+        self.reciclar(x, y, color)
+
+    def reciclar(self, x, y, color):
+        # La superficie se reutiliza si el tamaño coincide
+        size = azar.fx.randint(2, 6)
+        if self.image is None or self.image.get_width() != size: self.image = pygame.Surface((size, size))
+        else: self.image.set_alpha(None)
         self.image.fill(color)
         self.rect = self.image.get_rect(center=(x, y))
-        self.vx, self.vy = random.uniform(-6, 6), random.uniform(-6, 6)
-        self.alpha, self.decay = 255, random.randint(8, 15)
+        self.vx, self.vy = azar.fx.uniform(-6, 6), azar.fx.uniform(-6, 6)
+        self.alpha, self.decay = 255, azar.fx.randint(8, 15)
 
-    def update(self, *args, **kwargs):
+    def update(self, ctx=None):
         self.rect.x += self.vx; self.rect.y += self.vy; self.vy += 0.2
         self.alpha -= self.decay
         if self.alpha <= 0: self.kill()
         else: self.image.set_alpha(self.alpha)
 
-class OrbeXP(pygame.sprite.Sprite):
+Particula.reciclador = Reciclador(Particula, 256)
+
+class OrbeXP(Entidad):
+    __slots__ = ("valor", "vx", "vy", "colisionador")
+
     def __init__(self, x, y):
         super().__init__()
         self.valor = XP_POR_ENEMIGO
@@ -30,12 +212,12 @@ class OrbeXP(pygame.sprite.Sprite):
         pygame.draw.circle(self.image, VERDE_XP, (size//2, size//2), size//2)
         pygame.draw.circle(self.image, BLANCO, (size//2, size//2), size//4)
         self.rect = self.image.get_rect(center=(x, y))
-        self.vy = random.uniform(1.5, 3.0)
-        self.vx = random.uniform(-1, 1)
+        self.colisionador = colision_circulo(size // 2)
+        self.vy = azar.sim.uniform(1.5, 3.0)
+        self.vx = azar.sim.uniform(-1, 1)
 
-    def update(self, *args, **kwargs):
-        mago = kwargs.get('mago', None)
-        if not mago and args and not isinstance(args[0], pygame.sprite.Group): mago = args[0] # Positional fallback safe check
+    def update(self, ctx=None):
+        mago = ctx.mago if ctx else None
         if mago:
             dx = mago.rect.centerx - self.rect.centerx
             dy = mago.rect.centery - self.rect.centery
@@ -51,16 +233,16 @@ class OrbeXP(pygame.sprite.Sprite):
 class ParticulaAmbiental(pygame.sprite.Sprite):
     def __init__(self, x, y, tipo="luciernaga"):
         super().__init__()
-        size = random.randint(2, 4)
+        size = azar.fx.randint(2, 4)
         self.image = pygame.Surface((size, size), pygame.SRCALPHA)
         color = COLOR_LUCIERNAGA if tipo == "luciernaga" else COLOR_MOTA_MAGICA
         pygame.draw.circle(self.image, color, (size//2, size//2), size//2)
         self.rect = self.image.get_rect(center=(x, y))
-        self.vx = random.uniform(-0.5, 0.5)
-        self.vy = random.uniform(-0.5, -1.5) if tipo == "luciernaga" else random.uniform(-1, 1)
+        self.vx = azar.fx.uniform(-0.5, 0.5)
+        self.vy = azar.fx.uniform(-0.5, -1.5) if tipo == "luciernaga" else azar.fx.uniform(-1, 1)
         self.alpha, self.estado_alpha = 0, 1
 
-    def update(self, *args, **kwargs):
+    def update(self, ctx=None):
         self.rect.x += self.vx; self.rect.y += self.vy
         if self.estado_alpha == 1:
             self.alpha += 3
@@ -69,9 +251,11 @@ class ParticulaAmbiental(pygame.sprite.Sprite):
             self.alpha -= 2
             if self.alpha <= 0: self.kill()
         self.image.set_alpha(self.alpha)
-        if random.random() < 0.05: self.vx += random.uniform(-0.1, 0.1)
+        if azar.fx.random() < 0.05: self.vx += azar.fx.uniform(-0.1, 0.1)
+
+class Orbital(Entidad):
+    __slots__ = ("radio", "colisionador", "centro_x", "centro_y", "radio_orbita", "angulo", "velocidad_angular", "danio")
 
-class Orbital(pygame.sprite.Sprite):
     def __init__(self, centro_x, centro_y, radio_orbita, velocidad_angular):
         super().__init__()
         self.radio = 8
@@ -79,14 +263,11 @@ class Orbital(pygame.sprite.Sprite):
         pygame.draw.circle(self.image, ROJO_ORBITAL, (self.radio, self.radio), self.radio)
         pygame.draw.circle(self.image, BLANCO, (self.radio, self.radio), self.radio // 2)
         self.rect = self.image.get_rect()
+        self.colisionador = colision_circulo(self.radio)
         self.centro_x, self.centro_y, self.radio_orbita = centro_x, centro_y, radio_orbita
         self.angulo, self.velocidad_angular, self.danio = 0, velocidad_angular, 5 
 
-    def update(self, *args, **kwargs):
-        centro_nuevo_x = kwargs.get('centro_nuevo_x', None)
-        centro_nuevo_y = kwargs.get('centro_nuevo_y', None)
-        if not centro_nuevo_x and len(args) >= 2:
-             centro_nuevo_x, centro_nuevo_y = args[0], args[1]
+    def update(self, centro_nuevo_x=None, centro_nuevo_y=None):
         if centro_nuevo_x is not None:
             self.centro_x, self.centro_y = centro_nuevo_x, centro_nuevo_y
         self.angulo += self.velocidad_angular
@@ -95,9 +276,41 @@ class Orbital(pygame.sprite.Sprite):
         self.rect.centerx = self.centro_x + math.cos(rad) * self.radio_orbita
         self.rect.centery = self.centro_y + math.sin(rad) * self.radio_orbita
 
-class Proyectil(pygame.sprite.Sprite):
+# Imagen de bala por aspecto: las balas iguales comparten la superficie (nadie la
+# modifica; reflejar() pone otra)
+_IMAGENES_PROYECTIL = {}
+
+def imagen_proyectil(radio, color, enemigo=False, centro=False, borde_hielo=False):
+    clave = (radio, tuple(color), enemigo, centro, borde_hielo)
+    img = _IMAGENES_PROYECTIL.get(clave)
+    if img is not None: return img
+    if enemigo:
+        # Glow Effect
+        glow_surf = pygame.Surface((radio*4, radio*4), pygame.SRCALPHA)
+        pygame.draw.circle(glow_surf, (*COLOR_GLOW_ENEMIGO, 100), (radio*2, radio*2), radio*2)
+        img = pygame.Surface((radio*4, radio*4), pygame.SRCALPHA)
+        img.blit(glow_surf, (0,0))
+        pygame.draw.circle(img, color, (radio*2, radio*2), radio)
+    else:
+        img = pygame.Surface((radio*2+6, radio*2+6), pygame.SRCALPHA)
+        pygame.draw.circle(img, color, (radio+3, radio+3), radio)
+        if centro: pygame.draw.circle(img, BLANCO, (radio+3, radio+3), radio//3)
+        # Efecto adicional para hielo: borde brillante
+        if borde_hielo: pygame.draw.circle(img, (200, 240, 255), (radio+3, radio+3), radio, width=2)
+    _IMAGENES_PROYECTIL[clave] = img
+    return img
+
+class Proyectil(Reciclable, Entidad):
+    __slots__ = ("danio", "es_explosivo", "es_enemigo", "_rebotes", "penetracion", "es_homing", "es_hielo", "es_fragmentacion",
+                 "target", "es_bomba", "es_quemadura", "furia_ignea", "tirador_sombra", "color", "color_original", "es_potenciado",
+                 "es_critico", "colisionador", "_vx", "_vy", "velocidad_total", "pos_previa", "enemigos_atacados",
+                 "almacen", "indice", "grupos_almacen")
+
     def __init__(self, x, y, vx, vy, danio, color=CIAN_MAGIA, es_explosivo=False, es_enemigo=False, es_potenciado=False, rebotes=0, penetracion=0, radio_custom=None, es_homing=False, target=None, es_hielo=False, es_fragmentacion=False, es_quemadura=False, es_bomba=False, furia_ignea=False, tirador_sombra=False, es_critico=False, proyectil_grande=False):
         super().__init__()
+        # Con un GrupoProyectiles lo mueve el AlmacenProyectiles (proyectiles.py); vx, vy y
+        # rebotes se escriben también en sus arreglos
+        self.almacen = None
         self.danio, self.es_explosivo, self.es_enemigo = danio, es_explosivo, es_enemigo
         self.rebotes, self.penetracion, self.es_homing, self.es_hielo, self.es_fragmentacion = rebotes, penetracion, es_homing, es_hielo, es_fragmentacion
         self.target, self.es_bomba = target, es_bomba 
@@ -118,16 +331,9 @@ class Proyectil(pygame.sprite.Sprite):
             c = color if color != MORADO_OSCURO else COLOR_PROYECTIL_ENEMIGO
             if radio > 20: c = MORADO_CARGADO 
             if color == BOSS_FUEGO_COLOR: c = BOSS_FUEGO_COLOR
-            
-            # Glow Effect
-            glow_surf = pygame.Surface((radio*4, radio*4), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surf, (*COLOR_GLOW_ENEMIGO, 100), (radio*2, radio*2), radio*2)
-            self.image = pygame.Surface((radio*4, radio*4), pygame.SRCALPHA)
-            self.image.blit(glow_surf, (0,0))
-            pygame.draw.circle(self.image, c, (radio*2, radio*2), radio)
+            self.image = imagen_proyectil(radio, c, enemigo=True)
             self.rect = self.image.get_rect(center=(x, y))
         else:
-            self.image = pygame.Surface((radio*2+6, radio*2+6), pygame.SRCALPHA)
             c = ORO_PODER if es_potenciado else color
             if self.es_homing: c = AZUL_HOMING 
             if self.es_hielo: c = AZUL_CONGELADO
@@ -135,37 +341,47 @@ class Proyectil(pygame.sprite.Sprite):
             if self.es_quemadura: c = ROJO_VIDA # Visual Fuego
             if self.penetracion > 0: c = (255, 255, 200) # Visual Perforante (Mas blanco brillante)
 
-            pygame.draw.circle(self.image, c, (radio+3, radio+3), radio)
-            if es_explosivo or self.es_hielo: pygame.draw.circle(self.image, BLANCO, (radio+3, radio+3), radio//3)
-            # Efecto adicional para hielo: borde brillante animado
-            if self.es_hielo:
-                pygame.draw.circle(self.image, (200, 240, 255), (radio+3, radio+3), radio, width=2)
+            self.image = imagen_proyectil(radio, c, centro=es_explosivo or self.es_hielo, borde_hielo=self.es_hielo)
             self.rect = self.image.get_rect(center=(x, y))
         
+        self.colisionador = colision_circulo(radio)
         self.vx, self.vy = vx, vy
         self.velocidad_total = math.hypot(vx, vy)
+        self.pos_previa = self.rect.center  # las que nacen a mitad de tick también barren su primer paso
+        self.enemigos_atacados = set()  # perforantes y rebotes golpean a cada enemigo una sola vez
 
-    def update(self, *args, **kwargs):
-        monstruos = kwargs.get('monstruos', None)
-        boss = kwargs.get('boss', None)
-        if not monstruos and args and isinstance(args[0], pygame.sprite.Group): monstruos = args[0]
-        
-        if self.es_homing:
-            if (not self.target or not self.target.alive()):
-                if monstruos:
-                    self.target = self.buscar_target(monstruos, boss)
-            
-            if self.target and self.target.alive():
-                dx, dy = self.target.rect.centerx - self.rect.centerx, self.target.rect.centery - self.rect.centery
-                angulo_target = math.atan2(dy, dx)
-                angulo_actual = math.atan2(self.vy, self.vx)
-                diff = angulo_target - angulo_actual
-                while diff <= -math.pi: diff += 2*math.pi
-                while diff > math.pi: diff -= 2*math.pi
-                
-                nueva_dir = angulo_actual + diff * 0.15
-                self.vx = math.cos(nueva_dir) * self.velocidad_total
-                self.vy = math.sin(nueva_dir) * self.velocidad_total
+    @property
+    def vx(self): return self._vx
+
+    @vx.setter
+    def vx(self, v):
+        self._vx = v
+        if self.almacen is not None: self.almacen.vel[0, self.indice] = v
+
+    @property
+    def vy(self): return self._vy
+
+    @vy.setter
+    def vy(self, v):
+        self._vy = v
+        if self.almacen is not None: self.almacen.vel[1, self.indice] = v
+
+    @property
+    def rebotes(self): return self._rebotes
+
+    @rebotes.setter
+    def rebotes(self, v):
+        self._rebotes = v
+        if self.almacen is not None: self.almacen.rebotes[self.indice] = v
+
+    def update(self, ctx=None):
+        if self.almacen is not None: return  # lo mueve AlmacenProyectiles.mover()
+        if ctx: self.paso(ctx.monstruos, ctx.boss)
+        else: self.paso()
+
+    def paso(self, monstruos=None, boss=None):
+        """Un tick de movimiento: homing, avance, rebote en los bordes y salida de pantalla."""
+        if self.es_homing: self.guiar(monstruos, boss)
 
         self.rect.x += self.vx
         self.rect.y += self.vy
@@ -178,26 +394,31 @@ class Proyectil(pygame.sprite.Sprite):
             (self.rebotes <= 0 and (self.rect.left > ANCHO or self.rect.right < 0))):
             self.kill()
 
+    def guiar(self, monstruos, boss=None):
+        """Homing: gira la velocidad hacia el objetivo (y busca otro si murió)."""
+        if (not self.target or not self.target.alive()):
+            if monstruos:
+                self.target = self.buscar_target(monstruos, boss)
+        
+        if self.target and self.target.alive():
+            dx, dy = self.target.rect.centerx - self.rect.centerx, self.target.rect.centery - self.rect.centery
+            angulo_target = math.atan2(dy, dx)
+            angulo_actual = math.atan2(self.vy, self.vx)
+            diff = angulo_target - angulo_actual
+            while diff <= -math.pi: diff += 2*math.pi
+            while diff > math.pi: diff -= 2*math.pi
+            
+            nueva_dir = angulo_actual + diff * 0.15
+            self.vx = math.cos(nueva_dir) * self.velocidad_total
+            self.vy = math.sin(nueva_dir) * self.velocidad_total
+
     def buscar_target(self, monstruos, boss=None):
-        target, d_min = None, 9999
-        candidatos = list(monstruos)
-        if boss and boss.alive() and not boss.destruyendo:
-            candidatos.append(boss)
-        for m in candidatos:
-            if m.alive():
-                d = math.hypot(m.rect.centerx - self.rect.centerx, m.rect.centery - self.rect.centery)
-                if d < d_min:
-                    d_min, target = d, m
+        jefe = boss if boss and boss.alive() and not boss.destruyendo else None
+        target, _ = indice_objetivos(monstruos).mas_cercano(self.rect.centerx, self.rect.centery, jefe=jefe)
         return target
 
     def rebotar(self, monstruos, ignorar=None):
-        nuevo_target = None
-        d_min = 9999
-        for m in monstruos:
-            if m.alive() and m != ignorar:
-                d = math.hypot(m.rect.centerx - self.rect.centerx, m.rect.centery - self.rect.centery)
-                if d < d_min:
-                    d_min, nuevo_target = d, m
+        nuevo_target, _ = indice_objetivos(monstruos).mas_cercano(self.rect.centerx, self.rect.centery, ignorar=ignorar)
         
         if nuevo_target:
             dx, dy = nuevo_target.rect.centerx - self.rect.centerx, nuevo_target.rect.centery - self.rect.centery
@@ -214,30 +435,51 @@ class Proyectil(pygame.sprite.Sprite):
             rad = math.radians(i * 60)
             vx, vy = math.cos(rad) * 6, math.sin(rad) * 6
             
-            f = Proyectil(self.rect.centerx, self.rect.centery, vx, vy, 4 * multi, 
+            f = Proyectil.nuevo(self.rect.centerx, self.rect.centery, vx, vy, 4 * multi, 
                           color=self.color_original, es_potenciado=(multi > 1),
                           es_hielo=self.es_hielo, es_quemadura=self.es_quemadura)
             grupo_s.add(f); grupo_b.add(f)
 
+    def reflejar(self, danio):
+        """Escudo especial: la bala enemiga vuelve hacia arriba como bala explosiva del Mago."""
+        self.es_enemigo = False
+        self.danio = danio
+        self.vy = -abs(self.vy) # Asegurar que vaya hacia arriba
+        self.color = CIAN_MAGIA
+        self.es_explosivo = True
+        
+        # Actualizar imagen del proyectil
+        self.image = imagen_proyectil(10, CIAN_MAGIA, centro=True)
+        self.rect = self.image.get_rect(center=self.rect.center)
+        self.colisionador = colision_circulo(10)
+        if self.almacen is not None: self.almacen.refrescar(self)
+
+Proyectil.reciclador = Reciclador(Proyectil, 512)
+
 class Rayo(pygame.sprite.Sprite):
+    colisionador = COLISION_RECT
+
     def __init__(self, x, y):
         super().__init__()
         self.es_rayo, self.danio = True, 9999
+        self.enemigos_atacados = set()
         self.image = pygame.Surface((20, 120), pygame.SRCALPHA)
         self.rect = self.image.get_rect(midbottom=(x, y)); self.vy = -22; self.anim_timer = 0
         self.dibujar_zigzag()
 
     def dibujar_zigzag(self):
         self.image.fill((0,0,0,0)); pts = []
-        for i in range(9): pts.append((10 + random.randint(-8,8), i * (120/8)))
+        for i in range(9): pts.append((10 + azar.fx.randint(-8,8), i * (120/8)))
         if len(pts)>1: pygame.draw.lines(self.image, AZUL_RAYO, False, pts, 5)
 
-    def update(self, *args, **kwargs):
+    def update(self, ctx=None):
         self.rect.y += self.vy; self.anim_timer += 1
         if self.anim_timer % 3 == 0: self.dibujar_zigzag()
         if self.rect.bottom < 0: self.kill()
 
 class Boss(pygame.sprite.Sprite):
+    colisionador = COLISION_MASCARA
+
     def __init__(self, nivel, dificultad, variante=BOSS_TIPO_NORMAL):
         super().__init__()
         self.dificultad, self.variante = dificultad, variante
@@ -246,7 +488,9 @@ class Boss(pygame.sprite.Sprite):
         self.hp = self.hp_max
         self.color_base = (100, 200, 255) if self.variante == BOSS_TIPO_HIELO else ((50, 200, 50) if self.variante == BOSS_TIPO_TOXICO else (BOSS_FUEGO_COLOR if self.variante == BOSS_TIPO_FUEGO else MORADO_OSCURO))
         self.cargar_imagen()
+        self.precalcular_mascaras()
         self.image = self.image_original.copy()
+        self.mascara = self.mascara_de("original")
         self.rect = self.image.get_rect(midtop=(ANCHO//2, -180)); self.rect.inflate_ip(-40, -10)
         self.pos_x, self.pos_y = float(self.rect.x), float(self.rect.y)
         self.vx, self.vy = VEL_BOSS_X_MAX, VEL_BOSS_Y_MAX
@@ -289,15 +533,33 @@ class Boss(pygame.sprite.Sprite):
             pygame.draw.circle(self.image_original, BLANCO, (110, 60), 15)
             pygame.draw.circle(self.image_original, NEGRO, (110, 60), 5)
 
+    def precalcular_mascaras(self):
+        """Máscaras de colisión de cada imagen base. Los tintes y el brillo no cambian la silueta."""
+        self.mascaras = {}
+        for nombre in ("original", "ataque", "muerte"):
+            self.mascara_de(nombre)
+
+    def mascara_de(self, nombre, tam=None):
+        """Máscara de self.image_<nombre> escalada a 'tam' (la calcula una sola vez)."""
+        base = getattr(self, "image_" + nombre)
+        tam = tam or base.get_size()
+        m = self.mascaras.get((nombre, tam))
+        if m is None:
+            img = base if tam == base.get_size() else pygame.transform.scale(base, tam)
+            m = self.mascaras[(nombre, tam)] = pygame.mask.from_surface(img)
+        return m
+
     def iniciar_muerte(self):
         if not self.destruyendo: 
-            self.destruyendo, self.timer_muerte, self.vx, self.vy = True, pygame.time.get_ticks() + 2500, 0, 0
+            self.destruyendo, self.timer_muerte, self.vx, self.vy = True, tiempo.ahora() + 2500, 0, 0
             self.image = self.image_muerte.copy()
+            self.mascara = self.mascara_de("muerte")
 
     def congelar(self):
         self.congelado = True
-        self.timer_descongelar = pygame.time.get_ticks() + DURACION_CONGELACION_BOSS
+        self.timer_descongelar = tiempo.ahora() + DURACION_CONGELACION_BOSS
         self.image = self.image_original.copy()
+        self.mascara = self.mascara_de("original")
         tinte = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
         tinte.fill((*AZUL_CONGELADO, 120)); self.image.blit(tinte, (0,0), special_flags=pygame.BLEND_RGBA_ADD)
 
@@ -309,7 +571,7 @@ class Boss(pygame.sprite.Sprite):
         glow_surf.blit(surf, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
         
         for i in range(2):
-             surf.blit(glow_surf, (random.randint(-3, 3), random.randint(-4, 4)), special_flags=pygame.BLEND_RGBA_ADD)
+             surf.blit(glow_surf, (azar.fx.randint(-3, 3), azar.fx.randint(-4, 4)), special_flags=pygame.BLEND_RGBA_ADD)
         return surf
 
     def aplicar_tint(self, surf, color):
@@ -321,36 +583,32 @@ class Boss(pygame.sprite.Sprite):
         surf.blit(tint_surf, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
         return surf
 
-    def update(self, *args, **kwargs):
-        ahora = kwargs.get('ahora', pygame.time.get_ticks())
-        grupo_s = kwargs.get('grupo_s', None)
-        grupo_b = kwargs.get('grupo_b', None)
-        if not grupo_s and args: # Positional fallback
-            if len(args) >= 1: ahora = args[0]
-            if len(args) >= 2: grupo_s = args[1]
-            if len(args) >= 3: grupo_b = args[2]
-        if ahora is None or grupo_s is None or grupo_b is None: return
+    def update(self, ctx=None):
+        if ctx is None or ctx.grupo_s is None or ctx.grupo_b is None: return
+        ahora, grupo_s, grupo_b = ctx.ahora, ctx.grupo_s, ctx.grupo_b
         if self.congelado:
-            if ahora > self.timer_descongelar: self.congelado, self.image = False, self.image_original.copy()
+            if ahora > self.timer_descongelar: self.congelado, self.image, self.mascara = False, self.image_original.copy(), self.mascara_de("original")
             else: return
         if self.destruyendo:
             self.alpha_muerte = max(0, self.alpha_muerte - 2)
             self.image.set_alpha(self.alpha_muerte)
             jitter = 8 if self.alpha_muerte > 100 else 4
-            self.rect.center = (self.pos_x + random.randint(-jitter,jitter) + 80, self.pos_y + random.randint(-jitter,jitter) + 70)
+            self.rect.center = (self.pos_x + azar.sim.randint(-jitter,jitter) + 80, self.pos_y + azar.sim.randint(-jitter,jitter) + 70)
             if ahora > self.timer_muerte or self.alpha_muerte <= 0: self.kill()
             return
         if self.preparando_ataque:
             self.image = self.image_ataque.copy()
+            self.mascara = self.mascara_de("ataque")
             if ((ahora - self.timer_preparacion_inicio) // 100) % 2 == 0: self.image.set_alpha(150)
             else: self.image.set_alpha(255)
             if ahora - self.timer_preparacion_inicio >= BOSS_TIEMPO_TELEGRAFO:
                 self.preparando_ataque = False
                 self.image = self.image_original.copy()
+                self.mascara = self.mascara_de("original")
                 self.ultimo_ataque_cargado = ahora
                 self.recoil_y = -30 # Retroceso fuerte
                 c_p = self.color_base
-                p = Proyectil(self.rect.centerx, self.rect.bottom + 20, 0, 9.0, 4, es_enemigo=True, color=c_p, radio_custom=55, es_bomba=True)
+                p = Proyectil.nuevo(self.rect.centerx, self.rect.bottom + 20, 0, 9.0, 4, es_enemigo=True, color=c_p, radio_custom=55, es_bomba=True)
                 grupo_s.add(p); grupo_b.add(p)
             return
         
@@ -362,7 +620,7 @@ class Boss(pygame.sprite.Sprite):
             self.pos_x += self.vx; self.pos_y += self.vy
             if self.pos_x <= 10 or self.pos_x + 160 >= ANCHO - 10: self.vx *= -1
             if self.pos_y <= 20 or self.pos_y + 140 >= LIMITE_INFERIOR_BOSS: self.vy *= -1
-            if ahora > self.timer_ia: self.vx, self.vy = random.uniform(-4, 4), random.uniform(-2, 2); self.timer_ia = ahora + 3000
+            if ahora > self.timer_ia: self.vx, self.vy = azar.sim.uniform(-4, 4), azar.sim.uniform(-2, 2); self.timer_ia = ahora + 3000
         self.rect.x, self.rect.y = int(self.pos_x), int(self.pos_y + self.recoil_y + self.float_y)
         
         # --- PATRONES DE ATAQUE POR VARIANTE ---
@@ -390,13 +648,13 @@ class Boss(pygame.sprite.Sprite):
                 b_color = self.color_base
                 # Jefe Hielo tiene arco congelante
                 es_hielo = (self.variante == BOSS_TIPO_HIELO)
-                p = Proyectil(self.rect.centerx, self.rect.bottom, vx, vy, 1, es_enemigo=True, color=b_color, radio_custom=14, es_hielo=es_hielo)
+                p = Proyectil.nuevo(self.rect.centerx, self.rect.bottom, vx, vy, 1, es_enemigo=True, color=b_color, radio_custom=14, es_hielo=es_hielo)
                 grupo_s.add(p); grupo_b.add(p)
 
         if self.en_rafaga:
             if ahora - self.ultimo_rafaga > 150:
                 self.ultimo_rafaga = ahora
-                p = Proyectil(self.rect.centerx + random.randint(-40, 40), self.rect.bottom, 0, 7.5, 1, es_enemigo=True, radio_custom=9)
+                p = Proyectil.nuevo(self.rect.centerx + azar.sim.randint(-40, 40), self.rect.bottom, 0, 7.5, 1, es_enemigo=True, radio_custom=9)
                 grupo_s.add(p); grupo_b.add(p)
                 self.balas_rafaga -= 1
                 if self.balas_rafaga <= 0: self.en_rafaga = False
@@ -458,18 +716,20 @@ class Mago(pygame.sprite.Sprite):
         
         self.cargar_assets(cfg["color"])
         self.rect = self.image.get_rect(midbottom=(ANCHO // 2, ALTO - 40))
-        self.hitbox = self.rect.inflate(-self.rect.width/2, -self.rect.height/2)
+        self.colisionador = colision_caja(-self.rect.width / 2, -self.rect.height / 2)
+        self.hitbox = caja_colision(self)
 
         
         # Vida usando configuración de balanceo
         self.max_vidas = cfg["vida_maxima"] + meta_mejoras.get("vida_base", 0)
         self.vidas = self.max_vidas
+        self.danio_recibido = 0  # Vidas perdidas en la partida (estadística)
         
         self.xp_actual, self.xp_requerida, self.nivel_run, self.oleada_actual = 0, XP_BASE_REQUERIDA, 1, 1
         self.ultimo_disparo = self.fin_powerup = self.cargas = self.fin_doble_danio = self.fin_escudo = 0
         self.powerup_actual = "normal"; self.doble_danio_activo = self.esta_disparando = self.escudo_activo = self.invulnerable = False
         self.fin_animacion_disparo = self.fin_invulnerable = self.radio_escudo = 140
-        self.orbitales_grupo = pygame.sprite.Group(); self.orbital_activo = False; self.fin_orbital = 0
+        self.orbitales_grupo = Grupo(); self.orbital_activo = False; self.fin_orbital = 0
         
         # ESCUDO ESPECIAL NIVEL 5 (HABILIDAD ÚNICA DEL PERSONAJE)
         self.escudo_especial = None
@@ -521,11 +781,12 @@ class Mago(pygame.sprite.Sprite):
         if settings.DEBUG_MODE:
             self._aplicar_debug_boosts()
 
-        # Atributos para control táctil
+        # Atributos para control táctil (los lee el controlador humano)
         self.mover_izquierda = False
         self.mover_derecha = False
         self.disparando_tactil = False
-        self.direccion_touch = 0
+        # Entrada del tick actual, la asigna Juego desde su controlador
+        self.entrada = ENTRADA_VACIA
 
     def _aplicar_debug_boosts(self):
         """Aplica boosts de estadísticas para modo debug"""
@@ -596,7 +857,7 @@ class Mago(pygame.sprite.Sprite):
         self.image = self.imagen_normal
 
     def dash(self):
-        ahora = pygame.time.get_ticks()
+        ahora = tiempo.ahora()
         if ahora > self.dash_cd and self.dash_dir != 0:
             self.dashing, self.fin_dash, self.dash_cd, self.invulnerable = True, ahora + self.dash_duracion, ahora + self.dash_cooldown, True
             self.fin_invulnerable = ahora + self.dash_duracion + 100
@@ -609,7 +870,7 @@ class Mago(pygame.sprite.Sprite):
         return False
 
     def aplicar_powerup(self, tipo):
-        ahora = pygame.time.get_ticks()
+        ahora = tiempo.ahora()
         stats = POWERUPS_STATS.get(tipo, {})
         if tipo == "escudo":
             self.escudo_pendiente = True
@@ -637,7 +898,7 @@ class Mago(pygame.sprite.Sprite):
     def activar_escudo(self):
         self.escudo_pendiente = False
         self.escudo_activo = True
-        self.fin_escudo = pygame.time.get_ticks() + 8000
+        self.fin_escudo = tiempo.ahora() + 8000
 
     def cargar(self):
         if self.tipo == "snake":
@@ -718,7 +979,7 @@ class Mago(pygame.sprite.Sprite):
             self.cargar()
             return
         
-        ahora = pygame.time.get_ticks()
+        ahora = tiempo.ahora()
         esc_cad = self.config.get("cadencia_escalado", ESCALADO_CADENCIA_POR_NIVEL)
         cadencia = (CADENCIA_BASE * (esc_cad ** self.oleada_actual)) / self.stats["velocidad_ataque_multi"]
         if self.powerup_actual == "cadencia": cadencia *= 0.4
@@ -730,7 +991,7 @@ class Mago(pygame.sprite.Sprite):
             self.ultimo_disparo, self.esta_disparando, self.fin_animacion_disparo = ahora, True, ahora + 150
             if self.snd_disparo: self.snd_disparo.play()
             
-            es_critico = random.random() < self.stats["chance_critico"]
+            es_critico = azar.sim.random() < self.stats["chance_critico"]
             multi_critico = self.stats["danio_critico"] if es_critico else 1
             danio = DANIO_BASE_MAGO * self.stats["danio_multi"] * (2 if self.doble_danio_activo else 1) * multi_critico
             
@@ -748,12 +1009,9 @@ class Mago(pygame.sprite.Sprite):
             target = None
             if self.powerup_actual == "homing" and self.cargas > 0:
                 if not (settings.DEBUG_MODE and settings.DEBUG_INFINITE_CHARGES): self.cargas -= 1
-                d_min = 9999
-                for m in monstruos:
-                    d = math.hypot(m.rect.centerx - self.rect.centerx, m.rect.centery - self.rect.centery)
-                    if d < d_min and m.rect.y < self.rect.y: d_min, target = d, m
+                target, _ = indice_objetivos(monstruos).mas_cercano(self.rect.centerx, self.rect.centery, condicion=lambda m: m.rect.y < self.rect.y)
             
-            es_hielo = random.random() < (self.nivel_hielo * 0.05)
+            es_hielo = azar.sim.random() < (self.nivel_hielo * 0.05)
             es_homing = self.powerup_actual == "homing" and (self.cargas > 0 or (settings.DEBUG_MODE and settings.DEBUG_INFINITE_CHARGES))
             num = 1 + self.stats["proyectiles_extra"] + (1 if self.powerup_actual == "disparo_doble" and (self.cargas > 0 or (settings.DEBUG_MODE and settings.DEBUG_INFINITE_CHARGES)) else 0) + (1 if self.powerup_actual == "disparo_triple" and (self.cargas > 0 or (settings.DEBUG_MODE and settings.DEBUG_INFINITE_CHARGES)) else 0)
 
@@ -767,7 +1025,7 @@ class Mago(pygame.sprite.Sprite):
             
             penetracion = 0
             # TIRADOR DE SOMBRA: probabilidad de atravesar todos (30%)
-            if self.tirador_sombra and random.random() < 0.30:
+            if self.tirador_sombra and azar.sim.random() < 0.30:
                 penetracion = 999  # Atraviesa todos los enemigos
             elif self.skill_pierce:
                 self.shots_fired += 1
@@ -785,8 +1043,8 @@ class Mago(pygame.sprite.Sprite):
                 v_arc_y = -vel_p * 0.88
                 
                 # Diferenciación Arco: 15% bounce, 15% pierce 1
-                p_arco_bounce = 1 if random.random() < 0.15 else 0
-                p_arco_pierce = 1 if random.random() < 0.15 else 0
+                p_arco_bounce = 1 if azar.sim.random() < 0.15 else 0
+                p_arco_pierce = 1 if azar.sim.random() < 0.15 else 0
                 
                 self.crear_bala(-v_arc_x, v_arc_y, danio, es_exp, target, es_hielo, es_frag, es_quemadura=es_quemadura, penetracion=p_arco_pierce, rebotes=p_arco_bounce, es_homing=es_homing, es_critico=es_critico)
                 self.crear_bala(v_arc_x, v_arc_y, danio, es_exp, target, es_hielo, es_frag, es_quemadura=es_quemadura, penetracion=p_arco_pierce, rebotes=p_arco_bounce, es_homing=es_homing, es_critico=es_critico)
@@ -806,10 +1064,10 @@ class Mago(pygame.sprite.Sprite):
         es_homing_perma = False
         if self.modificadores.get("homing", False):
             prob_homing = 0.4 + (self.mejoras_contador.get("homing_perma", 0) * 0.05)
-            if random.random() < prob_homing:
+            if azar.sim.random() < prob_homing:
                 es_homing_perma = True
         
-        b = Proyectil(self.rect.centerx, self.rect.top, vx, vy, danio, color=c, es_explosivo=es_exp, es_potenciado=self.doble_danio_activo, rebotes=self.stats["rebotes"], penetracion=pen_total, target=target, es_hielo=es_hielo, es_fragmentacion=es_frag, es_quemadura=es_quemadura, es_homing=es_homing or es_homing_perma, furia_ignea=furia, tirador_sombra=sombra, es_critico=es_critico, proyectil_grande=self.modificadores.get("proyectil_grande", False))
+        b = Proyectil.nuevo(self.rect.centerx, self.rect.top, vx, vy, danio, color=c, es_explosivo=es_exp, es_potenciado=self.doble_danio_activo, rebotes=self.stats["rebotes"], penetracion=pen_total, target=target, es_hielo=es_hielo, es_fragmentacion=es_frag, es_quemadura=es_quemadura, es_homing=es_homing or es_homing_perma, furia_ignea=furia, tirador_sombra=sombra, es_critico=es_critico, proyectil_grande=self.modificadores.get("proyectil_grande", False))
         self.grupo_s.add(b); self.grupo_b.add(b)
 
     def recibir_danio(self):
@@ -817,26 +1075,17 @@ class Mago(pygame.sprite.Sprite):
             # Shield Check
             if self.skill_shield and self.shield_hp > 0:
                 self.shield_hp -= 1
-                self.shield_regen_timer = pygame.time.get_ticks() + self.shield_regen_cd
-                self.invulnerable, self.fin_invulnerable = True, pygame.time.get_ticks() + 1000 # Breve invuln
+                self.shield_regen_timer = tiempo.ahora() + self.shield_regen_cd
+                self.invulnerable, self.fin_invulnerable = True, tiempo.ahora() + 1000 # Breve invuln
                 return False
 
-            self.vidas -= 1; self.invulnerable, self.fin_invulnerable = True, pygame.time.get_ticks() + 2000; return True
+            self.vidas -= 1; self.danio_recibido += 1
+            self.invulnerable, self.fin_invulnerable = True, tiempo.ahora() + 2000; return True
         return False
 
-    def update(self, *args, **kwargs):
-        ahora = pygame.time.get_ticks()
-        teclas = pygame.key.get_pressed()
-
-        # Combinar entrada de teclado y táctil
-        dash_from_key = -1 if teclas[pygame.K_LEFT] else (1 if teclas[pygame.K_RIGHT] else 0)
-        self.dash_dir = dash_from_key
-
-        # Si hay input táctil,用它覆盖 el teclado
-        if self.mover_izquierda:
-            self.dash_dir = -1
-        elif self.mover_derecha:
-            self.dash_dir = 1
+    def update(self, ctx=None):
+        ahora = ctx.ahora if ctx else tiempo.ahora()
+        self.dash_dir = self.entrada.mov
 
         factor_vel = 1.0
         if self.fin_ralentizado > 0: factor_vel = FACTOR_RALENTIZADO
@@ -883,7 +1132,7 @@ class Mago(pygame.sprite.Sprite):
             
         # ACTUALIZAR ESCUDO ESPECIAL
         if self.escudo_especial:
-            self.escudo_especial.update()
+            self.escudo_especial.update(ctx)
         
         # REGENERACION ESCUDO MAGICO (APRENDIZ)
         if self.skill_shield and self.shield_hp < self.shield_max_hp:
@@ -915,9 +1164,15 @@ class Mago(pygame.sprite.Sprite):
              self.hitbox.center = self.rect.center
 
     def aplicar_ralentizacion(self):
-        self.fin_ralentizado = pygame.time.get_ticks() + DURACION_RALENTIZADO
+        self.fin_ralentizado = tiempo.ahora() + DURACION_RALENTIZADO
+
+class Monstruo(Entidad):
+    __slots__ = ("fila_original", "tipo", "color", "hp", "desc", "dir", "vel_x", "mult_f", "pos_x", "pos_y", "frames",
+                 "image_index", "image_original", "anim_timer", "anim_delay", "congelado", "timer_descongelar",
+                 "quemado", "quemado_timer", "ultimo_dano_quemadura", "murio_por_quemadura", "furia_ignea_activa",
+                 "rebotes_restantes")
+    colisionador = COLISION_RECT
 
-class Monstruo(pygame.sprite.Sprite):
     def __init__(self, x, y, fila, vel_x, desc, mult_f, nivel=1, tipo=TIPO_ENEMIGO_NORMAL):
         super().__init__()
         self.fila_original = fila 
@@ -999,21 +1254,21 @@ class Monstruo(pygame.sprite.Sprite):
         multiplicador_tipo = CHANCE_DISPARO_POR_TIPO.get(self.tipo, 1.0)
         chance_final = chance_base * multiplicador_tipo
 
-        if random.random() < chance_final:
+        if azar.sim.random() < chance_final:
             vel_bala = 3.5
             if self.tipo == TIPO_ENEMIGO_ELITE: vel_bala = 5.5
             elif self.tipo == TIPO_ENEMIGO_TESORO: vel_bala = 4.5 # Disparo rápido también
             
-            p = Proyectil(self.rect.centerx, self.rect.bottom, 0, vel_bala, 1, es_enemigo=True)
+            p = Proyectil.nuevo(self.rect.centerx, self.rect.bottom, 0, vel_bala, 1, es_enemigo=True)
             grupo_s.add(p); grupo_e.add(p)
 
     def congelar(self):
-        self.congelado, self.timer_descongelar = True, pygame.time.get_ticks() + DURACION_CONGELACION_NORMAL
+        self.congelado, self.timer_descongelar = True, tiempo.ahora() + DURACION_CONGELACION_NORMAL
         # Al congelar, aplicamos el tinte sobre el frame actual
         t = pygame.Surface(self.image.get_size(), pygame.SRCALPHA); t.fill((*AZUL_CONGELADO, 150)); self.image.blit(t, (0,0), special_flags=pygame.BLEND_RGBA_ADD)
 
-    def update(self, *args, **kwargs):
-        ahora = pygame.time.get_ticks()
+    def update(self, ctx=None):
+        ahora = ctx.ahora if ctx else tiempo.ahora()
         if self.congelado:
             if ahora > self.timer_descongelar: 
                 self.congelado = False
@@ -1039,7 +1294,7 @@ class Monstruo(pygame.sprite.Sprite):
                 if self.hp <= 0:
                     self.murio_por_quemadura = True
                     if self.furia_ignea_activa:
-                        monstruos = kwargs.get('monstruos', None)
+                        monstruos = ctx.monstruos if ctx else None
                         if monstruos:
                             self.propagar_quemadura(monstruos)
             
@@ -1071,14 +1326,12 @@ class Monstruo(pygame.sprite.Sprite):
     def propagar_quemadura(self, monstruos):
         """Propaga la quemadura a enemigos cercanos (FURIA ÍGNEA)"""
         radio_propagacion = 100
-        for m in monstruos:
-            if m != self and m.alive():
-                dist = math.hypot(m.rect.centerx - self.rect.centerx, m.rect.centery - self.rect.centery)
-                if dist < radio_propagacion and not m.quemado:
-                    m.quemado = True
-                    m.quemado_timer = pygame.time.get_ticks()
-                    m.ultimo_dano_quemadura = pygame.time.get_ticks()
-                    m.furia_ignea_activa = True
+        for m in area_monstruos(monstruos).en_radio(self.rect.centerx, self.rect.centery, radio_propagacion):
+            if m is not self and not m.quemado:
+                m.quemado = True
+                m.quemado_timer = tiempo.ahora()
+                m.ultimo_dano_quemadura = tiempo.ahora()
+                m.furia_ignea_activa = True
 
 class PowerUp(pygame.sprite.Sprite):
     def __init__(self, x, y, tipo):
@@ -1155,12 +1408,15 @@ class PowerUp(pygame.sprite.Sprite):
              pygame.draw.rect(self.image, NEGRO, [cx-4, cy-8, 8, 16], border_radius=2)
         
         self.rect = self.image.get_rect(center=(x, y))
+        self.colisionador = colision_circulo(self.size // 2)
 
-    def update(self, *args, **kwargs):
+    def update(self, ctx=None):
         self.rect.y += 2.5; 
         if self.rect.top > ALTO: self.kill()
 
 class Corazon(pygame.sprite.Sprite):
+    colisionador = COLISION_RECT
+
     def __init__(self, x, y, tipo="normal"):
         super().__init__(); 
         self.image = pygame.Surface((24, 24), pygame.SRCALPHA)
@@ -1168,11 +1424,13 @@ class Corazon(pygame.sprite.Sprite):
         pygame.draw.circle(self.image, color, (7,7), 7); pygame.draw.circle(self.image, color, (17,7), 7)
         pygame.draw.polygon(self.image, color, [(0,9), (24,9), (12,24)])
         self.rect = self.image.get_rect(center=(x, y))
-    def update(self, *args, **kwargs):
+    def update(self, ctx=None):
         self.rect.y += 3; 
         if self.rect.top > ALTO: self.kill()
 
 class Barrera(pygame.sprite.Sprite):
+    colisionador = COLISION_RECT
+
     def __init__(self, x, y):
         super().__init__(); self.hp = BARRERA_VIDA_MAX
         self.image = pygame.Surface((BARRERA_ANCHO, BARRERA_ALTO), pygame.SRCALPHA)
@@ -1181,8 +1439,8 @@ class Barrera(pygame.sprite.Sprite):
         self.last_anim = 0
         self.actualizar_aspecto()
         
-    def update(self, *args, **kwargs):
-        now = pygame.time.get_ticks()
+    def update(self, ctx=None):
+        now = ctx.ahora if ctx else tiempo.ahora()
         if now - self.last_anim > 120: # 120ms por frame
             self.last_anim = now
             self.frame = 1 - self.frame
@@ -1237,23 +1495,26 @@ class Charco(pygame.sprite.Sprite):
         pygame.draw.circle(self.image, BLANCO, (self.radio, self.radio), self.radio, 2)
         
         self.rect = self.image.get_rect(center=(x, y))
-        self.creacion = pygame.time.get_ticks()
+        self.colisionador = colision_circulo(self.radio)
+        self.creacion = tiempo.ahora()
         self.duracion = DURACION_CHARCO
 
-    def update(self, *args, **kwargs):
-        if pygame.time.get_ticks() - self.creacion > self.duracion:
+    def update(self, ctx=None):
+        if (ctx.ahora if ctx else tiempo.ahora()) - self.creacion > self.duracion:
             self.kill()
 
-class TextoFlotante(pygame.sprite.Sprite):
+class TextoFlotante(Reciclable, Entidad):
+    __slots__ = ("fuente", "vy", "alpha")
+
     def __init__(self, x, y, texto, color=BLANCO, size=20):
         super().__init__()
-        self.fuente = pygame.font.SysFont("Arial", size, True)
+        self.fuente = fuente(size)
         self.image = self.fuente.render(str(texto), True, color)
         self.rect = self.image.get_rect(center=(x, y))
         self.vy = -2.0
         self.alpha = 255
 
-    def update(self, *args, **kwargs):
+    def update(self, ctx=None):
         self.rect.y += self.vy
         self.alpha -= 5
         if self.alpha <= 0:
@@ -1261,23 +1522,25 @@ class TextoFlotante(pygame.sprite.Sprite):
         else:
             self.image.set_alpha(self.alpha)
 
+TextoFlotante.reciclador = Reciclador(TextoFlotante, 64)
+
 class CriticoHit(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
-        self.fuente = pygame.font.SysFont("Arial", 24, True)
+        self.fuente = fuente(24)
         self.image = self.fuente.render("X", True, ORO_PODER)
         self.rect = self.image.get_rect(center=(x, y))
-        self.fin = pygame.time.get_ticks() + 600
+        self.fin = tiempo.ahora() + 600
     
-    def update(self, **kwargs):
-        if pygame.time.get_ticks() > self.fin:
+    def update(self, ctx=None):
+        if (ctx.ahora if ctx else tiempo.ahora()) > self.fin:
             self.kill()
 
 class RayoImpacto(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
         self.x, self.y = x, y
-        self.creacion = pygame.time.get_ticks()
+        self.creacion = tiempo.ahora()
         self.duracion = 200
         self.radius = 5
         self.max_radius = 30
@@ -1285,8 +1548,8 @@ class RayoImpacto(pygame.sprite.Sprite):
         self.image = pygame.Surface((60, 60), pygame.SRCALPHA)
         self.rect = self.image.get_rect(center=(x, y))
     
-    def update(self, **kwargs):
-        ahora = pygame.time.get_ticks()
+    def update(self, ctx=None):
+        ahora = ctx.ahora if ctx else tiempo.ahora()
         pasado = ahora - self.creacion
         
         if pasado > self.duracion:
@@ -1302,6 +1565,8 @@ class RayoImpacto(pygame.sprite.Sprite):
         pygame.draw.circle(self.image, (255, 255, 255, alpha), (30, 30), int(self.radius * 0.5), 2)
 
 class EscudoEspecial(pygame.sprite.Sprite):
+    colisionador = COLISION_RECT
+
     def __init__(self, mago):
         super().__init__()
         self.mago = mago
@@ -1334,25 +1599,27 @@ class EscudoEspecial(pygame.sprite.Sprite):
     def desactivar(self):
         self.activo = False
         self.rebotado = True
-        self.timer_reaparicion = pygame.time.get_ticks() + self.cooldown_reaparecer
+        self.timer_reaparicion = tiempo.ahora() + self.cooldown_reaparecer
         self.image = pygame.Surface((self.ancho, self.alto), pygame.SRCALPHA)
 
-    def update(self, *args, **kwargs):
+    def update(self, ctx=None):
         self.actualizar_posicion()
         
         if not self.activo:
-            ahora = pygame.time.get_ticks()
+            ahora = ctx.ahora if ctx else tiempo.ahora()
             if ahora > self.timer_reaparicion:
                 self.activar()
 
 class RayoPlayer(pygame.sprite.Sprite):
+    colisionador = COLISION_HAZ
+
     def __init__(self, x, y, angulo=-90, duracion=1000, color=(255, 0, 150), mago=None, potencia=1.0, longitud_max=600, danio=None, rebotes=0, es_homing=False):
         super().__init__()
         self.origen_x = x
         self.origen_y = y
         self.angulo = angulo
         self.duracion = duracion
-        self.creacion = pygame.time.get_ticks()
+        self.creacion = tiempo.ahora()
         self.color = color
         self.potencia = potencia
         self.longitud_max = longitud_max
@@ -1368,7 +1635,8 @@ class RayoPlayer(pygame.sprite.Sprite):
         # Guardar daño base antes de la reducción contra bosses
         self.danio_original = self.danio
         self.penetracion = 999
-        self.enemigos_atacados = []
+        # El haz daña en cada frame; esto solo marca a quién ya se le mostró el impacto
+        self.enemigos_atacados = set()
         
         # SINERGIAS: Rebotes y Homing
         self.rebotes = rebotes
@@ -1378,15 +1646,20 @@ class RayoPlayer(pygame.sprite.Sprite):
         self.expansion_completa = False
         self.tiempo_expansion_completa = None
         
-        # Crear superficie del tamaño exacto que necesitamos
-        self.image = pygame.Surface((100, longitud_max + 10), pygame.SRCALPHA)
-        self.rect = self.image.get_rect()
+        # Crear superficie del tamaño exacto que necesitamos; se pinta recién al leer image
+        # (al dibujar), así headless no paga el fill y las líneas de cada tick
+        self._lienzo = pygame.Surface((100, longitud_max + 10), pygame.SRCALPHA)
+        self._trazo = None
+        self.longitud_actual = 0
+        self.rect = self._lienzo.get_rect()
         # El rect debe estar posicionado para que el rayo salga desde (x, y) hacia arriba
         self.rect.left = x - 50
         self.rect.top = y - longitud_max
+        # Para colisionar se usa el haz (segmento con el ancho dibujado), no el rect
+        self.haz = crear_haz(x, y, x, y, 40 * potencia)
 
-    def update(self, *args, **kwargs):
-        ahora = pygame.time.get_ticks()
+    def update(self, ctx=None):
+        ahora = ctx.ahora if ctx else tiempo.ahora()
         pasado = ahora - self.creacion
         
         if not self.expansion_completa:
@@ -1409,12 +1682,29 @@ class RayoPlayer(pygame.sprite.Sprite):
         else:
             ratio_desvanecimiento = 0.0
 
-        self.image.fill((0, 0, 0, 0))
-        
         ancho_base = int(40 * self.potencia)
         pulso = math.sin(ahora * 0.03) * 10
         ancho = ancho_base * (1 - ratio_desvanecimiento) + pulso
         if ancho < 5: ancho = 5
+        self._trazo = (ancho, ratio_desvanecimiento)
+
+        # Actualizar rect para colisiones - el rayo está entre y=y-longitud e y=y
+        self.rect.left = self.origen_x - 50
+        self.rect.top = self.origen_y - self.longitud_actual
+        self.rect.width = 100
+        self.rect.height = self.longitud_actual
+        self.haz = crear_haz(self.origen_x, self.origen_y, self.origen_x, self.origen_y - self.longitud_actual, ancho)
+
+    @property
+    def image(self):
+        if self._trazo is not None:
+            self.pintar(*self._trazo)
+            self._trazo = None
+        return self._lienzo
+
+    def pintar(self, ancho, ratio_desvanecimiento):
+        """Dibuja el haz del último update() en la superficie."""
+        self._lienzo.fill((0, 0, 0, 0))
 
         # Dibujar el rayo desde el origen hacia arriba
         # El origen está en la parte inferior-central de la superficie
@@ -1428,33 +1718,31 @@ class RayoPlayer(pygame.sprite.Sprite):
         for i in range(4):
             a = int(ancho / (i + 1))
             alpha = int(alpha_base / (i + 1))
-            pygame.draw.line(self.image, (*self.color, alpha), (inicio_x, inicio_y), (fin_x, fin_y), a)
+            pygame.draw.line(self._lienzo, (*self.color, alpha), (inicio_x, inicio_y), (fin_x, fin_y), a)
         
         # Núcleo blanco
-        pygame.draw.line(self.image, (255, 255, 255, int(255 * (1 - ratio_desvanecimiento))), 
+        pygame.draw.line(self._lienzo, (255, 255, 255, int(255 * (1 - ratio_desvanecimiento))), 
                         (inicio_x, inicio_y), (fin_x, fin_y), int(ancho/4))
-        
-        # Actualizar rect para colisiones - el rayo está entre y=y-longitud e y=y
-        self.rect.left = self.origen_x - 50
-        self.rect.top = self.origen_y - self.longitud_actual
-        self.rect.width = 100
-        self.rect.height = self.longitud_actual
 
 class LaserSNAKE(pygame.sprite.Sprite):
+    colisionador = COLISION_HAZ
+
     def __init__(self, x, y, angulo, duracion=2000, color=(255, 0, 100)):
         super().__init__()
         self.x, self.y = x, y
         self.angulo = angulo # 90 es hacia abajo
         self.duracion = duracion
-        self.creacion = pygame.time.get_ticks()
+        self.creacion = tiempo.ahora()
         self.color = color
         self.ancho_max = 40
         self.image = pygame.Surface((ANCHO, ALTO), pygame.SRCALPHA)
         self.rect = self.image.get_rect()
         self.puntos_colision = []
+        rad = math.radians(angulo)
+        self.haz = crear_haz(x, y, x + math.cos(rad) * 1000, y + math.sin(rad) * 1000, self.ancho_max)
 
-    def update(self, *args, **kwargs):
-        ahora = pygame.time.get_ticks()
+    def update(self, ctx=None):
+        ahora = ctx.ahora if ctx else tiempo.ahora()
         pasado = ahora - self.creacion
         if pasado > self.duracion:
             self.kill()
@@ -1473,6 +1761,7 @@ class LaserSNAKE(pygame.sprite.Sprite):
         rad = math.radians(self.angulo)
         fin_x = self.x + math.cos(rad) * 1000
         fin_y = self.y + math.sin(rad) * 1000
+        self.haz = crear_haz(self.x, self.y, fin_x, fin_y, ancho)
 
         # Dibujar múltiples capas para efecto neon
         for i in range(3):
@@ -1491,15 +1780,15 @@ class AdvertenciaLaser(pygame.sprite.Sprite):
         self.y = y
         self.angulo = angulo
         self.duracion_total = duracion_ms
-        self.tiempo_inicio = pygame.time.get_ticks()
+        self.tiempo_inicio = tiempo.ahora()
         self.parpadeo_rapido = False
         
         # Crear imagen grande para la línea
         self.image = pygame.Surface((ANCHO, ALTO), pygame.SRCALPHA)
         self.rect = self.image.get_rect()
         
-    def update(self, *args, **kwargs):
-        tiempo_actual = pygame.time.get_ticks()
+    def update(self, ctx=None):
+        tiempo_actual = ctx.ahora if ctx else tiempo.ahora()
         tiempo_transcurrido = tiempo_actual - self.tiempo_inicio
         tiempo_restante = self.duracion_total - tiempo_transcurrido
         
@@ -1561,7 +1850,7 @@ class AdvertenciaLaser(pygame.sprite.Sprite):
             pygame.draw.rect(self.image, (255, 0, 0, 255), (excla_x - 1, excla_y, 2, 8))
 
 class BossSNAKE(Boss):
-    def __init__(self, dificultad=MODO_NORMAL, nivel=10):
+    def __init__(self, dificultad=MODO_NORMAL, nivel=10, lasers=None, advertencias=None):
         super().__init__(nivel=nivel, dificultad=dificultad, variante=BOSS_TIPO_SNAKE)
         # Reposicionar el boss en la parte superior visible de la pantalla
         # El boss base empieza en Y = -180 (fuera de pantalla), lo movemos a Y = 50 (visible)
@@ -1606,7 +1895,9 @@ class BossSNAKE(Boss):
         self.advertencia_laser_activa = False
         self.tiempo_advertencia_laser = 0
         self.duracion_advertencia_laser = 1500  # 1.5 segundos de aviso
-        self.advertencias_laser_grupo = pygame.sprite.Group()  # Grupo para las líneas de advertencia
+        # Juego pasa sus registros de láseres y advertencias para no buscarlos en todos_sprites
+        self.advertencias_laser_grupo = advertencias if advertencias is not None else pygame.sprite.Group()  # Grupo para las líneas de advertencia
+        self.lasers_grupo = lasers if lasers is not None else pygame.sprite.Group()  # Láseres activos (Juego los choca contra el Mago)
         self.angulos_laser_pendientes = []  # Guardar ángulos para las advertencias
         
         # Inicializar posiciones de láser guardadas
@@ -1701,6 +1992,23 @@ class BossSNAKE(Boss):
         self.glow_intensity = 0
         self.float_offset = 0
 
+    # Tamaños de las animaciones según anim_timer (que va de 0 a 101)
+    TAM_ATAQUE = (int(200 * 1.15), int(180 / 1.15))
+    TAM_EMBESTIDA = (int(200 * 1.4), int(180 * 0.7))
+
+    def tam_idle(self, t):
+        breath = 1.0 + math.sin(t * 0.1) * 0.03
+        return (int(200 * breath), int(180 / breath))
+
+    def tam_muerte(self, t):
+        shrink = max(0.1, 1.0 - (t * 0.05))
+        return (int(200 * shrink), int(180 * shrink))
+
+    def precalcular_mascaras(self):
+        super().precalcular_mascaras()
+        for tam in {self.TAM_ATAQUE, self.TAM_EMBESTIDA} | {f(t) for t in range(102) for f in (self.tam_idle, self.tam_muerte)}:
+            self.mascara_de("original", tam)
+
     def animacion_idle(self):
         efecto = self.image_original.copy()
         
@@ -1708,8 +2016,7 @@ class BossSNAKE(Boss):
         self.float_y = int(math.sin(self.float_offset) * 5)
         
         self.anim_timer += 1
-        breath = 1.0 + math.sin(self.anim_timer * 0.1) * 0.03
-        efecto = pygame.transform.scale(efecto, (int(200 * breath), int(180 / breath)))
+        efecto = pygame.transform.scale(efecto, self.tam_idle(self.anim_timer))
         
         if self.tercera_fase:
             tint = (255, 50, 255) # Morado/Magenta para fase extrema
@@ -1723,8 +2030,7 @@ class BossSNAKE(Boss):
     def animacion_ataque(self):
         efecto = self.image_original.copy()
         
-        stretch = 1.15
-        efecto = pygame.transform.scale(efecto, (int(200 * stretch), int(180 / stretch)))
+        efecto = pygame.transform.scale(efecto, self.TAM_ATAQUE)
         
         self.glow_intensity = min(1.0, self.glow_intensity + 0.2)
         if self.glow_intensity > 0:
@@ -1735,14 +2041,12 @@ class BossSNAKE(Boss):
     def animacion_embestida(self):
         efecto = self.image_original.copy()
         
-        stretch = 1.4
-        squash = 0.7
-        efecto = pygame.transform.scale(efecto, (int(200 * stretch), int(180 * squash)))
+        efecto = pygame.transform.scale(efecto, self.TAM_EMBESTIDA)
         
         efecto = self.aplicar_glow(efecto, (255, 50, 0), 0.8)
         
         # Shake visual sin crear superficies nuevas
-        self.float_y = random.randint(-4, 4)
+        self.float_y = azar.sim.randint(-4, 4)
         
         return efecto
 
@@ -1757,7 +2061,7 @@ class BossSNAKE(Boss):
 
         shrink = max(0.1, 1.0 - (self.anim_timer * 0.05))
         try:
-            efecto = pygame.transform.scale(efecto, (int(200 * shrink), int(180 * shrink)))
+            efecto = pygame.transform.scale(efecto, self.tam_muerte(self.anim_timer))
         except:
             efecto = self.image_original.copy()
 
@@ -1805,21 +2109,23 @@ class BossSNAKE(Boss):
         if self.anim_phase not in ["danyo", "muerte"]:
             self.anim_phase = "idle"
         
+        # Todas las animaciones escalan image_original: su máscara ya está calculada
+        self.mascara = self.mascara_de("original", img.get_size())
         return img
     
-    def update(self, *args, **kwargs):
-        ahora = kwargs.get('ahora', pygame.time.get_ticks())
-        grupo_s = kwargs.get('grupo_s', None)
-        grupo_b = kwargs.get('grupo_b', None)
-        mago = kwargs.get('mago', None)
+    def update(self, ctx=None):
+        if ctx is None: return
+        ahora, grupo_s, grupo_b, mago = ctx.ahora, ctx.grupo_s, ctx.grupo_b, ctx.mago
 
         if self.destruyendo or self.congelado:
-            # Limpiar advertencias de láser al morir
+            # Limpiar advertencias y láseres al morir
             for adv in self.advertencias_laser_grupo:
                 adv.kill()
             self.advertencias_laser_grupo.empty()
+            for l in self.lasers_grupo:
+                l.kill()
             self.image = self.obtener_imagen_animada("muerte")
-            super().update(*args, **kwargs)
+            super().update(ctx)
             return
 
         if self.hp < self.hp_max * 0.3 and not self.segunda_fase:
@@ -1846,6 +2152,7 @@ class BossSNAKE(Boss):
             if ahora > self.timer_advertencia:
                 self.timer_advertencia = 0
                 self.image = self.image_original.copy()
+                self.mascara = self.mascara_de("original")
                 dx = mago.rect.centerx - self.rect.centerx
                 dy = mago.rect.centery - self.rect.centery
                 dist = math.hypot(dx, dy)
@@ -1876,12 +2183,11 @@ class BossSNAKE(Boss):
         puede_embestir = self.pos_y < 180
         
         if self.dificultad == MODO_DIFICIL and self.timer_advertencia == 0 and not self.embestiendo and puede_embestir:
-            ahora = pygame.time.get_ticks()
             dx = mago.rect.centerx - self.rect.centerx
             dy = mago.rect.centery - self.rect.centery
             dist = math.hypot(dx, dy)
             # Verificar que esté a distancia apropiada: ni muy cerca ni muy lejos
-            if random.random() < 0.002 and ahora - self.ultimo_ataque_embestida > self.cooldown_embestida and self.distancia_min_embestida < dist < self.distancia_max_embestida:
+            if azar.sim.random() < 0.002 and ahora - self.ultimo_ataque_embestida > self.cooldown_embestida and self.distancia_min_embestida < dist < self.distancia_max_embestida:
                 self.timer_advertencia = ahora + self.tiempo_advertencia_ms
                 # Guardar posición inicial para limitar distancia de embestida
                 self.pos_inicial_embestida = (self.pos_x, self.pos_y)
@@ -2002,7 +2308,7 @@ class BossSNAKE(Boss):
                     perp_x = math.cos(angulo_mov + math.pi/2) * oscilacion
                     perp_y = math.sin(angulo_mov + math.pi/2) * oscilacion
 
-                    p = Proyectil(self.rect.centerx + offset_x + perp_x, self.rect.centery + 45 + offset_y + perp_y,
+                    p = Proyectil.nuevo(self.rect.centerx + offset_x + perp_x, self.rect.centery + 45 + offset_y + perp_y,
                                   vx_q, vy_q, 2, es_enemigo=True,
                                   color=(220, 80, 255) if rad_q < 5 else (255, 50, 50), 
                                   radio_custom=rad_q)
@@ -2044,7 +2350,7 @@ class BossSNAKE(Boss):
         if not self.advertencia_laser_activa and ahora - self.ultimo_laser > cd_laser:
             self.advertencia_laser_activa = True
             self.tiempo_advertencia_laser = ahora + self.duracion_advertencia_laser
-            self.tipo_laser_pendiente = random.choice(["boca", "ojos"])
+            self.tipo_laser_pendiente = azar.sim.choice(["boca", "ojos"])
             
             if 0 < self.rect.centerx < ANCHO and 0 < self.rect.centery < ALTO:
                 if self.tipo_laser_pendiente == "boca":
@@ -2063,7 +2369,7 @@ class BossSNAKE(Boss):
                     self.advertencias_laser_grupo.add(adv1, adv2); grupo_s.add(adv1, adv2)
             
             # Actualizar y lanzar láser cuando termine la advertencia
-            self.advertencias_laser_grupo.update()
+            self.advertencias_laser_grupo.update(ctx)
             
             if self.advertencia_laser_activa:
                 if ahora >= self.tiempo_advertencia_laser:
@@ -2075,15 +2381,15 @@ class BossSNAKE(Boss):
                     if self.tipo_laser_pendiente == "boca":
                         # Láser desde la boca usando posición guardada
                         l = LaserSNAKE(self.laser_pos_x, self.laser_pos_y, self.laser_angulo)
-                        grupo_s.add(l)
+                        self.lasers_grupo.add(l); grupo_s.add(l)
                     else:
                         # Dos láseres desde los ojos usando posiciones guardadas
                         if 0 < self.laser_ojo_izq_x < ANCHO and 0 < self.laser_ojo_izq_y < ALTO:
                             l1 = LaserSNAKE(self.laser_ojo_izq_x, self.laser_ojo_izq_y, 70)
-                            grupo_s.add(l1)
+                            self.lasers_grupo.add(l1); grupo_s.add(l1)
                         if 0 < self.laser_ojo_der_x < ANCHO and 0 < self.laser_ojo_der_y < ALTO:
                             l2 = LaserSNAKE(self.laser_ojo_der_x, self.laser_ojo_der_y, 110)
-                            grupo_s.add(l2)
+                            self.lasers_grupo.add(l2); grupo_s.add(l2)
                 else:
                     # Durante la advertencia, el boss brilla ligeramente en rojo
                     tiempo_restante = self.tiempo_advertencia_laser - ahora
@@ -0,0 +1,57 @@
+# RELOJ DE FRAME: una sola marca de tiempo (ms) por frame para todo el juego.
+# Los sprites leen tiempo.ahora() en vez de pygame.time.get_ticks(), así todos
+# ven el mismo instante y la simulación avanza en pasos fijos (reproducible).
+import pygame
+from settings import FPS
+
+
+class RelojFrame:
+    def __init__(self, paso_ms=1000.0 / FPS):
+        # Reloj virtual: cada tick avanza paso_ms exactos, sin mirar el reloj real
+        self.paso_ms = paso_ms
+        self._ms = 0.0
+        self.ahora = int(self._ms)
+        self.dt = 0.0
+        self.frames = 0  # ticks tomados (sirve para invalidar cachés por frame)
+
+    def tick(self):
+        """Toma la marca de tiempo del frame. Devuelve el instante actual en ms."""
+        self.frames += 1
+        self.dt = self.paso_ms
+        self._ms += self.dt
+        self.ahora = int(self._ms)
+        return self.ahora
+
+    def instante(self):
+        """Instante exacto en ms (float), para guardar y restaurar con fijar()."""
+        return self._ms
+
+    def fijar(self, ms):
+        """Pone el reloj en un instante exacto (reproducir grabaciones)."""
+        self._ms = float(ms)
+        self.ahora = int(self._ms)
+
+
+# Reloj activo: lo fija Juego al crearse (o al alternar entre varias simulaciones)
+_activo = None
+
+
+def activar(reloj):
+    global _activo
+    _activo = reloj
+
+
+def activo():
+    return _activo
+
+
+def ahora():
+    """Instante del frame actual en ms (get_ticks si aún no hay reloj activo)."""
+    if _activo is None: return pygame.time.get_ticks()
+    return _activo.ahora
+
+
+def frame():
+    """Número de tick del reloj activo (None si aún no hay reloj activo)."""
+    if _activo is None: return None
+    return _activo.frames